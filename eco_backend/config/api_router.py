@@ -1,20 +1,50 @@
 from django.conf import settings
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
-from django.urls import path, include
+from django.urls import path, include, re_path
+from eco_backend.products.async_views import async_read_view, read_facets, read_products
 from eco_backend.users.api.views import UserViewSet
-from eco_backend.products.views import ProductViewSet, UserFavoriteViewSet
+from eco_backend.products.views import (
+    HomeView,
+    PriceDropAlertViewSet,
+    ProductViewSet,
+    UserFavoriteViewSet,
+)
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
 router.register("products", ProductViewSet)
 router.register("userfavorite", UserFavoriteViewSet)
+router.register("price-alerts", PriceDropAlertViewSet)
 
 
 app_name = "api"
 
-urlpatterns = [
+urlpatterns = []
+if settings.ASYNC_PRODUCT_READS:
+    # Ahead of the router, which keeps the other product routes.
+    views = {url.name: url.callback for url in router.urls}
+    urlpatterns += [
+        path(
+            "products/",
+            async_read_view(read_products, views["product-list"]),
+            name="product-list",
+        ),
+        path(
+            "products/facets/",
+            async_read_view(read_facets, views["product-facets"]),
+            name="product-facets",
+        ),
+        re_path(
+            r"^products/(?P<pk>[0-9]+)/$",
+            async_read_view(read_products, views["product-detail"]),
+            name="product-detail",
+        ),
+    ]
+
+urlpatterns += [
     path("", include(router.urls)),  # /api/users/... endpoints
     path("auth/", include("eco_backend.users.api.urls")),
+    path("home/", HomeView.as_view(), name="home"),
 ]
\ No newline at end of file
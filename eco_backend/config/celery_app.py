@@ -40,7 +40,23 @@ app.conf.beat_schedule = {
     "classify_title_for_category_sub_category": {
         "task": "eco_backend.products.tasks.classify_product_title_task",
         "schedule": crontab(hour=1, minute=00),
-    }
+    },
+    "build_similar_products_nightly": {
+        "task": "eco_backend.products.tasks.build_similar_products_task",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "maintain_price_history_daily": {
+        "task": "eco_backend.products.tasks.maintain_price_history_task",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "purge_inactive_products_daily": {
+        "task": "eco_backend.products.tasks.purge_inactive_products_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "flush_favorite_counts": {
+        "task": "eco_backend.products.tasks.flush_favorite_counts_task",
+        "schedule": 60.0,
+    },
 }
 
 
@@ -69,6 +69,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
     "django_filters",
 ]
@@ -139,6 +140,8 @@ AUTH_PASSWORD_VALIDATORS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    # Before the rest of the stack, after CORS so browsers can read the 503.
+    "eco_backend.products.throttling.LoadSheddingMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -330,11 +333,27 @@ SOCIALACCOUNT_FORMS = {"signup": "eco_backend.users.forms.UserSocialSignupForm"}
 # -------------------------------------------------------------------------------
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
+    # Token first: the frontend sends a token on every call, and the cached
+    # class resolves it without touching the session or the database.
     "DEFAULT_AUTHENTICATION_CLASSES": (
+        "eco_backend.users.api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # Token buckets per API token and per client IP, with separate budgets for
+    # searches, other reads and writes (eco_backend/products/throttling.py).
+    "DEFAULT_THROTTLE_CLASSES": (
+        "eco_backend.products.throttling.TokenBucketThrottle",
+        "eco_backend.products.throttling.IPBucketThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        "token.search": "60/min",
+        "token.list": "600/min",
+        "token.write": "120/min",
+        "ip.search": "120/min",
+        "ip.list": "1200/min",
+        "ip.write": "240/min",
+    },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
@@ -352,3 +371,23 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Serve product list/detail/facet reads from async views (see
+# eco_backend/products/async_views.py); off routes them to the DRF viewset only.
+ASYNC_PRODUCT_READS = env.bool("DJANGO_ASYNC_PRODUCT_READS", default=True)
+# Per worker: API requests get a 503 once this many of them are in flight, or
+# the last few seconds of queries, if at least LOAD_SHED_MIN_QUERIES of them,
+# averaged more than query_ms.
+LOAD_SHED_BUDGETS = {
+    "search": {"in_flight": 32, "query_ms": 200},
+    "list": {"in_flight": 128, "query_ms": 500},
+    "write": {"in_flight": 256, "query_ms": 2000},
+}
+LOAD_SHED_MIN_QUERIES = 20
+LOAD_SHED_RETRY_AFTER = 5
+# Months of price history kept (eco_backend/products/price_history.py);
+# 0 keeps all of it.
+PRICE_HISTORY_MONTHS = env.int("DJANGO_PRICE_HISTORY_MONTHS", default=0)
+# A product that this many runs of its scraper in a row missed is no longer
+# listed, and is deleted this many days later (eco_backend/products/ingest.py).
+PRODUCT_INACTIVE_AFTER_RUNS = env.int("DJANGO_PRODUCT_INACTIVE_AFTER_RUNS", default=3)
+PRODUCT_RETENTION_DAYS = env.int("DJANGO_PRODUCT_RETENTION_DAYS", default=90)
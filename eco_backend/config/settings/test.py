@@ -3,6 +3,7 @@ With these settings, tests run faster.
 """
 
 from .base import *  # noqa: F403
+from .base import REST_FRAMEWORK
 from .base import TEMPLATES
 from .base import env
 
@@ -36,3 +37,7 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver/"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Rate limits and load shedding share state across tests; their own tests
+# switch them back on.
+REST_FRAMEWORK = {**REST_FRAMEWORK, "DEFAULT_THROTTLE_CLASSES": ()}
+LOAD_SHED_BUDGETS = {}
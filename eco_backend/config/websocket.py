@@ -1,13 +1,184 @@
-async def websocket_application(scope, receive, send):
+"""
+Live updates over a websocket (see ``eco_backend/products/live.py``).
+
+Clients connect with ``?token=<API token>`` and talk JSON text frames::
+
+    -> {"action": "subscribe", "topics": ["catalog", "price:42"]}
+    <- {"type": "subscribed", "topics": ["catalog", "price:42"]}
+    <- {"topic": "price:42", "data": {"product_id": 42, ...}}
+    -> {"action": "unsubscribe", "topics": ["price:42"]}
+
+Malformed requests get ``{"type": "error", "detail": ...}``, and "ping" is
+still answered with "pong!".
+
+Each worker process keeps one Redis pattern subscription for all of its
+connections (``LiveHub``); an update is decoded once and handed to every
+subscribed connection's queue, whose own task writes it out. A client that
+stops reading drops updates once its queue is full instead of holding up
+the rest.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+import redis
+import redis.asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from eco_backend.products.live import CHANNEL_PREFIX
+from eco_backend.products.live import is_topic
+from eco_backend.users.api.authentication import CachedTokenAuthentication
+
+logger = logging.getLogger(__name__)
+
+MAX_TOPICS = 500
+QUEUE_SIZE = 64
+RECONNECT_SECONDS = 1
+# Application-defined close code: the token was missing or invalid.
+UNAUTHORIZED = 4401
+
+
+class LiveHub:
+    """Fans the updates of one Redis pattern subscription out to local connections."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.listener = None
+
+    def start(self):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            topic = (
+                                message["channel"].decode().removeprefix(CHANNEL_PREFIX)
+                            )
+                            self.dispatch(topic, message["data"])
+            except redis.RedisError:
+                logger.warning(
+                    "Live update subscription lost, reconnecting",
+                    exc_info=True,
+                )
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+    def dispatch(self, topic, data):
+        queues = self.subscribers.get(topic)
+        if not queues:
+            return
+        text = data.decode() if isinstance(data, bytes) else data
+        for queue in queues:
+            with contextlib.suppress(asyncio.QueueFull):
+                queue.put_nowait(text)
+
+    def subscribe(self, queue, topics):
+        for topic in topics:
+            self.subscribers[topic].add(queue)
+
+    def unsubscribe(self, queue, topics):
+        for topic in topics:
+            queues = self.subscribers.get(topic)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[topic]
+
+
+hub = LiveHub()
+
+
+async def authenticate(scope):
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token", [""])[0]
+    if not token:
+        return None
+    try:
+        user, _ = await sync_to_async(
+            CachedTokenAuthentication().authenticate_credentials,
+        )(token)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def error(detail):
+    return json.dumps({"type": "error", "detail": detail})
+
+
+def handle_request(text, queue, topics):
+    """
+    Apply one client frame to ``topics`` (the connection's subscriptions) and
+    return the reply.
+    """
+    if text == "ping":
+        return "pong!"
+    try:
+        request = json.loads(text)
+    except (TypeError, ValueError):
+        return error("Send JSON text frames.")
+    if not isinstance(request, dict) or request.get("action") not in (
+        "subscribe",
+        "unsubscribe",
+    ):
+        return error('"action" must be "subscribe" or "unsubscribe".')
+    requested = request.get("topics")
+    if not isinstance(requested, list) or not all(
+        is_topic(topic) for topic in requested
+    ):
+        return error(
+            '"topics" must be a list of "catalog", "scrape" or "price:<product id>".',
+        )
+
+    if request["action"] == "subscribe":
+        added = set(requested) - topics
+        if len(topics) + len(added) > MAX_TOPICS:
+            return error(f"At most {MAX_TOPICS} topics per connection.")
+        hub.subscribe(queue, added)
+        topics |= added
+    else:
+        removed = topics & set(requested)
+        hub.unsubscribe(queue, removed)
+        topics -= removed
+    return json.dumps({"type": "subscribed", "topics": sorted(topics)})
+
+
+async def forward(queue, send):
     while True:
-        event = await receive()
+        await send({"type": "websocket.send", "text": await queue.get()})
 
-        if event["type"] == "websocket.connect":
-            await send({"type": "websocket.accept"})
 
-        if event["type"] == "websocket.disconnect":
-            break
+async def websocket_application(scope, receive, send):
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+    if await authenticate(scope) is None:
+        await send({"type": "websocket.close", "code": UNAUTHORIZED})
+        return
+    await send({"type": "websocket.accept"})
+    hub.start()
 
-        if event["type"] == "websocket.receive":
-            if event["text"] == "ping":
-                await send({"type": "websocket.send", "text": "pong!"})
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    topics = set()
+    sender = asyncio.create_task(forward(queue, send))
+    try:
+        while True:
+            event = await receive()
+            if event["type"] == "websocket.disconnect":
+                break
+            if event["type"] == "websocket.receive":
+                # Replies queue behind pending updates rather than race them.
+                await queue.put(handle_request(event.get("text"), queue, topics))
+    finally:
+        hub.unsubscribe(queue, topics)
+        sender.cancel()
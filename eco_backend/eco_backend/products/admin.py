@@ -2,7 +2,7 @@ from allauth.account.decorators import secure_admin_login
 from django.conf import settings
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Product, UserFavorite
+from .models import IngestRun, PriceDropAlert, Product, SuggestionTerm, UserFavorite
 
 
 if getattr(settings, "DJANGO_ADMIN_FORCE_ALLAUTH", False):
@@ -18,8 +18,42 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ("seller",)
     sortable_by = ("selling_price",)
 
+@admin.register(SuggestionTerm)
+class SuggestionTermAdmin(admin.ModelAdmin):
+    list_display = ("value", "kind", "product_count")
+    search_fields = ("value",)
+    list_filter = ("kind",)
+
 @admin.register(UserFavorite)
 class UserFavouriteAdmin(admin.ModelAdmin):
     list_display = ("user", "product", "added_at")
     search_fields = ("user", "product")
     list_filter = ("user", "product")
+
+@admin.register(PriceDropAlert)
+class PriceDropAlertAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "product",
+        "old_price_paise",
+        "new_price_paise",
+        "created_at",
+        "read_at",
+    )
+    list_select_related = ("user", "product")
+    raw_id_fields = ("user", "product")
+
+
+@admin.register(IngestRun)
+class IngestRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "scraper",
+        "started_at",
+        "finished_at",
+        "new",
+        "changed",
+        "unchanged",
+        "disappeared",
+        "failed",
+    )
+    list_filter = ("scraper",)
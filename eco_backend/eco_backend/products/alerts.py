@@ -0,0 +1,117 @@
+"""
+Price-drop alerts for favorited products.
+
+The ingest task knows which products it has just made cheaper, so alerts
+start from that delta rather than from the users: one query joins the
+dropped products to their favorites, the alerts are bulk-inserted into each
+user's in-app inbox and every user gets one email for all of their drops.
+The work grows with the favorites of changed products, not with the number
+of users.
+"""
+
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+
+from eco_backend.products.models import PriceDropAlert
+from eco_backend.products.models import UserFavorite
+
+ALERT_BATCH_SIZE = 1000
+
+
+def price_drop(old_price_paise, new_price_paise):
+    return (
+        old_price_paise is not None
+        and new_price_paise is not None
+        and new_price_paise < old_price_paise
+    )
+
+
+def favorites_of_dropped(drops):
+    """
+    Favorites of the products in ``drops`` (``{product_id: old price}``) that
+    are still cheaper.
+    """
+    rows = (
+        UserFavorite.objects.filter(product_id__in=drops)
+        .order_by("user_id", "product_id")
+        .values_list(
+            "user_id",
+            "user__email",
+            "product_id",
+            "product__title",
+            "product__price_paise",
+        )
+    )
+    for user_id, email, product_id, title, price_paise in rows.iterator(
+        chunk_size=ALERT_BATCH_SIZE,
+    ):
+        # The price may have bounced back since the ingest run.
+        if price_drop(drops[product_id], price_paise):
+            yield user_id, email, product_id, title, price_paise
+
+
+def format_rupees(paise):
+    return f"₹{paise / 100:,.2f}"
+
+
+def price_drop_email(email, drops):
+    body = render_to_string(
+        "products/price_drop_email.txt",
+        {
+            "drops": [
+                {"title": title, "old": format_rupees(old), "new": format_rupees(new)}
+                for title, old, new in drops
+            ],
+        },
+    )
+    subject = (
+        f"{len(drops)} of your favorites got cheaper"
+        if len(drops) > 1
+        else f"{drops[0][0]} got cheaper"
+    )
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email])
+
+
+def deliver(alerts, emails):
+    PriceDropAlert.objects.bulk_create(alerts)
+    if emails:
+        # One connection for the whole batch.
+        get_connection().send_messages(emails)
+
+
+def send_price_drop_alerts(drops):
+    """
+    Store and email the alerts for ``drops``, a ``{product_id: old price}``
+    mapping of products that got cheaper. Returns the number of alerts.
+    """
+    sent = 0
+    alerts = []
+    emails = []
+    for (_, email), rows in groupby(
+        favorites_of_dropped(drops),
+        key=lambda row: row[:2],
+    ):
+        user_drops = []
+        for user_id, _, product_id, title, price_paise in rows:
+            alerts.append(
+                PriceDropAlert(
+                    user_id=user_id,
+                    product_id=product_id,
+                    old_price_paise=drops[product_id],
+                    new_price_paise=price_paise,
+                ),
+            )
+            user_drops.append((title, drops[product_id], price_paise))
+        if email:
+            emails.append(price_drop_email(email, user_drops))
+        if len(alerts) >= ALERT_BATCH_SIZE:
+            deliver(alerts, emails)
+            sent += len(alerts)
+            alerts, emails = [], []
+
+    deliver(alerts, emails)
+    return sent + len(alerts)
@@ -0,0 +1,163 @@
+"""
+Async read path for the product list, detail and facet endpoints.
+
+Under ASGI Django hands every synchronous view to a thread, and
+``ATOMIC_REQUESTS`` wraps it in a transaction even when all it does is read
+the cache. These views run on the event loop instead, outside any
+transaction: the token, the validators, the cached response and the
+caller's favorite flags are read with Django's async cache and ORM APIs, and
+an uncached product is fetched with ``aget()``. The API throttles apply as
+they would in DRF. Cache keys, validators and the favorite flags come from
+the same helpers ``ProductViewSet`` uses, so both paths serve the same bytes.
+
+On by default; ``ASYNC_PRODUCT_READS`` off routes these reads to the DRF
+views alone, and ``loadtest_products`` compares the two.
+
+Whatever needs the rest of the DRF stack (list and facet cache misses,
+session logins, the browsable API, methods other than GET, errors) is
+handed to the ``ProductViewSet`` view in a thread, exactly as before; that
+fills the cache for the next caller.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from eco_backend.products.cache import CACHE_TIMEOUT
+from eco_backend.products.cache import acatalog_validators
+from eco_backend.products.cache import acount_response_cache
+from eco_backend.products.cache import aversioned_key
+from eco_backend.products.cache import patch_validators
+from eco_backend.products.cache import response_key_parts
+from eco_backend.products.favorites import afavorite_product_ids
+from eco_backend.products.favorites import favorites_validators
+from eco_backend.products.favorites import mark_requested_favorites
+from eco_backend.products.favorites import serialized_fields
+from eco_backend.products.models import Product
+from eco_backend.products.serializers import ProductSerializer
+from eco_backend.products.throttling import check_throttles
+from eco_backend.products.throttling import throttled_response
+from eco_backend.products.views import ProductViewSet
+from eco_backend.users.api.authentication import CachedTokenAuthentication
+
+
+def wants_json(request):
+    """
+    Whether DRF would pick the JSON renderer; the browsable API stays on the
+    sync path.
+    """
+    if "format" in request.GET:
+        return False
+    return (
+        request.get_preferred_type(["application/json", "text/html"])
+        == "application/json"
+    )
+
+
+async def authenticate(request):
+    try:
+        return await CachedTokenAuthentication().aauthenticate(request)
+    except AuthenticationFailed:
+        return None
+
+
+def json_response(data):
+    response = HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+    )
+    # What the DRF views send along with their JSON.
+    response.headers["Allow"] = "GET, HEAD, OPTIONS"
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+async def read_products(request, user, pk=""):
+    """
+    List and detail responses from the response cache, or ``None`` to use the
+    DRF view.
+    """
+    try:
+        fields = ProductViewSet.requested_fields(request.GET)
+    except ValidationError:
+        return None
+    favorites = await afavorite_product_ids(user)
+    etag, last_modified = favorites_validators(await acatalog_validators(), favorites)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        action = "retrieve" if pk else "list"
+        key = await aversioned_key(
+            *response_key_parts(action, request.get_host(), pk, request.GET),
+        )
+        data = await cache.aget(key)
+        if data is not None:
+            await acount_response_cache("hits")
+        elif pk:
+            data = await fetch_product(pk, fields, request.GET)
+            if data is None:
+                return None
+            await acount_response_cache("misses")
+            await cache.aset(key, data, CACHE_TIMEOUT)
+        else:
+            return None
+        mark_requested_favorites(data, fields, favorites)
+        response = json_response(data)
+    return patch_validators(response, etag, last_modified)
+
+
+async def fetch_product(pk, fields, params):
+    """One serialized product, as ``ProductViewSet.retrieve`` would cache it."""
+    if set(params) - {"view", "fields"}:
+        # Filters apply to detail lookups too; leave those to the filter backends.
+        return None
+    queryset = ProductViewSet.queryset
+    if fields is not None:
+        queryset = ProductViewSet.only_requested(queryset, fields)
+    try:
+        product = await queryset.aget(pk=pk)
+    except Product.DoesNotExist:
+        return None
+    return dict(ProductSerializer(product, fields=serialized_fields(fields)).data)
+
+
+async def read_facets(request, user):
+    etag, last_modified = await acatalog_validators()
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        key = await aversioned_key(*ProductViewSet.facets_key_parts(request.GET))
+        facets = await cache.aget(key)
+        if facets is None:
+            return None
+        response = json_response(facets)
+    return patch_validators(response, etag, last_modified)
+
+
+def async_read_view(read, view):
+    """
+    An async view answering GETs with ``read(request, user, **kwargs)`` and
+    everything ``read`` returns ``None`` for with the synchronous ``view``.
+    """
+    fallback = sync_to_async(view)
+
+    @csrf_exempt
+    @transaction.non_atomic_requests
+    async def async_view(request, *args, **kwargs):
+        if request.method == "GET" and wants_json(request):
+            credentials = await authenticate(request)
+            if credentials is not None:
+                request.user, request.auth = credentials
+                response = await read(request, request.user, **kwargs)
+                # Charged only once it is served here; DRF charges the rest.
+                if response is not None:
+                    error = await sync_to_async(check_throttles)(request)
+                    return response if error is None else throttled_response(error)
+        return await fallback(request, *args, **kwargs)
+
+    return async_view
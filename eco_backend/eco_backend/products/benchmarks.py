@@ -0,0 +1,834 @@
+"""
+Catalog benchmarks, run with ``python manage.py benchmark_products <name>``.
+
+Every benchmark grows a synthetic catalog (see ``utils/synthetic_catalog.py``)
+inside a single transaction that is rolled back at the end, so it can be
+pointed at any database without leaving rows behind.
+"""
+
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import filters
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.facets import FACET_FIELDS
+from eco_backend.products.facets import facet_counts
+from eco_backend.products.home import rebuild_home_snapshot
+from eco_backend.products.ingest import SCRAPED_FIELDS
+from eco_backend.products.ingest import ingest
+from eco_backend.products.matching import match_products
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import PriceObservation
+from eco_backend.products.models import Product
+from eco_backend.products.pagination import encode_position
+from eco_backend.products.popularity import flush_favorite_counts
+from eco_backend.products.popularity import record_favorite_changes
+from eco_backend.products.price_history import RESOLUTIONS
+from eco_backend.products.price_history import add_months
+from eco_backend.products.price_history import ensure_partitions
+from eco_backend.products.price_history import price_history
+from eco_backend.products.search import search_products
+from eco_backend.products.similar import build_neighbors
+from eco_backend.products.similar import nearest_neighbors
+from eco_backend.products.similar import product_vectors
+from eco_backend.products.suggest import SUGGEST_LIMIT
+from eco_backend.products.suggest import find_suggestions
+from eco_backend.products.utils.normalize import numeric_fields
+from eco_backend.products.utils.synthetic_catalog import build_items
+from eco_backend.products.utils.synthetic_catalog import build_listings
+from eco_backend.products.utils.synthetic_catalog import build_products
+from eco_backend.products.utils.synthetic_catalog import seed_catalog
+from eco_backend.users.api.authentication import CachedTokenAuthentication
+from eco_backend.users.api.authentication import local_tokens
+from eco_backend.users.models import User
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+FAVORITE_WORKERS = [1, 8, 32]
+MATCHING_SAMPLE = 2000
+CHANGED_SHARES = [0, 0.01, 0.1, 1]
+HISTORY_MONTHS = 36
+# Price changes per product over HISTORY_MONTHS, about one every three weeks.
+HISTORY_CHANGES = 52
+HISTORY_SAMPLE = 50
+
+
+def median_ms(func, repeat=5):
+    """Run ``func`` once to warm up, then return the median of ``repeat`` runs."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def grow_catalog(sizes):
+    """Yield each size once the catalog holds that many synthetic products."""
+    with transaction.atomic():
+        try:
+            seeded = 0
+            for size in sorted(sizes):
+                seed_catalog(size - seeded, start=seeded)
+                seeded = size
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Product._meta.db_table}")  # noqa: SLF001
+                yield size
+        finally:
+            transaction.set_rollback(True)
+
+
+def benchmark_user():
+    user, _ = User.objects.get_or_create(username="benchmark")
+    return user
+
+
+def api_get(view, path, params, user, **kwargs):
+    request = APIRequestFactory().get(path, params)
+    force_authenticate(request, user=user)
+    response = view(request, **kwargs)
+    response.render()
+    return response
+
+
+def bench_pagination(sizes, write):
+    """Keyset cursor pages vs LIMIT/OFFSET pages at the start, middle and end."""
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    keyset_view = ProductViewSet.as_view({"get": "list"})
+    offset_view = ProductViewSet.as_view(
+        {"get": "list"},
+        pagination_class=LimitOffsetPagination,
+    )
+    page_size = 24
+
+    write(
+        f"{'rows':>9} {'ordering':>15} {'page':>7} {'keyset ms':>10} {'offset ms':>10}",
+    )
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        # Public ?ordering= value and the indexed column the paginator sorts on.
+        for ordering, sort_key in [
+            ("title", "title"),
+            ("-selling_price", "-price_paise"),
+        ]:
+            field = sort_key.lstrip("-")
+            rows = ProductViewSet.queryset.filter(
+                **{f"{field}__isnull": False},
+            ).order_by(
+                sort_key,
+                "-pk" if sort_key.startswith("-") else "pk",
+            )
+            for label, offset in [
+                ("first", 0),
+                ("middle", size // 2),
+                ("last", size - page_size - 1),
+            ]:
+                params = {"ordering": ordering, "page_size": page_size}
+                if offset:
+                    row = rows.values(field, "pk")[offset - 1]
+                    params["cursor"] = encode_position(row[field], row["pk"])
+                keyset = median_ms(
+                    lambda p=params, u=user: api_get(
+                        keyset_view,
+                        "/api/products/",
+                        p,
+                        u,
+                    ),
+                )
+                offset_params = {
+                    "ordering": ordering,
+                    "limit": page_size,
+                    "offset": offset,
+                }
+                paged = median_ms(
+                    lambda p=offset_params, u=user: api_get(
+                        offset_view,
+                        "/api/products/",
+                        p,
+                        u,
+                    ),
+                )
+                write(
+                    f"{size:>9} {ordering:>15} {label:>7} {keyset:>10.2f} "
+                    f"{paged:>10.2f}",
+                )
+
+
+def bench_search(sizes, write):
+    """Ranked tsvector search vs the ILIKE scan of DRF's SearchFilter."""
+    from eco_backend.products.filters import ProductOrderingFilter  # noqa: PLC0415
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    class IlikeViewSet(ProductViewSet):
+        filter_backends = [filters.SearchFilter, ProductOrderingFilter]
+        search_fields = ["title", "description"]
+
+    fts_view = ProductViewSet.as_view({"get": "list"})
+    ilike_view = IlikeViewSet.as_view({"get": "list"})
+    terms = ["neem", "bamboo toothbrush", "charcoal soap 123"]
+
+    write(f"{'rows':>9} {'search':>20} {'tsvector ms':>12} {'ilike ms':>10}")
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        for term in terms:
+            params = {"search": term}
+            fts = median_ms(
+                lambda p=params, u=user: api_get(fts_view, "/api/products/", p, u),
+            )
+            ilike = median_ms(
+                lambda p=params, u=user: api_get(ilike_view, "/api/products/", p, u),
+            )
+            write(f"{size:>9} {term:>20} {fts:>12.2f} {ilike:>10.2f}")
+
+
+def bench_suggest(sizes, write):
+    """Uncached trigram suggestions vs a full ``?search=`` page for the same text."""
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    list_view = ProductViewSet.as_view({"get": "list"})
+    terms = ["ba", "bamboo", "toothbursh", "chracoal sop", "mamaerth"]
+
+    write(f"{'rows':>9} {'q':>14} {'suggest ms':>11} {'search ms':>10} {'hits':>5}")
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        for term in terms:
+            suggested = median_ms(lambda t=term: find_suggestions(t, SUGGEST_LIMIT))
+            params = {"search": term}
+            searched = median_ms(
+                lambda p=params, u=user: api_get(list_view, "/api/products/", p, u),
+            )
+            hits = len(find_suggestions(term, SUGGEST_LIMIT)["products"])
+            write(
+                f"{size:>9} {term:>14} {suggested:>11.2f} {searched:>10.2f} {hits:>5}",
+            )
+
+
+def bench_facets(sizes, write):
+    """
+    One GROUPING SETS pass vs a GROUP BY query per facet, then the cached
+    endpoint.
+    """
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    facets_view = ProductViewSet.as_view({"get": "facets"})
+
+    def per_field(queryset):
+        return {
+            field: list(queryset.order_by().values(field).annotate(count=Count("id")))
+            for field in FACET_FIELDS
+        }
+
+    write(
+        f"{'rows':>9} {'filter':>18} {'grouping sets ms':>17} {'per field ms':>13} "
+        f"{'cached ms':>10}",
+    )
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        listed = ProductViewSet.queryset
+        cases = [
+            ("none", {}, listed),
+            ("category=home", {"category": "home"}, listed.filter(category="home")),
+            ("search=bamboo", {"search": "bamboo"}, search_products(listed, "bamboo")),
+        ]
+        for label, params, queryset in cases:
+            grouped = median_ms(lambda q=queryset: facet_counts(q))
+            separate = median_ms(lambda q=queryset: per_field(q))
+            cached = median_ms(
+                lambda p=params, u=user: api_get(
+                    facets_view,
+                    "/api/products/facets/",
+                    p,
+                    u,
+                ),
+            )
+            write(
+                f"{size:>9} {label:>18} {grouped:>17.2f} {separate:>13.2f} "
+                f"{cached:>10.2f}",
+            )
+
+
+def bench_response_cache(sizes, write):
+    """
+    List and detail responses rebuilt from Postgres vs served from the response
+    cache.
+    """
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    list_view = ProductViewSet.as_view({"get": "list"})
+    detail_view = ProductViewSet.as_view({"get": "retrieve"})
+
+    write(f"{'rows':>9} {'request':>28} {'uncached ms':>12} {'cached ms':>10}")
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        product = ProductViewSet.queryset.order_by("pk")[size // 2]
+        cases = [
+            (
+                "list ordering=title",
+                list_view,
+                "/api/products/",
+                {"ordering": "title"},
+                {},
+            ),
+            (
+                "list search=bamboo",
+                list_view,
+                "/api/products/",
+                {"search": "bamboo"},
+                {},
+            ),
+            (
+                "list category=home -price",
+                list_view,
+                "/api/products/",
+                {"category": "home", "ordering": "-selling_price"},
+                {},
+            ),
+            (
+                "detail",
+                detail_view,
+                f"/api/products/{product.pk}/",
+                {},
+                {"pk": product.pk},
+            ),
+        ]
+        for label, view, path, params, kwargs in cases:
+
+            def fetch(view=view, path=path, params=params, kwargs=kwargs, user=user):
+                request = APIRequestFactory().get(path, params)
+                force_authenticate(request, user=user)
+                view(request, **kwargs).render()
+
+            def fetch_cold(fetch=fetch):
+                bump_catalog_version()
+                fetch()
+
+            cold = median_ms(fetch_cold)
+            warm = median_ms(fetch)
+            write(f"{size:>9} {label:>28} {cold:>12.2f} {warm:>10.2f}")
+
+
+def bench_conditional(sizes, write):
+    """A revalidated 304 vs a full 200 from the response cache and from Postgres."""
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    list_view = ProductViewSet.as_view({"get": "list"})
+
+    def fetch(user, **headers):
+        request = APIRequestFactory().get(
+            "/api/products/",
+            {"ordering": "title"},
+            **headers,
+        )
+        force_authenticate(request, user=user)
+        response = list_view(request)
+        if hasattr(response, "render"):  # 304s are plain Django responses
+            response.render()
+        return response
+
+    write(
+        f"{'rows':>9} {'304 ms':>8} {'200 cached ms':>14} {'200 uncached ms':>16} "
+        f"{'body bytes':>11}",
+    )
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        first = fetch(user)
+        etag = first["ETag"]
+        not_modified = median_ms(
+            lambda e=etag, u=user: fetch(u, HTTP_IF_NONE_MATCH=e),
+        )
+        cached = median_ms(lambda u=user: fetch(u))
+
+        def fetch_cold(user=user):
+            bump_catalog_version()
+            fetch(user)
+
+        uncached = median_ms(fetch_cold)
+        write(
+            f"{size:>9} {not_modified:>8.2f} {cached:>14.2f} {uncached:>16.2f} "
+            f"{len(first.content):>11}",
+        )
+
+
+def bench_fieldsets(sizes, write):
+    """
+    Full product rows vs ``?view=card`` and a four-field ``?fields=`` list,
+    uncached.
+    """
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    list_view = ProductViewSet.as_view({"get": "list"})
+    profiles = [
+        ("full", {}),
+        ("view=card", {"view": "card"}),
+        ("fields=4", {"fields": "id,title,selling_price,img_url"}),
+    ]
+
+    write(f"{'rows':>9} {'page':>5} {'profile':>10} {'ms':>8} {'bytes':>8}")
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        for page_size in (24, 100):
+            for label, extra in profiles:
+                params = {"ordering": "-selling_price", "page_size": page_size, **extra}
+
+                def fetch_cold(p=params, u=user):
+                    bump_catalog_version()
+                    return api_get(list_view, "/api/products/", p, u)
+
+                elapsed = median_ms(fetch_cold)
+                body = len(fetch_cold().content)
+                write(f"{size:>9} {page_size:>5} {label:>10} {elapsed:>8.2f} {body:>8}")
+
+
+def bench_home(sizes, write):
+    """/api/home/ from its snapshot vs the featured list request it replaces."""
+    from eco_backend.products.views import HomeView  # noqa: PLC0415
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    home_view = HomeView.as_view()
+    list_view = ProductViewSet.as_view({"get": "list"})
+    featured = {"ordering": "-rating", "page_size": 12}
+
+    write(
+        f"{'rows':>9} {'home ms':>8} {'rebuild ms':>11} {'featured list ms':>17} "
+        f"{'list+facets ms':>15}",
+    )
+    for size in grow_catalog(sizes):
+        user = benchmark_user()
+        home = median_ms(lambda u=user: api_get(home_view, "/api/home/", {}, u))
+        rebuild = median_ms(rebuild_home_snapshot)
+
+        def featured_cold(user=user):
+            bump_catalog_version()
+            api_get(list_view, "/api/products/", featured, user)
+
+        def featured_and_categories_cold(featured_cold=featured_cold):
+            featured_cold()
+            facet_counts(ProductViewSet.queryset)
+
+        listed = median_ms(featured_cold)
+        listed_with_facets = median_ms(featured_and_categories_cold)
+        write(
+            f"{size:>9} {home:>8.2f} {rebuild:>11.2f} {listed:>17.2f} "
+            f"{listed_with_facets:>15.2f}",
+        )
+
+
+def bench_favorite_counters(sizes, write):
+    """
+    Concurrent favorite toggles on a few hot products: an ``F()`` increment in
+    the request transaction vs a Redis increment buffered until the flush.
+
+    The writers run on their own connections and have to see the products,
+    so this one commits a handful of synthetic rows and deletes them
+    afterwards. ``--sizes`` is ignored: contention grows with the writers per
+    row, not with the catalog.
+    """
+    hot_products = 4
+    toggles = 2000
+    # The rest of a favorite request, which still runs inside its transaction.
+    request_ms = 2
+
+    def naive(product_id):
+        with transaction.atomic():
+            Product.objects.filter(pk=product_id).update(
+                favorite_count=F("favorite_count") + 1,
+            )
+            time.sleep(request_ms / 1000)
+
+    def buffered(product_id):
+        with transaction.atomic():
+            record_favorite_changes({product_id: 1})
+            time.sleep(request_ms / 1000)
+
+    def run(toggle, product_ids, workers):
+        latencies = []
+
+        def worker(share):
+            try:
+                for n in range(share):
+                    started = time.perf_counter()
+                    toggle(product_ids[n % len(product_ids)])
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(toggles // workers,))
+            for _ in range(workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return len(latencies) / elapsed, statistics.quantiles(latencies, n=20)[-1]
+
+    products = Product.objects.bulk_create(build_products(hot_products, start=10**9))
+    product_ids = [product.pk for product in products]
+    listed = Product.objects.filter(pk__in=product_ids)
+    write(
+        f"{'workers':>8} {'counter':>9} {'toggles/s':>10} {'p95 ms':>8} "
+        f"{'flush ms':>9} {'counted':>8}",
+    )
+    try:
+        for workers in FAVORITE_WORKERS:
+            for label, toggle in [("F()", naive), ("redis", buffered)]:
+                listed.update(favorite_count=0)
+                rate, p95 = run(toggle, product_ids, workers)
+                started = time.perf_counter()
+                flush_favorite_counts()
+                flushed = (time.perf_counter() - started) * 1000
+                counted = sum(listed.values_list("favorite_count", flat=True))
+                write(
+                    f"{workers:>8} {label:>9} {rate:>10.0f} {p95:>8.2f} "
+                    f"{flushed:>9.2f} {counted:>8}",
+                )
+    finally:
+        listed.delete()
+
+
+def bench_token_auth(sizes, write):
+    """
+    Queries and p99 latency of a cached /api/products/ page per authentication
+    setup.
+    """
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    setups = [
+        ("session, token", [SessionAuthentication, TokenAuthentication]),
+        ("cached token, session", [CachedTokenAuthentication, SessionAuthentication]),
+    ]
+    requests = 500
+
+    write(
+        f"{'rows':>9} {'authentication':>22} {'queries':>8} "
+        f"{'p50 ms':>7} {'p99 ms':>7}",
+    )
+    for size in grow_catalog(sizes):
+        token, _ = Token.objects.get_or_create(user=benchmark_user())
+        headers = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+        for label, classes in setups:
+            view = ProductViewSet.as_view(
+                {"get": "list"},
+                authentication_classes=classes,
+            )
+
+            def fetch(view=view, headers=headers):
+                view(
+                    APIRequestFactory().get(
+                        "/api/products/",
+                        {"ordering": "title"},
+                        **headers,
+                    ),
+                ).render()
+
+            local_tokens.clear()
+            fetch()  # fills the response cache (and the token cache)
+            with CaptureQueriesContext(connection) as captured:
+                fetch()
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                fetch()
+                samples.append((time.perf_counter() - started) * 1000)
+            p99 = statistics.quantiles(samples, n=100)[-1]
+            write(
+                f"{size:>9} {label:>22} {len(captured):>8} "
+                f"{statistics.median(samples):>7.2f} {p99:>7.2f}",
+            )
+
+
+def bench_similar(sizes, write):
+    """
+    Nightly "similar products" build: wall time, and peak memory of the
+    vectors and neighbour search (traced separately, tracing slows it down).
+    """
+    listed = Product.objects.filter(LISTED).order_by("pk")
+    write(f"{'rows':>9} {'terms':>7} {'build s':>9} {'peak MB':>8} {'stored':>9}")
+    for size in grow_catalog(sizes):
+        started = time.perf_counter()
+        stored = build_neighbors()
+        build = time.perf_counter() - started
+
+        tracemalloc.start()
+        try:
+            _, weights = product_vectors(listed)
+            for _ in nearest_neighbors(weights):
+                pass
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+        write(f"{size:>9} {weights.shape[1]:>7} {build:>9.1f} {peak:>8.0f} {stored:>9}")
+
+
+def bench_matching(sizes, write):
+    """
+    Cross-seller matching: build time over the whole catalog, and pairwise
+    precision/recall on a labelled sample of ``MATCHING_SAMPLE`` products
+    listed by several sellers each, added to it.
+    """
+    labels = {}
+    write(f"{'rows':>9} {'build s':>8} {'groups':>8} {'precision':>9} {'recall':>7}")
+    for size in grow_catalog(sizes):
+        if not labels:
+            # Inside the catalog's transaction, so it is rolled back with it.
+            numbers, products = zip(
+                *build_listings(MATCHING_SAMPLE, start=10**9),
+                strict=True,
+            )
+            products = Product.objects.bulk_create(products, batch_size=5000)
+            labels = {
+                product.pk: number
+                for number, product in zip(numbers, products, strict=True)
+            }
+        started = time.perf_counter()
+        groups = match_products()
+        build = time.perf_counter() - started
+
+        found = dict(
+            Product.objects.filter(pk__in=labels).values_list("pk", "group_id"),
+        )
+        pairs = Counter(
+            (group, labels[pk]) for pk, group in found.items() if group is not None
+        )
+        true_positives = sum(n * (n - 1) // 2 for n in pairs.values())
+        predicted = sum(
+            n * (n - 1) // 2
+            for n in Counter(g for g in found.values() if g is not None).values()
+        )
+        actual = sum(n * (n - 1) // 2 for n in Counter(labels.values()).values())
+        precision = true_positives / predicted if predicted else 1.0
+        write(
+            f"{size:>9} {build:>8.1f} {groups:>8} {precision:>9.3f} "
+            f"{true_positives / actual:>7.3f}",
+        )
+
+
+def update_or_create_items(items):
+    """The ingest before batching: a lookup and a write per item."""
+    for item in items:
+        defaults = {name: item[name] for name in SCRAPED_FIELDS} | numeric_fields(item)
+        Product.objects.update_or_create(
+            product_link=item["product_link"],
+            defaults=defaults,
+        )
+
+
+def upsert_items(items):
+    for _ in ingest(items):
+        pass
+
+
+def bench_ingest(sizes, write):
+    """
+    Scraped items written with ``update_or_create`` one at a time vs upserted
+    in batches: rows/s into an empty catalog, then again over the same rows
+    (which the upsert finds unchanged and leaves alone).
+    """
+    write(f"{'items':>9} {'path':>18} {'insert rows/s':>14} {'rerun rows/s':>14}")
+    for size in sizes:
+        items = list(build_items(size, start=10**9))
+        for label, save in [
+            ("update_or_create", update_or_create_items),
+            ("bulk upsert", upsert_items),
+        ]:
+            # A transaction each: update_or_create's savepoints slow down
+            # whatever runs after them in the same one.
+            with transaction.atomic():
+                try:
+                    rates = []
+                    for _ in range(2):
+                        started = time.perf_counter()
+                        save(items)
+                        rates.append(size / (time.perf_counter() - started))
+                finally:
+                    transaction.set_rollback(True)
+            write(f"{size:>9} {label:>18} {rates[0]:>14.0f} {rates[1]:>14.0f}")
+
+
+def bench_ingest_memory(sizes, write):
+    """
+    Peak Python memory of ingesting a scraper's output as it is yielded,
+    against collecting it into a list first as the scrapers used to.
+    """
+    write(f"{'items':>9} {'streamed MB':>12} {'listed MB':>10}")
+    for size in sizes:
+        peaks = []
+        for collect in (iter, list):
+            with transaction.atomic():
+                tracemalloc.start()
+                try:
+                    for _ in ingest(collect(build_items(size, start=10**9))):
+                        pass
+                    peaks.append(tracemalloc.get_traced_memory()[1] / 2**20)
+                finally:
+                    tracemalloc.stop()
+                    transaction.set_rollback(True)
+        write(f"{size:>9} {peaks[0]:>12.1f} {peaks[1]:>10.1f}")
+
+
+def wal_position():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_current_wal_insert_lsn()")
+        return cursor.fetchone()[0]
+
+
+def wal_bytes_since(position):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)",
+            [position],
+        )
+        return int(cursor.fetchone()[0])
+
+
+def bench_ingest_changes(sizes, write):
+    """
+    Re-ingesting a catalog with none, a few or all of its items changed:
+    time, rows written and WAL generated by the run.
+    """
+    write(f"{'items':>9} {'changed':>8} {'run s':>7} {'written':>8} {'WAL MB':>7}")
+    for size in sizes:
+        with transaction.atomic():
+            try:
+                items = list(build_items(size, start=10**9))
+                upsert_items(items)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Product._meta.db_table}")  # noqa: SLF001
+                # The first read after the load sets hint bits, which is WAL too.
+                upsert_items(items)
+                for run, share in enumerate(CHANGED_SHARES, start=1):
+                    changed = int(size * share)
+                    scraped = [
+                        {**item, "selling_price": f"₹{run}.00"}
+                        for item in items[:changed]
+                    ] + items[changed:]
+                    position = wal_position()
+                    started = time.perf_counter()
+                    written = sum(
+                        stats["new"] + stats["changed"] for stats, _ in ingest(scraped)
+                    )
+                    elapsed = time.perf_counter() - started
+                    wal = wal_bytes_since(position) / 2**20
+                    write(
+                        f"{size:>9} {share:>8.0%} {elapsed:>7.2f} {written:>8} "
+                        f"{wal:>7.1f}",
+                    )
+            finally:
+                transaction.set_rollback(True)
+
+
+def add_price_history(after_id, start, end):
+    """
+    ``HISTORY_CHANGES`` observations, evenly spread with some jitter, for each
+    product past ``after_id``.
+    """
+    table = PriceObservation._meta.db_table  # noqa: SLF001
+    products = Product._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (product_id, observed_at, price_paise)
+            SELECT p.id,
+                   %(start)s + (n + random() * 0.9)
+                       * (%(end)s::timestamptz - %(start)s) / %(changes)s,
+                   (10000 + random() * 90000)::integer
+            FROM {products} p, generate_series(0, %(changes)s - 1) AS n
+            WHERE p.id > %(after)s
+            ON CONFLICT DO NOTHING
+            """,  # noqa: S608
+            {"start": start, "end": end, "changes": HISTORY_CHANGES, "after": after_id},
+        )
+        cursor.execute(f"ANALYZE {table}")
+
+
+def price_history_bytes():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT coalesce(sum(pg_total_relation_size(inhrelid)), 0) FROM pg_inherits
+            WHERE inhparent = %s::regclass
+            """,
+            [PriceObservation._meta.db_table],  # noqa: SLF001
+        )
+        return cursor.fetchone()[0]
+
+
+def bench_price_history(sizes, write):
+    """
+    Price history over ``HISTORY_MONTHS`` months, ``HISTORY_CHANGES`` price
+    changes per product: rows and bytes stored per product (a row per day
+    would be about 1,100 of them), and the median time of a product's
+    history at each resolution.
+    """
+    end = timezone.now()
+    start = add_months(end, -HISTORY_MONTHS)
+    header = " ".join(f"{resolution + ' ms':>9}" for resolution in RESOLUTIONS)
+    write(
+        f"{'products':>9} {'rows':>11} {'rows/product':>12} {'bytes/product':>13} "
+        f"{header}",
+    )
+    last_id = 0
+    for size in grow_catalog(sizes):
+        if not last_id:
+            ensure_partitions(start, end)
+            # Only the synthetic history is measured.
+            PriceObservation.objects.all().delete()
+        add_price_history(last_id, start, end)
+        last_id = Product.objects.order_by("-pk").values_list("pk", flat=True).first()
+        rows = PriceObservation.objects.count()
+        products = Product.objects.count()
+        sample = list(
+            Product.objects.order_by("?").values_list("pk", flat=True)[:HISTORY_SAMPLE],
+        )
+        timings = []
+        for resolution in RESOLUTIONS:
+            samples = []
+            for pk in sample:
+                started = time.perf_counter()
+                price_history(pk, resolution)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings.append(statistics.median(samples))
+        write(
+            f"{size:>9} {rows:>11} {rows / products:>12.1f} "
+            f"{price_history_bytes() / products:>13.0f} "
+            + " ".join(f"{timing:>9.2f}" for timing in timings),
+        )
+
+
+BENCHMARKS = {
+    "pagination": bench_pagination,
+    "search": bench_search,
+    "suggest": bench_suggest,
+    "facets": bench_facets,
+    "response-cache": bench_response_cache,
+    "conditional": bench_conditional,
+    "fieldsets": bench_fieldsets,
+    "home": bench_home,
+    "favorite-counters": bench_favorite_counters,
+    "token-auth": bench_token_auth,
+    "similar-products": bench_similar,
+    "product-matching": bench_matching,
+    "ingest": bench_ingest,
+    "ingest-changes": bench_ingest_changes,
+    "ingest-memory": bench_ingest_memory,
+    "price-history": bench_price_history,
+}
@@ -0,0 +1,214 @@
+"""
+Catalog-wide cache versioning.
+
+The catalog only changes when the ingest or classification tasks run, so
+cached catalog data is keyed by a global version number that those tasks bump
+when they finish. Bumping the version invalidates every entry at once; stale
+entries are never read again and simply expire.
+"""
+
+import contextlib
+import hashlib
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "products:catalog-version"
+# When the version was last bumped, in whole seconds: the Last-Modified.
+CATALOG_MODIFIED_KEY = "products:catalog-modified"
+CATALOG_VALIDATOR_KEYS = (CATALOG_VERSION_KEY, CATALOG_MODIFIED_KEY)
+CACHE_TIMEOUT = 60 * 60 * 24
+RESPONSE_CACHE_STATS = ("hits", "misses")
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+async def acatalog_version():
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        return await sync_to_async(catalog_version)()
+    return version
+
+
+def catalog_modified():
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        # Never bumped, or evicted: now is safe, an earlier time could
+        # answer If-Modified-Since with a 304 for content that changed.
+        cache.add(CATALOG_MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = cache.get(CATALOG_MODIFIED_KEY, int(time.time()))
+    return modified
+
+
+def bump_catalog_version():
+    """Invalidate every versioned catalog entry and move Last-Modified on."""
+    # Past the previous one even within the same second, or a client that
+    # fetched earlier in that second would keep getting 304s.
+    modified = max(int(time.time()), (cache.get(CATALOG_MODIFIED_KEY) or 0) + 1)
+    cache.set(CATALOG_MODIFIED_KEY, modified, timeout=None)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # The key was evicted; any fresh number works as long as it moves on.
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+        return 2
+
+
+def params_digest(params, ignore=()):
+    """A stable digest of query parameters, independent of their order."""
+    items = sorted(
+        (key, value)
+        for key in params
+        if key not in ignore
+        for value in params.getlist(key)
+        if value != ""
+    )
+    return hashlib.md5(repr(items).encode(), usedforsecurity=False).hexdigest()
+
+
+def response_key_parts(action, host, lookup, params):
+    """What a cached list/detail response is keyed by, for ``versioned_key()``."""
+    # Pagination links are absolute, so the host is part of the key.
+    return "response", action, host, lookup, params_digest(params)
+
+
+def versioned_key(*parts):
+    return ":".join(["products", f"v{catalog_version()}", *map(str, parts)])
+
+
+async def aversioned_key(*parts):
+    return ":".join(["products", f"v{await acatalog_version()}", *map(str, parts)])
+
+
+def count_response_cache(event):
+    key = f"products:response-cache:{event}"
+    cache.add(key, 0, timeout=None)
+    # Evicted between add() and incr(); losing one count is fine.
+    with contextlib.suppress(ValueError):
+        cache.incr(key)
+
+
+async def acount_response_cache(event):
+    await sync_to_async(count_response_cache)(event)
+
+
+def response_cache_stats():
+    counts = cache.get_many(
+        [f"products:response-cache:{event}" for event in RESPONSE_CACHE_STATS],
+    )
+    stats = {
+        event: counts.get(f"products:response-cache:{event}", 0)
+        for event in RESPONSE_CACHE_STATS
+    }
+    total = stats["hits"] + stats["misses"]
+    return {
+        "catalog_version": catalog_version(),
+        **stats,
+        "hit_ratio": round(stats["hits"] / total, 4) if total else None,
+    }
+
+
+def catalog_validators():
+    """
+    ETag and Last-Modified for anything derived from the catalog, both moved
+    on by ``bump_catalog_version()``; reading them takes no query.
+    """
+    values = cache.get_many(CATALOG_VALIDATOR_KEYS)
+    if len(values) < len(CATALOG_VALIDATOR_KEYS):
+        return catalog_etag(catalog_version(), catalog_modified())
+    return catalog_etag(*(values[key] for key in CATALOG_VALIDATOR_KEYS))
+
+
+async def acatalog_validators():
+    values = await cache.aget_many(CATALOG_VALIDATOR_KEYS)
+    if len(values) < len(CATALOG_VALIDATOR_KEYS):
+        return await sync_to_async(catalog_validators)()
+    return catalog_etag(*(values[key] for key in CATALOG_VALIDATOR_KEYS))
+
+
+def catalog_etag(version, last_modified):
+    # Both parts: an evicted version starts again from 1, but the time it
+    # is recreated at does not repeat.
+    return f'W/"catalog-{version}-{last_modified}"', last_modified
+
+
+def patch_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        # Per user (the API needs a login), and always revalidated.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalCatalogMixin:
+    """
+    Conditional GET for catalog endpoints: ``If-None-Match`` and
+    ``If-Modified-Since`` are answered with a 304 before any queryset is built.
+    """
+
+    def get_validators(self, request):
+        return catalog_validators()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return patch_validators(response, etag, last_modified)
+
+
+class CachedResponseMixin(ConditionalCatalogMixin):
+    """
+    Serve ``list`` and ``retrieve`` from the cache, keyed by the normalised
+    query parameters and the catalog version. A hit returns the stored
+    response data without building a queryset.
+    """
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field, "")
+        parts = response_key_parts(
+            self.action,
+            request.get_host(),
+            lookup,
+            request.query_params,
+        )
+        key = versioned_key(*parts)
+        data = cache.get(key)
+        if data is not None:
+            count_response_cache("hits")
+            return Response(data)
+
+        count_response_cache("misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:  # noqa: PLR2004
+            cache.set(key, response.data, CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(self.cached_response, super().list),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        handler = partial(self.cached_response, super().retrieve)
+        return self.conditional_response(handler, request, *args, **kwargs)
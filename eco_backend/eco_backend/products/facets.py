@@ -0,0 +1,45 @@
+"""
+Facet counts for the product filters.
+
+One ``GROUPING SETS`` aggregate over the filtered product queryset yields the
+per-value counts of every facet dimension in a single pass.
+"""
+
+from django.db import connection
+
+FACET_FIELDS = ["brand", "category", "sub_category", "seller"]
+
+
+def facet_counts(queryset):
+    """
+    Return ``{field: [{"value": ..., "count": ...}, ...]}`` for every facet
+    field, most common values first. Empty values are left out since they
+    cannot be filtered on.
+    """
+    inner_sql, params = (
+        queryset.order_by().values(*FACET_FIELDS).query.sql_with_params()
+    )
+    columns = ", ".join(connection.ops.quote_name(field) for field in FACET_FIELDS)
+    grouped = ", ".join(
+        f"GROUPING({connection.ops.quote_name(field)})" for field in FACET_FIELDS
+    )
+    sets = ", ".join(f"({connection.ops.quote_name(field)})" for field in FACET_FIELDS)
+    sql = (
+        f"SELECT {columns}, {grouped}, COUNT(*) FROM ({inner_sql}) AS listed "  # noqa: S608
+        f"GROUP BY GROUPING SETS ({sets})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    width = len(FACET_FIELDS)
+    facets = {field: [] for field in FACET_FIELDS}
+    for row in rows:
+        values, grouping, count = row[:width], row[width : width * 2], row[-1]
+        # GROUPING(col) is 0 for the one column this row is grouped by.
+        index = grouping.index(0)
+        if values[index] not in (None, ""):
+            facets[FACET_FIELDS[index]].append({"value": values[index], "count": count})
+    for buckets in facets.values():
+        buckets.sort(key=lambda bucket: (-bucket["count"], bucket["value"]))
+    return facets
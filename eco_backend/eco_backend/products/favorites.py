@@ -0,0 +1,106 @@
+"""
+Favorite product ids per user, cached.
+
+Product list and detail responses are cached once for every user (see
+``cache.py``), so their ``is_favorite`` flags are filled in per request from
+this id list: one cache read rather than a query, or a download of every
+nested favorite on the client. The favorites endpoints drop a user's entry
+whenever they change that user's favorites.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+
+from eco_backend.products.cache import CACHE_TIMEOUT
+from eco_backend.products.models import UserFavorite
+
+
+def favorite_ids_key(user_pk):
+    return f"products:favorite-ids:{user_pk}"
+
+
+def favorite_product_ids(user):
+    """Sorted ids of the products ``user`` has favorited."""
+    if not user.is_authenticated:
+        return []
+    key = favorite_ids_key(user.pk)
+    product_ids = cache.get(key)
+    if product_ids is None:
+        product_ids = list(
+            UserFavorite.objects.filter(user=user)
+            .order_by("product_id")
+            .values_list("product_id", flat=True),
+        )
+        cache.set(key, product_ids, CACHE_TIMEOUT)
+    return product_ids
+
+
+async def afavorite_product_ids(user):
+    if not user.is_authenticated:
+        return []
+    product_ids = await cache.aget(favorite_ids_key(user.pk))
+    if product_ids is None:
+        product_ids = [
+            product_id
+            async for product_id in UserFavorite.objects.filter(user=user)
+            .order_by("product_id")
+            .values_list("product_id", flat=True)
+        ]
+        await cache.aset(favorite_ids_key(user.pk), product_ids, CACHE_TIMEOUT)
+    return product_ids
+
+
+def forget_favorite_ids(user):
+    cache.delete(favorite_ids_key(user.pk))
+
+
+def favorites_etag(etag, product_ids):
+    """``etag`` extended with a short fingerprint of the favorites ``product_ids``."""
+    ids = ",".join(map(str, product_ids))
+    digest = hashlib.md5(ids.encode(), usedforsecurity=False).hexdigest()[:12]
+    return f'{etag[:-1]}-{digest}"'
+
+
+def favorites_validators(validators, product_ids):
+    """
+    Catalog ``(etag, last_modified)`` for a response carrying ``is_favorite``
+    flags.
+    """
+    etag, last_modified = validators
+    return favorites_etag(etag, product_ids), last_modified
+
+
+def serialized_fields(fields):
+    """
+    Serializer fields for the requested ``fields``: ``is_favorite`` is looked
+    up by ``id``, so it brings the id along.
+    """
+    if fields is not None and "is_favorite" in fields and "id" not in fields:
+        return [*fields, "id"]
+    return fields
+
+
+def mark_requested_favorites(data, fields, product_ids):
+    """
+    ``mark_favorites()``, unless ``fields`` (None for all) leaves
+    ``is_favorite`` out. Ids serialized only for the flag are dropped again.
+    """
+    if fields is None or "is_favorite" in fields:
+        mark_favorites(data, product_ids)
+        if fields is not None and "id" not in fields:
+            for row in product_rows(data):
+                row.pop("id", None)
+
+
+def mark_favorites(data, product_ids):
+    """Set ``is_favorite`` on the serialized products of a list or detail response."""
+    product_ids = set(product_ids)
+    for row in product_rows(data):
+        if "id" in row:
+            row["is_favorite"] = row["id"] in product_ids
+
+
+def product_rows(data):
+    """The serialized products of a list or detail response."""
+    return data.get("results", [data]) if isinstance(data, dict) else data
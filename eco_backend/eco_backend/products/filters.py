@@ -0,0 +1,72 @@
+import django_filters
+from rest_framework import filters
+
+from .models import Product
+from .search import search_products
+
+
+class RupeeFilter(django_filters.NumberFilter):
+    """Takes an amount in rupees and filters the matching paise column."""
+
+    def filter(self, qs, value):
+        if value is not None:
+            value = int(value * 100)
+        return super().filter(qs, value)
+
+
+class ProductFilter(django_filters.FilterSet):
+    min_price = RupeeFilter(field_name="price_paise", lookup_expr="gte")
+    max_price = RupeeFilter(field_name="price_paise", lookup_expr="lte")
+    min_rating = django_filters.NumberFilter(
+        field_name="rating_value",
+        lookup_expr="gte",
+    )
+    min_discount = django_filters.NumberFilter(
+        field_name="discount_percent",
+        lookup_expr="gte",
+    )
+
+    class Meta:
+        model = Product
+        fields = ["brand", "category", "sub_category", "seller"]
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the stored tsvector instead of ILIKE."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_products(queryset, " ".join(terms))
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """
+    Accepts the public field names (``?ordering=-selling_price``) but sorts on
+    the typed, indexed columns behind them.
+    """
+
+    ordering_aliases = {
+        "selling_price": "price_paise",
+        "rating": "rating_value",
+        "discount": "discount_percent",
+        "popularity": "favorite_count",
+    }
+
+    def get_default_ordering(self, view):
+        # Search results keep their relevance order unless asked otherwise.
+        if ProductSearchFilter().get_search_terms(view.request):
+            return None
+        return super().get_default_ordering(view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [self._resolve_alias(term) for term in ordering]
+
+    def _resolve_alias(self, term):
+        prefix = "-" if term.startswith("-") else ""
+        field = term.lstrip("-")
+        return prefix + self.ordering_aliases.get(field, field)
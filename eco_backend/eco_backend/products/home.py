@@ -0,0 +1,69 @@
+"""
+The home page snapshot served by ``/api/home/``.
+
+Featured products, the largest categories and a few catalog totals are
+computed once after every ingest or classification run and stored as a single
+cache entry, so a home page visit costs one cache read.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models import Max
+from django.utils import timezone
+
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import Product
+from eco_backend.products.serializers import ProductSerializer
+
+HOME_CACHE_KEY = "products:home"
+FEATURED_COUNT = 12
+TOP_CATEGORY_COUNT = 6
+
+
+def build_home_snapshot():
+    listed = Product.objects.filter(LISTED)
+    featured = (
+        listed.filter(rating_value__isnull=False)
+        .order_by("-rating_value", "-id")
+        .only(*ProductSerializer.CARD_FIELDS)[:FEATURED_COUNT]
+    )
+    categories = (
+        listed.exclude(category__isnull=True)
+        .exclude(category="")
+        .values("category")
+        .annotate(count=Count("id"))
+        .order_by("-count", "category")[:TOP_CATEGORY_COUNT]
+    )
+    stats = listed.aggregate(
+        products=Count("id"),
+        brands=Count("brand", distinct=True),
+        sellers=Count("seller", distinct=True),
+        last_scraped_at=Max("scraped_at"),
+    )
+    return {
+        "featured": ProductSerializer(
+            featured,
+            many=True,
+            fields=ProductSerializer.CARD_FIELDS,
+        ).data,
+        "categories": [
+            {"value": row["category"], "count": row["count"]} for row in categories
+        ],
+        "stats": stats,
+        "generated_at": timezone.now(),
+    }
+
+
+def rebuild_home_snapshot():
+    """Recompute the snapshot and store it until the next rebuild."""
+    snapshot = build_home_snapshot()
+    cache.set(HOME_CACHE_KEY, snapshot, timeout=None)
+    return snapshot
+
+
+def home_snapshot():
+    snapshot = cache.get(HOME_CACHE_KEY)
+    if snapshot is None:
+        # First visit after a cache flush.
+        snapshot = rebuild_home_snapshot()
+    return snapshot
@@ -0,0 +1,340 @@
+"""
+Writing scraped items to ``Product``, a batch at a time.
+
+A batch is one ``INSERT ... ON CONFLICT (product_link) DO UPDATE`` for all
+of its products, which also returns the prices they had before (for
+price-drop alerts and live price updates), where ``update_or_create`` took
+a SELECT, a write and a savepoint per item. The columns are sent as one
+array each, so the statement stays small however big the batch. Items
+without a title or link are counted as failed; if the database rejects a
+batch (a value too long for its column, say), it is written again an item
+at a time so only the bad ones are lost.
+
+Most products are the same as last night, so each one carries a
+``fingerprint`` of its scraped fields and only those whose fingerprint
+changed are rewritten: a run writes as many rows as changed, whatever the
+size of the catalog. For the same reason products are not stamped every
+time they are seen; an ``IngestRun`` records each run, and once a run
+misses a product its seller listed, ``last_seen`` is set to when the run
+before started. Each row's search vector is written by the same statement
+as the row, and new prices are appended to the price history (see
+price_history.py) in the same transaction, so a change is never saved
+without them.
+
+A product that ``PRODUCT_INACTIVE_AFTER_RUNS`` runs in a row missed is
+marked inactive, which takes it out of the API and its indexes (see
+``LISTED``), and ``PRODUCT_RETENTION_DAYS`` later it is deleted. One that
+comes back is active again.
+"""
+
+import hashlib
+import logging
+from itertools import batched
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import connection
+from django.db import models
+from django.db import transaction
+from django.utils import timezone
+
+from eco_backend.products.models import IngestRun
+from eco_backend.products.models import Product
+from eco_backend.products.price_history import ensure_partitions
+from eco_backend.products.price_history import record_prices
+from eco_backend.products.search import search_vector_sql
+from eco_backend.products.utils.normalize import numeric_fields
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = 1000
+# What the scrapers return for each product, besides its link.
+SCRAPED_FIELDS = [
+    "title",
+    "brand",
+    "selling_price",
+    "cost_price",
+    "img_url",
+    "discount",
+    "rating",
+    "description",
+    "category",
+    "sub_category",
+    "seller",
+]
+UPDATE_FIELDS = [
+    *SCRAPED_FIELDS,
+    "price_paise",
+    "cost_price_paise",
+    "discount_percent",
+    "rating_value",
+    "fingerprint",
+]
+RUN_SUMMARY = ["new", "changed", "unchanged", "disappeared", "deactivated", "failed"]
+PURGE_BATCH_SIZE = 1000
+
+
+def fingerprint(item):
+    """
+    Hash of the scraped fields of ``item``, whitespace normalised, to tell
+    whether it changed.
+    """
+    values = [" ".join(str(item.get(name) or "").split()) for name in SCRAPED_FIELDS]
+    return hashlib.blake2b("\x1f".join(values).encode(), digest_size=16).hexdigest()
+
+
+def scraped_product(item):
+    """An unsaved ``Product`` for a scraped item, or None if it has no title or link."""
+    if not item.get("title") or not item.get("product_link"):
+        return None
+    fields = {name: item.get(name) for name in SCRAPED_FIELDS}
+    return Product(
+        product_link=item["product_link"],
+        fingerprint=fingerprint(item),
+        **fields,
+        **numeric_fields(item),
+    )
+
+
+def array_type(field):
+    # Text, not varchar(n): a cast to varchar(n) would cut long values short
+    # where the column rejects them.
+    return (
+        "text"
+        if isinstance(field, models.CharField | models.TextField)
+        else field.db_type(connection)
+    )
+
+
+def upsert(products):
+    """
+    Insert new ``products`` and update changed ones, search vector included,
+    in one statement, their columns sent as arrays; unchanged ones are left
+    alone. Returns
+    ``{product_link: (pk, "new" | "changed" | "unchanged", old price_paise)}``.
+    """
+    table = Product._meta.db_table  # noqa: SLF001
+    fields = [
+        Product._meta.get_field(name)  # noqa: SLF001
+        for name in ["product_link", *UPDATE_FIELDS]
+    ]
+    columns = ", ".join(field.column for field in fields)
+    arrays = ", ".join(f"%s::{array_type(field)}[]" for field in fields)
+    updates = ", ".join(
+        f"{field.column} = EXCLUDED.{field.column}" for field in fields[1:]
+    )
+    with connection.cursor() as cursor:
+        # Every part of the statement sees the table as it was before it, and
+        # each row is written by one part at most.
+        cursor.execute(
+            f"""
+            WITH scraped AS (SELECT * FROM unnest({arrays}) AS s({columns})),
+            old AS (
+                SELECT {table}.id, {table}.product_link, {table}.price_paise,
+                       {table}.fingerprint = scraped.fingerprint AS unchanged,
+                       {table}.last_seen
+                FROM {table} JOIN scraped USING (product_link)
+            ),
+            upserted AS (
+                INSERT INTO {table}
+                    ({columns}, search_vector, scraped_at, last_changed,
+                     favorite_count)
+                SELECT scraped.*, {search_vector_sql("scraped")}, now(), now(), 0
+                FROM scraped
+                ON CONFLICT (product_link) DO UPDATE
+                SET {updates}, search_vector = EXCLUDED.search_vector,
+                    last_changed = now(), last_seen = NULL, inactive_since = NULL
+                WHERE {table}.fingerprint <> EXCLUDED.fingerprint
+                RETURNING id, product_link
+            ),
+            -- Back on sale as it was.
+            reappeared AS (
+                UPDATE {table} SET last_seen = NULL, inactive_since = NULL FROM old
+                WHERE {table}.id = old.id AND old.unchanged
+                AND old.last_seen IS NOT NULL
+            )
+            SELECT scraped.product_link, coalesce(upserted.id, old.id),
+                   CASE WHEN old.id IS NULL THEN 'new'
+                        WHEN old.unchanged THEN 'unchanged' ELSE 'changed' END,
+                   old.price_paise
+            FROM scraped LEFT JOIN old USING (product_link)
+            LEFT JOIN upserted USING (product_link)
+            """,  # noqa: S608
+            [
+                [getattr(product, field.attname) for product in products]
+                for field in fields
+            ],
+        )
+        return {link: row for link, *row in cursor.fetchall()}
+
+
+def save_products(products, observed_at):
+    """
+    ``upsert()`` ``products`` and record the prices that moved, in one
+    transaction.
+    """
+    with transaction.atomic():
+        rows = upsert(products)
+        prices = {product.product_link: product.price_paise for product in products}
+        record_prices(
+            [
+                (pk, prices[link])
+                for link, (pk, status, old_price) in rows.items()
+                if (status == "new" and prices[link] is not None)
+                or (status == "changed" and prices[link] != old_price)
+            ],
+            observed_at,
+        )
+    return rows
+
+
+def upsert_batch(items):
+    """
+    Write one batch of scraped items. Returns ``(stats, saved)``: the new,
+    changed, unchanged and failed counts, items sharing a link counted once,
+    and ``(product, status, old price_paise)`` for every product saved or
+    found unchanged, the old price None for new ones.
+    """
+    products = {}
+    failed = 0
+    for item in items:
+        product = scraped_product(item)
+        if product is None:
+            failed += 1
+            continue
+        # ON CONFLICT cannot change a row twice in one statement; the last wins.
+        products.pop(product.product_link, None)
+        products[product.product_link] = product
+
+    observed_at = timezone.now()
+    # Created outside the transaction, so that this process remembers it.
+    ensure_partitions(observed_at, observed_at)
+    try:
+        rows = save_products(list(products.values()), observed_at) if products else {}
+    except DatabaseError:
+        logger.warning(
+            "Batch of %d products rejected, saving them one by one",
+            len(products),
+            exc_info=True,
+        )
+        rows = {}
+        for product in products.values():
+            try:
+                rows.update(save_products([product], observed_at))
+            except DatabaseError:
+                logger.warning("Could not save %s", product.product_link, exc_info=True)
+
+    saved = []
+    stats = {
+        "new": 0,
+        "changed": 0,
+        "unchanged": 0,
+        "failed": failed + len(products) - len(rows),
+    }
+    for link, product in products.items():
+        if link not in rows:
+            continue
+        pk, status, old_price = rows[link]
+        product.pk = pk
+        product._state.adding = False  # noqa: SLF001
+        saved.append((product, status, old_price))
+        stats[status] += 1
+    return stats, saved
+
+
+def ingest(items, batch_size=INGEST_BATCH_SIZE):
+    """
+    Write scraped ``items``, yielding ``upsert_batch()``'s ``(stats, saved)``
+    as each batch is done.
+    """
+    for batch in batched(items, batch_size, strict=False):
+        yield upsert_batch(batch)
+
+
+def mark_disappeared(run, seen_ids):
+    """
+    Stamp ``last_seen`` on the products of ``run.sellers`` that the run did
+    not return, with the start of the run before it, the last to see them;
+    returns how many there are.
+    """
+    previous = (
+        IngestRun.objects.filter(
+            scraper=run.scraper,
+            started_at__lt=run.started_at,
+            finished_at__isnull=False,
+        )
+        .order_by("-started_at")
+        .values_list("started_at", flat=True)
+        .first()
+    )
+    table = Product._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET last_seen = coalesce(%s, last_changed, scraped_at)
+            WHERE seller = ANY(%s) AND last_seen IS NULL
+            AND id NOT IN (SELECT unnest(%s::bigint[]))
+            """,  # noqa: S608
+            [previous, run.sellers, list(seen_ids)],
+        )
+        return cursor.rowcount
+
+
+def deactivate_missing(run, runs):
+    """
+    Mark inactive the products of ``run.sellers`` that their seller's last
+    ``runs`` finished runs all missed; returns how many there are.
+    """
+    table = Product._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH runs AS (
+                SELECT seller, started_at, row_number()
+                       OVER (PARTITION BY seller ORDER BY started_at DESC) AS n
+                FROM {IngestRun._meta.db_table}, unnest(sellers) AS seller
+                WHERE scraper = %(scraper)s AND finished_at IS NOT NULL
+                AND seller = ANY(%(sellers)s)
+            ),
+            -- When the last ``runs`` runs of each seller with that many began.
+            cutoff AS (
+                SELECT seller, min(started_at) AS since FROM runs WHERE n <= %(runs)s
+                GROUP BY seller HAVING count(*) = %(runs)s
+            )
+            UPDATE {table} SET inactive_since = now() FROM cutoff
+            WHERE {table}.seller = cutoff.seller AND {table}.inactive_since IS NULL
+            AND {table}.last_seen < cutoff.since
+            """,  # noqa: S608, SLF001
+            {"scraper": run.scraper, "sellers": run.sellers, "runs": runs},
+        )
+        return cursor.rowcount
+
+
+def purge_inactive_products(before, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete the products inactive since before ``before``, with their
+    favorites, alerts and price history, a batch per transaction; returns
+    how many there were.
+    """
+    purged = 0
+    stale = Product.objects.filter(inactive_since__lt=before)
+    while batch := list(stale.values_list("pk", flat=True)[:batch_size]):
+        Product.objects.filter(pk__in=batch).delete()
+        purged += len(batch)
+    return purged
+
+
+def finish_run(run, stats, seen_ids):
+    """
+    Record the disappeared and deactivated products and ``stats`` of ``run``;
+    returns its diff summary.
+    """
+    run.disappeared = mark_disappeared(run, seen_ids)
+    for name, count in stats.items():
+        setattr(run, name, count)
+    run.finished_at = timezone.now()
+    run.save()
+    # Once saved as finished, with its sellers, the run counts as one of theirs.
+    run.deactivated = deactivate_missing(run, settings.PRODUCT_INACTIVE_AFTER_RUNS)
+    run.save(update_fields=["deactivated"])
+    return {name: getattr(run, name) for name in RUN_SUMMARY}
@@ -0,0 +1,69 @@
+"""
+Live updates for websocket clients (see ``config/websocket.py``).
+
+Publishers (the Celery tasks, mostly) send each update to a Redis pub/sub
+channel named after its topic. Every ASGI worker holds one pattern
+subscription to those channels and fans the updates out to its own clients,
+so any number of uvicorn workers share one stream.
+
+Topics:
+    catalog         the catalog version was bumped; cached data is stale
+    scrape          progress of ingest runs
+    price:<id>      the price of one product changed
+"""
+
+import json
+import logging
+import re
+from functools import cache
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "live:"
+CATALOG = "catalog"
+SCRAPE = "scrape"
+TOPIC_PATTERN = re.compile(r"catalog|scrape|price:[1-9]\d{0,18}")
+
+
+def price_topic(product_id):
+    return f"price:{product_id}"
+
+
+def is_topic(topic):
+    return isinstance(topic, str) and TOPIC_PATTERN.fullmatch(topic) is not None
+
+
+def encode_update(topic, data):
+    """
+    The text frame clients receive; encoded once by the publisher, never per
+    client.
+    """
+    return json.dumps({"topic": topic, "data": data}, separators=(",", ":"))
+
+
+@cache
+def redis_client():
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def publish_many(updates):
+    """
+    Publish ``(topic, data)`` pairs in one round trip. Live updates are best
+    effort.
+    """
+    if not updates:
+        return
+    try:
+        pipe = redis_client().pipeline(transaction=False)
+        for topic, data in updates:
+            pipe.publish(f"{CHANNEL_PREFIX}{topic}", encode_update(topic, data))
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not publish %d live updates", len(updates), exc_info=True)
+
+
+def publish(topic, data):
+    publish_many([(topic, data)])
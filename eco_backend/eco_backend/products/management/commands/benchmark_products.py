@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from eco_backend.products.benchmarks import BENCHMARKS
+from eco_backend.products.benchmarks import DEFAULT_SIZES
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark catalog queries against a synthetic catalog "
+        "(rolled back afterwards)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=DEFAULT_SIZES,
+            help="Catalog sizes to measure, in rows.",
+        )
+
+    def handle(self, *args, **options):
+        # Requests are built in-process by APIRequestFactory for "testserver".
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            BENCHMARKS[options["benchmark"]](options["sizes"], self.stdout.write)
@@ -0,0 +1,103 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from eco_backend.products.benchmarks import benchmark_user
+from eco_backend.products.benchmarks import grow_catalog
+from eco_backend.products.query_plans import BASELINE_PATH
+from eco_backend.products.query_plans import explain_shapes
+from eco_backend.products.query_plans import find_regressions
+from eco_backend.products.query_plans import load_baseline
+from eco_backend.products.query_plans import save_baseline
+from eco_backend.products.query_plans import shape_costs
+from eco_backend.products.query_plans import shape_rows_read
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN ANALYZE every API query shape on a synthetic catalog "
+        "and flag scans or plan regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=100_000,
+            help="Catalog size to explain against, in rows.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=BASELINE_PATH,
+            help="Baseline file of rows read per shape.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help=(
+                "Record the measured rows read as the new baseline "
+                "instead of comparing."
+            ),
+        )
+        parser.add_argument(
+            "--sql",
+            action="store_true",
+            help="Print every explained statement.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = load_baseline(options["baseline"])
+        if (
+            baseline["catalog_size"] not in (None, options["size"])
+            and not options["update_baseline"]
+        ):
+            self.stderr.write(
+                f"The baseline was recorded at {baseline['catalog_size']} rows "
+                "and will not compare.",
+            )
+
+        # Requests are built in-process by APIRequestFactory for "testserver".
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for _ in grow_catalog([options["size"]]):
+                plans = explain_shapes(benchmark_user())
+
+        costs = shape_costs(plans)
+        rows_read = shape_rows_read(plans)
+        width = max(map(len, plans))
+        self.stdout.write(
+            f"{'shape':<{width}} {'stmts':>5} {'cost':>10} {'ms':>8} {'buffers':>8} "
+            f"{'rows read':>10} "
+            f"{'baseline':>10}  seq scans",
+        )
+        for name, statements in plans.items():
+            expected = baseline["rows_read"].get(name, "-")
+            scans = ", ".join(
+                sorted(
+                    {
+                        table
+                        for statement in statements
+                        for table in statement["seq_scans"]
+                    },
+                ),
+            )
+            self.stdout.write(
+                f"{name:<{width}} {len(statements):>5} {costs[name]:>10.0f} "
+                f"{sum(s['ms'] for s in statements):>8.2f} "
+                f"{sum(s['buffers'] for s in statements):>8} "
+                f"{rows_read[name]:>10} {expected:>10}  {scans}",
+            )
+            if options["sql"]:
+                for statement in statements:
+                    self.stdout.write(f"    {statement['sql']}")
+
+        if options["update_baseline"]:
+            save_baseline(plans, options["size"], options["baseline"])
+            self.stdout.write(f"Baseline written to {options['baseline']}.")
+            return
+
+        problems = find_regressions(plans, baseline)
+        if problems:
+            raise CommandError("Query plan regressions:\n" + "\n".join(problems))
+        self.stdout.write(
+            self.style.SUCCESS("No sequential scans or plan regressions."),
+        )
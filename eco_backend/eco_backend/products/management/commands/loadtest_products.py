@@ -0,0 +1,166 @@
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+
+from eco_backend.products.benchmarks import benchmark_user
+from eco_backend.products.management.commands.loadtest_websocket import wait_for_port
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import Product
+
+MODES = {"sync": "False", "async": "True"}
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection that times GETs until ``deadline``."""
+
+    def __init__(self, port, token):
+        self.port = port
+        self.headers = (
+            "Host: 127.0.0.1\r\nAccept: application/json\r\n"
+            f"Authorization: Token {token}\r\n\r\n"
+        )
+        self.latencies = []
+        self.errors = 0
+
+    async def run(self, paths, deadline, offset):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            number = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                status = await self.get(reader, writer, paths[number % len(paths)])
+                self.latencies.append((time.perf_counter() - started) * 1000)
+                self.errors += status != 200  # noqa: PLR2004
+                number += 1
+        finally:
+            writer.close()
+
+    async def get(self, reader, writer, path):
+        writer.write(f"GET {path} HTTP/1.1\r\n{self.headers}".encode())
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        return status
+
+
+class Command(BaseCommand):
+    help = (
+        "Start one uvicorn worker with the sync DRF product views, then with the "
+        "async read path, and compare throughput and latency of cached product "
+        "reads at each concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            nargs="+",
+            type=int,
+            default=[50, 200, 500],
+            help="Simultaneous keep-alive clients to measure.",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=10,
+            help="Duration of each measurement.",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=20,
+            help="Product detail pages in the request mix.",
+        )
+        parser.add_argument("--port", type=int, default=8766)
+
+    def handle(self, *args, **options):
+        product_ids = list(
+            Product.objects.filter(LISTED).values_list("id", flat=True)[
+                : options["products"]
+            ],
+        )
+        paths = [
+            "/api/products/?view=card",
+            "/api/products/?view=card&ordering=-rating",
+            "/api/products/facets/",
+            *(f"/api/products/{product_id}/" for product_id in product_ids),
+        ]
+        token, created = Token.objects.get_or_create(user=benchmark_user())
+        self.stdout.write(
+            f"{'mode':>6} {'clients':>8} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>8} "
+            f"{'errors':>7}",
+        )
+        try:
+            for mode, async_reads in MODES.items():
+                self.measure(mode, async_reads, paths, token.key, options)
+        finally:
+            if created:
+                token.delete()
+
+    def measure(self, mode, async_reads, paths, token, options):
+        server = subprocess.Popen(  # noqa: S603
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "config.asgi:application",
+                "--port",
+                str(options["port"]),
+                "--log-level",
+                "warning",
+                "--backlog",
+                "4096",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_ASYNC_PRODUCT_READS": async_reads},
+        )
+        try:
+            wait_for_port(options["port"])
+            # Fill the response cache first: this compares serving reads, not
+            # building them.
+            asyncio.run(self.warm(paths, token, options["port"]))
+            for concurrency in options["concurrency"]:
+                clients, elapsed = asyncio.run(
+                    self.load(paths, token, concurrency, options),
+                )
+                latencies = [
+                    latency for client in clients for latency in client.latencies
+                ]
+                errors = sum(client.errors for client in clients)
+                quantiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f"{mode:>6} {concurrency:>8} {len(latencies) / elapsed:>8.0f} "
+                    f"{quantiles[49]:>7.2f} {quantiles[98]:>8.2f} {errors:>7}",
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    async def warm(self, paths, token, port):
+        client = Client(port, token)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for path in paths:
+            await client.get(reader, writer, path)
+        writer.close()
+
+    async def load(self, paths, token, concurrency, options):
+        clients = [Client(options["port"], token) for _ in range(concurrency)]
+        started = time.perf_counter()
+        deadline = started + options["seconds"]
+        await asyncio.gather(
+            *(
+                client.run(paths, deadline, number)
+                for number, client in enumerate(clients)
+            ),
+        )
+        return clients, time.perf_counter() - started
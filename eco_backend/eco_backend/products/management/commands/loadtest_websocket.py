@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+from websockets.asyncio.client import connect
+
+from eco_backend.products.benchmarks import benchmark_user
+from eco_backend.products.live import price_topic
+from eco_backend.products.live import publish
+
+# No product has this id, so nothing but the load test listens to it.
+LOADTEST_TOPIC = price_topic(10**15)
+CONNECT_BATCH = 200
+
+
+def server_rss_mb(pid):
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    msg = f"The websocket server did not start on port {port}"
+    raise TimeoutError(msg)
+
+
+class Subscribers:
+    """Idle websocket clients that record when each broadcast reaches them."""
+
+    def __init__(self, url):
+        self.url = url
+        self.sockets = []
+        self.readers = []
+        self.arrivals = []
+        self.complete = asyncio.Event()
+
+    async def open(self, count):
+        while len(self.sockets) < count:
+            batch = min(CONNECT_BATCH, count - len(self.sockets))
+            await asyncio.gather(*(self.open_one() for _ in range(batch)))
+
+    async def open_one(self):
+        ws = await connect(self.url, open_timeout=60, ping_interval=None)
+        await ws.send(json.dumps({"action": "subscribe", "topics": [LOADTEST_TOPIC]}))
+        await ws.recv()
+        self.sockets.append(ws)
+        self.readers.append(asyncio.create_task(self.read(ws)))
+
+    async def read(self, ws):
+        async for _ in ws:
+            self.arrivals.append(time.perf_counter())
+            if len(self.arrivals) == len(self.sockets):
+                self.complete.set()
+
+    async def broadcast(self, number):
+        """
+        Publish one update and return the delay until each subscriber got it,
+        in ms.
+        """
+        self.arrivals = []
+        self.complete.clear()
+        started = time.perf_counter()
+        await asyncio.to_thread(publish, LOADTEST_TOPIC, {"broadcast": number})
+        await asyncio.wait_for(self.complete.wait(), timeout=60)
+        return [(arrival - started) * 1000 for arrival in self.arrivals]
+
+    async def close(self):
+        for reader in self.readers:
+            reader.cancel()
+        await asyncio.gather(
+            *(ws.close() for ws in self.sockets),
+            return_exceptions=True,
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Start one uvicorn worker, hold idle websocket subscribers on it and time "
+        "broadcasts to all of them. The clients run in this process, so latencies "
+        "include their own scheduling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--connections",
+            nargs="+",
+            type=int,
+            default=[1000, 5000, 10000],
+            help="Subscriber counts to measure, opened one after the other.",
+        )
+        parser.add_argument(
+            "--broadcasts",
+            type=int,
+            default=10,
+            help="Broadcasts timed per subscriber count.",
+        )
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        token, created = Token.objects.get_or_create(user=benchmark_user())
+        server = subprocess.Popen(  # noqa: S603
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "config.asgi:application",
+                "--port",
+                str(options["port"]),
+                "--log-level",
+                "warning",
+                "--ws",
+                "websockets",
+                "--backlog",
+                "4096",
+            ],
+            cwd=settings.BASE_DIR,
+            env=os.environ,
+        )
+        try:
+            wait_for_port(options["port"])
+            url = f"ws://127.0.0.1:{options['port']}/ws/?token={token.key}"
+            asyncio.run(self.measure(url, server.pid, options))
+        finally:
+            server.terminate()
+            server.wait()
+            if created:
+                token.delete()
+
+    async def measure(self, url, pid, options):
+        subscribers = Subscribers(url)
+        idle_mb = server_rss_mb(pid)
+        self.stdout.write(
+            f"{'subscribers':>11} {'server MB':>10} {'KB/conn':>8} {'p50 ms':>7} "
+            f"{'p99 ms':>7} {'all ms':>7}",
+        )
+        try:
+            for count in sorted(options["connections"]):
+                await subscribers.open(count)
+                await asyncio.sleep(1)
+                rss = server_rss_mb(pid)
+                delays = []
+                finished = []
+                for number in range(options["broadcasts"]):
+                    received = await subscribers.broadcast(number)
+                    delays.extend(received)
+                    finished.append(max(received))
+                quantiles = statistics.quantiles(delays, n=100)
+                self.stdout.write(
+                    f"{count:>11} {rss:>10.1f} {(rss - idle_mb) * 1024 / count:>8.1f} "
+                    f"{quantiles[49]:>7.2f} {quantiles[98]:>7.2f} "
+                    f"{statistics.median(finished):>7.2f}",
+                )
+        finally:
+            await subscribers.close()
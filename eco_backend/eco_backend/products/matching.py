@@ -0,0 +1,434 @@
+"""
+Cross-seller matching: the same product listed by several sellers is put in
+one ``ProductGroup``, so ``/api/products/{id}/offers/`` can compare prices.
+
+Listings match when their titles are near-duplicates:
+
+- A title is reduced to the character trigrams of its words, less the
+  brand and filler words ("pack of", "ml", "eco friendly", ...), so word order,
+  brand prefixes and the odd typo do not matter; a title opening with a
+  brand known from other listings is taken to be of that brand. Its numbers (pack sizes,
+  volumes) and brand must agree exactly: "Pack of 2" is not "Pack of 4".
+- Comparing every pair of listings would be quadratic, so each title gets a
+  MinHash signature of ``NUM_PERM`` values and locality-sensitive hashing
+  buckets the signatures by ``BANDS`` bands. Only listings by different
+  sellers that share a bucket are compared, and they match when their
+  estimated trigram Jaccard similarity reaches ``MATCH_THRESHOLD``.
+- Matches are merged into groups best first, never two listings of one
+  seller, or two brands, in a group.
+
+The groups are recomputed from scratch after every ingest, but stored as a
+diff: a new group keeps the id of the old group most of its listings were
+in, and only the listings whose group changed are written. Runs take a
+lock to write, so two of them never update the same rows in turn.
+"""
+
+import re
+import zlib
+from array import array
+from functools import cache
+
+import numpy as np
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import Product
+from eco_backend.products.models import ProductGroup
+
+NUM_PERM = 60
+# 20 bands of 3 values: listings with a trigram Jaccard of 0.6 share a bucket
+# 99% of the time, at 0.3 under half of the time.
+BANDS = 20
+MATCH_THRESHOLD = 0.6
+# Titles that common all look alike; comparing more of them finds nothing new.
+MAX_BUCKET = 50
+PRIME = (1 << 31) - 1
+WORD = re.compile(r"[^\W\d_]+")
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Words that say nothing about which product it is: grammar, units and the
+# sellers' own taglines.
+FILLER_WORDS = {
+    "a",
+    "an",
+    "and",
+    "by",
+    "for",
+    "in",
+    "of",
+    "on",
+    "or",
+    "the",
+    "with",
+    "pack",
+    "set",
+    "combo",
+    "pc",
+    "pcs",
+    "piece",
+    "pieces",
+    "ml",
+    "l",
+    "ltr",
+    "g",
+    "gm",
+    "kg",
+    "eco",
+    "friendly",
+    "sustainable",
+    "premium",
+    "quality",
+    "best",
+    "new",
+}
+BATCH_SIZE = 5000
+SIGNATURE_CHUNK = 2000
+VERIFY_CHUNK = 1_000_000
+# Advisory lock key held by the run writing the groups.
+MATCH_LOCK = zlib.crc32(b"products:match")
+
+
+@cache
+def hash_functions():
+    """
+    The ``NUM_PERM`` random ``(a * x + b) mod PRIME`` permutations, the same in
+    every process.
+    """
+    rng = np.random.default_rng(20_251_019)
+    return rng.integers(1, PRIME, NUM_PERM, dtype=np.int64), rng.integers(
+        0,
+        PRIME,
+        NUM_PERM,
+        dtype=np.int64,
+    )
+
+
+def title_shingles(title, brand=None):
+    """The character trigrams of the words of ``title`` that tell products apart."""
+    words = set(WORD.findall(title.lower())) - FILLER_WORDS
+    if brand:
+        words -= set(WORD.findall(brand.lower()))
+    shingles = set()
+    for word in words:
+        padded = f" {word} "
+        shingles.update(padded[i : i + 3] for i in range(len(word)))
+    return shingles
+
+
+def title_numbers(title):
+    return " ".join(sorted(set(NUMBER.findall(title))))
+
+
+def signatures(shingle_sets):
+    """
+    MinHash signatures, one row of ``NUM_PERM`` values per set of shingles
+    (empty sets: all ``PRIME``).
+    """
+    a, b = hash_functions()
+    rows = np.full((len(shingle_sets), NUM_PERM), PRIME, dtype=np.uint32)
+    sizes = np.fromiter(map(len, shingle_sets), dtype=np.int64, count=len(shingle_sets))
+    filled = np.flatnonzero(sizes)
+    if len(filled):
+        hashes = np.fromiter(
+            (
+                zlib.crc32(shingle.encode()) % PRIME
+                for shingles in shingle_sets
+                for shingle in shingles
+            ),
+            dtype=np.int64,
+            count=int(sizes.sum()),
+        )
+        values = (a[:, None] * hashes[None, :] + b[:, None]) % PRIME
+        offsets = (np.cumsum(sizes) - sizes)[filled]
+        rows[filled] = np.minimum.reduceat(values, offsets, axis=1).T
+    return rows
+
+
+def brand_prefix(brands):
+    """A pattern matching any of ``brands`` at the start of a lowercase title."""
+    names = sorted(
+        {brand.strip().lower() for brand in brands if brand and brand.strip()},
+        key=len,
+        reverse=True,
+    )
+    return re.compile(rf"(?:{'|'.join(map(re.escape, names))})\b") if names else None
+
+
+def listing_features(listings, brands=()):
+    """
+    MinHash signatures and number, brand and seller codes of ``(title, brand,
+    seller)`` listings, read a chunk at a time. One of ``brands`` opening a
+    title is taken for the listing's brand. A brand code of -1 means none.
+    """
+    prefix = brand_prefix(brands)
+    codes = {"numbers": {}, "brands": {"": -1}, "sellers": {}}
+    numbers, brand_codes, sellers = array("q"), array("q"), array("q")
+    chunks = []
+    chunk = []
+    for raw_title, raw_brand, seller in listings:
+        title = raw_title.lower()
+        brand = (raw_brand or "").strip().lower()
+        opening = prefix.match(title) if prefix else None
+        if opening:
+            title = title[opening.end() :]
+            brand = brand or opening.group()
+        chunk.append(title_shingles(title, brand))
+        numbers.append(
+            codes["numbers"].setdefault(title_numbers(title), len(codes["numbers"])),
+        )
+        brand_codes.append(codes["brands"].setdefault(brand, len(codes["brands"]) - 1))
+        sellers.append(codes["sellers"].setdefault(seller or "", len(codes["sellers"])))
+        if len(chunk) >= SIGNATURE_CHUNK:
+            chunks.append(signatures(chunk))
+            chunk = []
+    chunks.append(signatures(chunk))
+    arrays = [
+        np.frombuffer(column, np.int64) for column in (numbers, brand_codes, sellers)
+    ]
+    return np.concatenate(chunks), *arrays
+
+
+def candidate_pairs(signature_rows):
+    """
+    ``(i, j)`` index pairs of the listings that share at least one LSH bucket,
+    ``i < j``.
+    """
+    count = len(signature_rows)
+    width = NUM_PERM // BANDS
+    pairs = [np.empty(0, dtype=np.int64)]
+    for band in range(BANDS):
+        keys = np.zeros(count, dtype=np.uint64)
+        for column in (
+            signature_rows[:, band * width : (band + 1) * width].astype(np.uint64).T
+        ):
+            # Collisions only add candidates, which are checked anyway.
+            keys = keys * np.uint64(1_000_003) ^ column
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1]])
+        lengths = np.minimum(np.diff(np.r_[starts, count]), MAX_BUCKET)
+        for length in np.unique(lengths[lengths > 1]):
+            first, second = np.triu_indices(length, 1)
+            bucket_starts = starts[lengths == length][:, None]
+            first, second = (
+                order[bucket_starts + first].ravel(),
+                order[bucket_starts + second].ravel(),
+            )
+            pairs.append(np.minimum(first, second) * count + np.maximum(first, second))
+    return np.divmod(np.unique(np.concatenate(pairs)), max(count, 1))
+
+
+def match_listings(signature_rows, numbers, brands, sellers):
+    """
+    Group labels for the listings described by ``listing_features()``: listings
+    with the same label are one product, -1 marks those that matched nothing.
+    """
+    first, second = candidate_pairs(signature_rows)
+    matchable = signature_rows[:, 0] != PRIME
+    keep = (
+        matchable[first]
+        & matchable[second]
+        & (sellers[first] != sellers[second])
+        & (numbers[first] == numbers[second])
+        & (
+            (brands[first] == brands[second])
+            | (brands[first] < 0)
+            | (brands[second] < 0)
+        )
+    )
+    first, second = first[keep], second[keep]
+    similarity = np.zeros(len(first))
+    for start in range(0, len(first), VERIFY_CHUNK):
+        chunk = slice(start, start + VERIFY_CHUNK)
+        similarity[chunk] = (
+            signature_rows[first[chunk]] == signature_rows[second[chunk]]
+        ).mean(axis=1)
+    matched = similarity >= MATCH_THRESHOLD
+    return join_matches(
+        first[matched],
+        second[matched],
+        similarity[matched],
+        sellers,
+        brands,
+    )
+
+
+def join_matches(first, second, similarity, sellers, brands):
+    """
+    Merge matched listings into groups, best match first. Each seller lists
+    a product once, so two groups are never merged if that would give one
+    seller two listings: "Water Bottle" matching both "Steel Water Bottle"
+    and "Glass Water Bottle" must not make those one product. Nor are two
+    brands joined through a listing without one.
+    """
+    parent = {}
+    members = {}
+
+    def root(listing):
+        while parent.get(listing, listing) != listing:
+            listing = parent[listing]
+        return listing
+
+    def owners(listing):
+        brand = int(brands[listing])
+        return {int(sellers[listing])}, {brand} if brand >= 0 else set()
+
+    order = np.argsort(-similarity, kind="stable")
+    for left, right in zip(first[order].tolist(), second[order].tolist(), strict=True):
+        one, other = root(left), root(right)
+        my_sellers, my_brands = members.setdefault(one, owners(one))
+        their_sellers, their_brands = members.setdefault(other, owners(other))
+        if (
+            one != other
+            and not my_sellers & their_sellers
+            and len(my_brands | their_brands) <= 1
+        ):
+            parent[other] = one
+            members.pop(other)
+            my_sellers |= their_sellers
+            my_brands |= their_brands
+    labels = np.full(len(sellers), -1, dtype=np.int64)
+    for listing in parent:
+        labels[listing] = labels[root(listing)] = root(listing)
+    return labels
+
+
+def match_products():
+    """
+    Rebuild the ``ProductGroup`` of every listed product; returns how many
+    groups there are.
+    """
+    ids = array("q")
+    listed = Product.objects.filter(LISTED).order_by("pk")
+
+    def listings():
+        for pk, *listing in listed.values_list(
+            "pk",
+            "title",
+            "brand",
+            "seller",
+        ).iterator(BATCH_SIZE):
+            ids.append(pk)
+            yield listing
+
+    brands = listed.exclude(brand=None).values_list("brand", flat=True).distinct()
+    labels = match_listings(*listing_features(listings(), brands=brands))
+    product_ids = np.frombuffer(ids, np.int64)
+    grouped = np.flatnonzero(labels >= 0)
+    _, members = np.unique(labels[grouped], return_inverse=True)
+    counts = np.bincount(members)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [MATCH_LOCK])
+        # Read under the lock: what an earlier run wrote is the starting point.
+        current, dropped = current_groups(product_ids)
+        group_ids = reused_groups(members, current[grouped])
+        fresh = np.flatnonzero(group_ids < 0)
+        created = ProductGroup.objects.bulk_create(
+            [ProductGroup(product_count=count) for count in counts[fresh].tolist()],
+            batch_size=BATCH_SIZE,
+        )
+        group_ids[fresh] = [group.pk for group in created]
+        wanted = np.full(len(product_ids), -1, dtype=np.int64)
+        wanted[grouped] = group_ids[members]
+        moved = np.flatnonzero(wanted != current)
+        assign_groups(
+            np.concatenate([product_ids[moved], dropped]),
+            np.concatenate([wanted[moved], np.full(len(dropped), -1, dtype=np.int64)]),
+        )
+        set_product_counts(group_ids, counts)
+        ProductGroup.objects.filter(products__isnull=True).delete()
+    return len(group_ids)
+
+
+def current_groups(product_ids):
+    """
+    The group id of each of ``product_ids`` (sorted), -1 for none, and the
+    ids of the other products in a group: those no longer listed.
+    """
+    table = Product._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, group_id FROM {table} WHERE group_id IS NOT NULL ORDER BY id",  # noqa: S608
+        )
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    found = np.searchsorted(product_ids, rows[:, 0])
+    listed = found < len(product_ids)
+    listed[listed] = product_ids[found[listed]] == rows[listed, 0]
+    current = np.full(len(product_ids), -1, dtype=np.int64)
+    current[found[listed]] = rows[listed, 1]
+    return current, rows[~listed, 0]
+
+
+def reused_groups(members, current):
+    """
+    An existing group id for each group of ``members`` (group index per
+    listing), -1 for those needing a new one: the group that most of its
+    listings are in ``current``ly, largest overlaps first, each id used once.
+    """
+    group_ids = np.full(members.max(initial=-1) + 1, -1, dtype=np.int64)
+    had = current >= 0
+    pairs, overlaps = np.unique(
+        np.stack([members[had], current[had]], axis=1),
+        axis=0,
+        return_counts=True,
+    )
+    taken = set()
+    for member, group_id in pairs[np.argsort(-overlaps, kind="stable")].tolist():
+        if group_ids[member] < 0 and group_id not in taken:
+            group_ids[member] = group_id
+            taken.add(group_id)
+    return group_ids
+
+
+def assign_groups(product_ids, group_ids):
+    """
+    Set ``Product.group`` from two parallel arrays, -1 for none, a batch per
+    statement.
+    """
+    table = Product._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            cursor.execute(
+                f"""
+                UPDATE {table} SET group_id = nullif(g.group_id, -1)
+                FROM unnest(%s::bigint[], %s::bigint[]) AS g(id, group_id)
+                WHERE {table}.id = g.id
+                """,  # noqa: S608
+                [
+                    product_ids[start : start + BATCH_SIZE].tolist(),
+                    group_ids[start : start + BATCH_SIZE].tolist(),
+                ],
+            )
+
+
+def set_product_counts(group_ids, counts):
+    """Set ``ProductGroup.product_count`` from two parallel arrays, where it changed."""
+    table = ProductGroup._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        for start in range(0, len(group_ids), BATCH_SIZE):
+            cursor.execute(
+                f"""
+                UPDATE {table} SET product_count = c.product_count
+                FROM unnest(%s::bigint[], %s::integer[]) AS c(id, product_count)
+                WHERE {table}.id = c.id AND {table}.product_count <> c.product_count
+                """,  # noqa: S608
+                [
+                    group_ids[start : start + BATCH_SIZE].tolist(),
+                    counts[start : start + BATCH_SIZE].tolist(),
+                ],
+            )
+
+
+def product_offers(product, queryset):
+    """
+    Every listing of ``product`` in ``queryset``, cheapest first; just
+    ``product`` if it has no group.
+    """
+    if product.group_id is None:
+        return [product]
+    return queryset.filter(group_id=product.group_id).order_by(
+        F("price_paise").asc(nulls_last=True),
+        "pk",
+    )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_alter_product_title'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['title', 'id'], name='product_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['selling_price', 'id'], name='product_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['rating', 'id'], name='product_rating_id_idx'),
+        ),
+    ]
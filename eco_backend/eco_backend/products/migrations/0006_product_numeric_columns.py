@@ -0,0 +1,112 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:25
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+# Frozen copy of the parsers in utils/normalize.py as of this migration, so
+# later changes to them cannot alter how historical rows were backfilled.
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+NUMERIC_FIELDS = ["price_paise", "cost_price_paise", "discount_percent", "rating_value"]
+
+
+def first_number(value):
+    match = NUMBER_RE.search(value or "")
+    if not match:
+        return None
+    try:
+        return Decimal(match.group(0).replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_price_paise(value):
+    amount = first_number(value)
+    return None if amount is None else int((amount * 100).to_integral_value())
+
+
+def parse_discount_percent(value, price_paise, cost_price_paise):
+    if value and "%" in value:
+        percent = first_number(value)
+        if percent is not None and percent <= 100:
+            return int(percent.to_integral_value())
+    if price_paise and cost_price_paise and cost_price_paise > price_paise:
+        return round((cost_price_paise - price_paise) * 100 / cost_price_paise)
+    return None
+
+
+def parse_rating(value):
+    rating = first_number(value)
+    return None if rating is None or rating > 5 else float(rating)
+
+
+def backfill_numeric_fields(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    batch = []
+    for product in Product.objects.only("selling_price", "cost_price", "discount", "rating").iterator(chunk_size=2000):
+        product.price_paise = parse_price_paise(product.selling_price)
+        product.cost_price_paise = parse_price_paise(product.cost_price)
+        product.discount_percent = parse_discount_percent(
+            product.discount,
+            product.price_paise,
+            product.cost_price_paise,
+        )
+        product.rating_value = parse_rating(product.rating)
+        batch.append(product)
+        if len(batch) >= 2000:
+            Product.objects.bulk_update(batch, NUMERIC_FIELDS)
+            batch = []
+    if batch:
+        Product.objects.bulk_update(batch, NUMERIC_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_price_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_rating_id_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='cost_price_paise',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='discount_percent',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='price_paise',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_numeric_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['price_paise', 'id'], name='product_price_paise_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['rating_value', 'id'], name='product_rating_value_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['discount_percent', 'id'], name='product_discount_id_idx'),
+        ),
+    ]
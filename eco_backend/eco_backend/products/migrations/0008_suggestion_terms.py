@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:11
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_suggestion_terms(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    SuggestionTerm = apps.get_model("products", "SuggestionTerm")
+    listed = Product.objects.filter(selling_price__isnull=False)
+    terms = []
+    for kind in ("brand", "sub_category"):
+        counts = listed.exclude(**{f"{kind}__isnull": True}).exclude(**{kind: ""})
+        for row in counts.values(kind).annotate(product_count=Count("id")):
+            terms.append(SuggestionTerm(kind=kind, value=row[kind], product_count=row["product_count"]))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT word, ndoc FROM ts_stat(
+                'SELECT to_tsvector(''simple'', title) FROM products_product WHERE selling_price IS NOT NULL'
+            )
+            WHERE word ~ '^[[:alpha:]]{3,}$'
+            """
+        )
+        terms.extend(
+            SuggestionTerm(kind="word", value=word, product_count=count) for word, count in cursor.fetchall()
+        )
+    SuggestionTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SuggestionTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('word', 'Title word'), ('brand', 'Brand'), ('sub_category', 'Sub-category')], max_length=20)),
+                ('value', models.CharField(max_length=511)),
+                ('product_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['value'], name='suggestion_term_trgm_idx', opclasses=['gin_trgm_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='suggestion_term_kind_value_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_suggestion_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_suggestion_terms'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['scraped_at'], name='product_scraped_at_idx'),
+        ),
+    ]
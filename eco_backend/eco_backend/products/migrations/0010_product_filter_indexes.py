@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_scraped_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['brand'], name='product_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['sub_category'], name='product_sub_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['seller'], name='product_seller_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['category', 'brand', 'sub_category', 'seller'], name='product_facets_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userfavorite',
+            index=models.Index(fields=['user', '-added_at'], name='userfavorite_user_added_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_favorite_count(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    UserFavorite = apps.get_model("products", "UserFavorite")
+    counts = (
+        UserFavorite.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Product.objects.filter(pk__in=UserFavorite.objects.values("product")).update(favorite_count=Subquery(counts))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_userfavorite_user_added_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_favorite_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('selling_price__isnull', False)), fields=['favorite_count', 'id'], name='product_favorite_count_id_idx'),
+        ),
+    ]
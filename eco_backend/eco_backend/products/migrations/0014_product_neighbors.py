@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:40
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_price_drop_alert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductNeighbors',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbors', serialize=False, to='products.product')),
+                ('neighbor_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_product_neighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_count', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='group',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='products.productgroup'),
+        ),
+    ]
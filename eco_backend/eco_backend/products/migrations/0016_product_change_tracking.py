@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:50
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_changed(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Product.objects.update(last_changed=F("scraped_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_product_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='last_changed',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_last_changed, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='product',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scraper', models.CharField(max_length=100)),
+                ('sellers', django.contrib.postgres.fields.ArrayField(base_field=models.URLField(), default=list, size=None)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('new', models.PositiveIntegerField(default=0)),
+                ('changed', models.PositiveIntegerField(default=0)),
+                ('unchanged', models.PositiveIntegerField(default=0)),
+                ('disappeared', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scraper', '-started_at'], name='ingestrun_scraper_started_idx')],
+            },
+        ),
+    ]
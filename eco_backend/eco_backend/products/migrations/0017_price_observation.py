@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+PARTITIONS_AHEAD = 3
+
+
+def backfill_price_observations(apps, schema_editor):
+    """A partition per month since the oldest product, and each product's current price."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(coalesce(last_changed, scraped_at)) FROM products_product")
+        oldest = cursor.fetchone()[0] or timezone.now()
+        now = timezone.now()
+        # Months counted from year 0, so the range can cross a new year.
+        for index in range(oldest.year * 12 + oldest.month - 1, now.year * 12 + now.month + PARTITIONS_AHEAD):
+            (year, month), (next_year, next_month) = divmod(index, 12), divmod(index + 1, 12)
+            cursor.execute(
+                f"""
+                CREATE TABLE products_priceobservation_{year}{month + 1:02d} PARTITION OF products_priceobservation
+                FOR VALUES FROM ('{year}-{month + 1:02d}-01 00:00+00') TO ('{next_year}-{next_month + 1:02d}-01 00:00+00')
+                """,
+            )
+        cursor.execute(
+            """
+            INSERT INTO products_priceobservation (product_id, observed_at, price_paise)
+            SELECT id, coalesce(last_changed, scraped_at), price_paise FROM products_product
+            WHERE price_paise IS NOT NULL
+            """,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0016_product_change_tracking'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                # Partitioned by month, which Django cannot express.
+                migrations.RunSQL(
+                    """
+                    CREATE TABLE products_priceobservation (
+                        product_id bigint NOT NULL
+                            REFERENCES products_product (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+                        observed_at timestamp with time zone NOT NULL,
+                        price_paise integer NULL CHECK (price_paise >= 0),
+                        PRIMARY KEY (product_id, observed_at)
+                    ) PARTITION BY RANGE (observed_at)
+                    """,
+                    "DROP TABLE products_priceobservation",
+                ),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='PriceObservation',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('product', 'observed_at', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('observed_at', models.DateTimeField()),
+                        ('price_paise', models.PositiveIntegerField(null=True)),
+                        ('product', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='price_observations', to='products.product')),
+                    ],
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_price_observations, migrations.RunPython.noop),
+    ]
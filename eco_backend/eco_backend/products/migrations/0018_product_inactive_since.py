@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0017_price_observation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_title_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_price_paise_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_rating_value_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_discount_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_brand_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_sub_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_seller_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_facets_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_favorite_count_id_idx',
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='deactivated',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='inactive_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['title', 'id'], name='product_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['price_paise', 'id'], name='product_price_paise_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['rating_value', 'id'], name='product_rating_value_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['discount_percent', 'id'], name='product_discount_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['favorite_count', 'id'], name='product_favorite_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['brand'], name='product_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['sub_category'], name='product_sub_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['seller'], name='product_seller_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', True), ('selling_price__isnull', False)), fields=['category', 'brand', 'sub_category', 'seller'], name='product_facets_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('inactive_since__isnull', False)), fields=['inactive_since'], name='product_inactive_since_idx'),
+        ),
+    ]
@@ -1,6 +1,13 @@
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+# The products the API lists: priced, and still sold by their seller.
+LISTED = models.Q(selling_price__isnull=False, inactive_since__isnull=True)
+
+
 class Product(models.Model):
     title = models.TextField()
     product_link = models.URLField(unique=True)
@@ -15,13 +22,191 @@ class Product(models.Model):
     brand = models.CharField(max_length=511, null=True, blank=True)
     seller = models.URLField(null=True, blank=True)
     scraped_at = models.DateTimeField(auto_now_add=True)
+    # Typed copies of the scraped strings above, filled in at ingest
+    # (see utils/normalize.py) so sorting and range filters run in SQL.
+    price_paise = models.PositiveIntegerField(null=True, blank=True)
+    cost_price_paise = models.PositiveIntegerField(null=True, blank=True)
+    discount_percent = models.PositiveSmallIntegerField(null=True, blank=True)
+    rating_value = models.FloatField(null=True, blank=True)
+    # Weighted title/description tsvector, refreshed by the ingest task.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # How many users favorited the product, flushed from Redis in batches
+    # (see popularity.py); backs ``?ordering=-popularity``.
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+    # Hash of the scraped fields: ingest skips items whose hash is unchanged
+    # (see ingest.py). ``scraped_at`` is when the product was first seen.
+    fingerprint = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        editable=False,
+    )
+    last_changed = models.DateTimeField(null=True, blank=True, editable=False)
+    # When a run last returned the product, once its seller stopped listing
+    # it; None while the seller lists it, so unchanged products need no write.
+    last_seen = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set once enough runs in a row missed the product; it is no longer
+    # listed, and is deleted after PRODUCT_RETENTION_DAYS.
+    inactive_since = models.DateTimeField(null=True, blank=True, editable=False)
+    # The same product as listed by other sellers (see matching.py).
+    group = models.ForeignKey(
+        "ProductGroup",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="products",
+    )
 
     class Meta:
         ordering = ["-scraped_at"]
+        # Composite (ordering field, id) keys for keyset pagination; the API
+        # only lists priced products still on sale, so the indexes skip the
+        # rest.
+        indexes = [
+            models.Index(
+                fields=["title", "id"],
+                name="product_title_id_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["price_paise", "id"],
+                name="product_price_paise_id_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["rating_value", "id"],
+                name="product_rating_value_id_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["discount_percent", "id"],
+                name="product_discount_id_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["favorite_count", "id"],
+                name="product_favorite_count_id_idx",
+                condition=LISTED,
+            ),
+            # Equality filters. Without these a rarely used brand or seller
+            # walks the whole title index (or the table) to fill one page;
+            # category is served by the facet index below.
+            models.Index(
+                fields=["brand"],
+                name="product_brand_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["sub_category"],
+                name="product_sub_category_idx",
+                condition=LISTED,
+            ),
+            models.Index(
+                fields=["seller"],
+                name="product_seller_idx",
+                condition=LISTED,
+            ),
+            # Covers the facet columns, so facet counts (filtered by category
+            # or not) are an index-only scan instead of a read of the table.
+            models.Index(
+                fields=["category", "brand", "sub_category", "seller"],
+                name="product_facets_idx",
+                condition=LISTED,
+            ),
+            GinIndex(fields=["search_vector"], name="product_search_vector_idx"),
+            # max(scraped_at) feeds the catalog ETag/Last-Modified.
+            models.Index(fields=["scraped_at"], name="product_scraped_at_idx"),
+            # The products due for deletion (see ingest.py).
+            models.Index(
+                fields=["inactive_since"],
+                name="product_inactive_since_idx",
+                condition=models.Q(inactive_since__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
-    
+
+
+class ProductGroup(models.Model):
+    """
+    Listings of one product by different sellers, matched by title after
+    every ingest.
+    """
+
+    # One listing per seller.
+    product_count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.product_count} listings"
+
+
+class IngestRun(models.Model):
+    """One run of a scraper and what it changed in the catalog (see ingest.py)."""
+
+    scraper = models.CharField(max_length=100)
+    # The sellers the run returned products of; only theirs can disappear.
+    sellers = ArrayField(models.URLField(), default=list)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    new = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+    disappeared = models.PositiveIntegerField(default=0)
+    deactivated = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["scraper", "-started_at"],
+                name="ingestrun_scraper_started_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scraper} {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class SuggestionTerm(models.Model):
+    """
+    A distinct title word, brand or sub-category value, kept for autocomplete
+    so that misspellings are matched against a few thousand rows instead of
+    the whole product table.
+    """
+
+    WORD = "word"
+    BRAND = "brand"
+    SUB_CATEGORY = "sub_category"
+    KIND_CHOICES = [
+        (WORD, "Title word"),
+        (BRAND, "Brand"),
+        (SUB_CATEGORY, "Sub-category"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.CharField(max_length=511)
+    product_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "value"],
+                name="suggestion_term_kind_value_uniq",
+            ),
+        ]
+        indexes = [
+            GinIndex(
+                fields=["value"],
+                name="suggestion_term_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.value}"
+
 
 class UserFavorite(models.Model):
     user = models.ForeignKey(
@@ -39,6 +224,84 @@ class UserFavorite(models.Model):
     class Meta:
         unique_together = ("user", "product")  # Prevent duplicates
         ordering = ["-added_at"]
+        indexes = [
+            # A user's favorites, newest first, straight from the index.
+            models.Index(
+                fields=["user", "-added_at"],
+                name="userfavorite_user_added_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} → {self.product}"
+
+
+class PriceDropAlert(models.Model):
+    """An in-app notice that a favorited product got cheaper (see alerts.py)."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="price_drop_alerts",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_drop_alerts",
+    )
+    old_price_paise = models.PositiveIntegerField()
+    new_price_paise = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="pricedropalert_user_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product} {self.old_price_paise} → {self.new_price_paise}"
+
+
+class ProductNeighbors(models.Model):
+    """
+    The products most similar to ``product``, best first, rebuilt nightly by
+    similar.py.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="neighbors",
+    )
+    neighbor_ids = ArrayField(models.BigIntegerField())
+
+    def __str__(self):
+        return f"{self.product_id} → {self.neighbor_ids}"
+
+
+class PriceObservation(models.Model):
+    """
+    A product's price from ``observed_at`` until its next observation; only
+    changes are stored. The table is partitioned by month (see
+    price_history.py), which Django does not model: it is created in SQL, and
+    deleting a product removes its rows through the database's ON DELETE
+    CASCADE.
+    """
+
+    pk = models.CompositePrimaryKey("product", "observed_at")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        related_name="price_observations",
+    )
+    observed_at = models.DateTimeField()
+    price_paise = models.PositiveIntegerField(null=True)
 
     def __str__(self):
-        return f"{self.user} → {self.product}"
\ No newline at end of file
+        return f"{self.product_id} {self.observed_at:%Y-%m-%d} {self.price_paise}"
@@ -0,0 +1,201 @@
+"""
+Keyset pagination for the product catalog.
+
+Pages are addressed by the ``(ordering value, id)`` pair of the row at the page
+boundary instead of an OFFSET, so fetching page N is the same bounded index
+range scan as fetching page 1, and no ``COUNT(*)`` is ever issued.
+"""
+
+import json
+from base64 import b64decode
+from base64 import b64encode
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models.fields.tuple_lookups import Tuple
+from django.db.models.fields.tuple_lookups import TupleGreaterThan
+from django.db.models.fields.tuple_lookups import TupleLessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_position(value, pk, *, reverse=False):
+    """Return the opaque cursor token for the row with ``value`` and ``pk``."""
+    position = {"v": value, "pk": pk}
+    if reverse:
+        position["r"] = 1
+    payload = json.dumps(position, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination over a composite ``(field, pk)`` key.
+
+    Unlike DRF's ``CursorPagination`` the tie-breaker is part of the cursor, so
+    duplicate ordering values never need an offset. The ordering is taken from
+    the filtered queryset (only its first field is used) which lets the
+    ordering and search filters drive it. Rows whose ordering value is NULL are
+    served after all non-NULL rows, ordered by pk, from their own index range.
+    """
+
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "pk"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.field, self.descending = self._get_sort_key(queryset)
+        self.nullable = self._is_nullable()
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None and self.cursor["r"]:
+            rows = self._fetch_backward(queryset)
+            self.has_previous = len(rows) > self.page_size
+            self.has_next = True
+            self.page = list(reversed(rows[: self.page_size]))
+        else:
+            rows = self._fetch_forward(queryset)
+            self.has_next = len(rows) > self.page_size
+            self.has_previous = self.cursor is not None
+            self.page = rows[: self.page_size]
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        value, pk = self._position(self.page[-1])
+        return self.encode_cursor(encode_position(value, pk))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        value, pk = self._position(self.page[0])
+        return self.encode_cursor(encode_position(value, pk, reverse=True))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            cursor = {
+                "v": cursor["v"],
+                "pk": int(cursor["pk"]),
+                "r": bool(cursor.get("r")),
+            }
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message) from None
+        if cursor["v"] is not None:
+            cursor["v"] = self._to_python(cursor["v"])
+        return cursor
+
+    def encode_cursor(self, cursor):
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _get_sort_key(self, queryset):
+        query = queryset.query
+        default_ordering = queryset.model._meta.ordering  # noqa: SLF001
+        ordering = query.order_by or (query.default_ordering and default_ordering)
+        ordering = [o for o in ordering or () if isinstance(o, str)] or [self.ordering]
+        field = ordering[0]
+        return field.lstrip("-"), field.startswith("-")
+
+    def _get_model_field(self):
+        try:
+            return self.model._meta.get_field(self.field)  # noqa: SLF001
+        except FieldDoesNotExist:
+            # An annotation such as the search rank.
+            return None
+
+    def _is_nullable(self):
+        field = self._get_model_field()
+        return field is not None and field.null
+
+    def _to_python(self, value):
+        field = self._get_model_field()
+        if field is None:
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def _segments(self):
+        # Segment 0 holds rows with a value, segment 1 the NULL tail.
+        return [0, 1] if self.nullable else [0]
+
+    def _segment_queryset(self, queryset, segment, after, *, reverse):
+        descending = self.descending != reverse
+        if segment == 0:
+            keys = [self.field, "pk"]
+            if self.nullable:
+                queryset = queryset.filter(**{f"{self.field}__isnull": False})
+        else:
+            keys = ["pk"]
+            queryset = queryset.filter(**{f"{self.field}__isnull": True})
+
+        if after is not None:
+            lookup = TupleLessThan if descending else TupleGreaterThan
+            queryset = queryset.filter(
+                lookup(Tuple(*(F(key) for key in keys)), after[-len(keys) :]),
+            )
+        return queryset.order_by(
+            *(F(key).desc() if descending else F(key).asc() for key in keys),
+        )
+
+    def _cursor_segment(self):
+        if self.cursor is None:
+            return 0, None
+        if self.cursor["v"] is None and self.nullable:
+            return 1, (self.cursor["pk"],)
+        return 0, (self.cursor["v"], self.cursor["pk"])
+
+    def _fetch_forward(self, queryset):
+        start, after = self._cursor_segment()
+        rows = []
+        for segment in self._segments()[start:]:
+            limit = self.page_size + 1 - len(rows)
+            segment_after = after if segment == start else None
+            segment_rows = self._segment_queryset(
+                queryset,
+                segment,
+                segment_after,
+                reverse=False,
+            )
+            rows.extend(segment_rows[:limit])
+            if len(rows) > self.page_size:
+                break
+        return rows
+
+    def _fetch_backward(self, queryset):
+        start, after = self._cursor_segment()
+        rows = []
+        for segment in reversed(self._segments()[: start + 1]):
+            limit = self.page_size + 1 - len(rows)
+            segment_after = after if segment == start else None
+            segment_rows = self._segment_queryset(
+                queryset,
+                segment,
+                segment_after,
+                reverse=True,
+            )
+            rows.extend(segment_rows[:limit])
+            if len(rows) > self.page_size:
+                break
+        return rows
+
+    def _position(self, instance):
+        if isinstance(instance, dict):
+            return instance[self.field], instance.get("pk", instance.get("id"))
+        return getattr(instance, self.field), instance.pk
@@ -0,0 +1,107 @@
+"""
+Favorite counts, buffered in Redis.
+
+``Product.favorite_count`` backs ``?ordering=-popularity``. Favorite requests
+do not update it themselves: with ``ATOMIC_REQUESTS`` an ``F()`` increment
+would hold the product's row lock until the request commits, so a burst of
+favorites on one product would queue behind each other. Instead every change
+is an atomic ``HINCRBY`` on one Redis hash, and ``flush_favorite_counts``
+(run every minute by Celery beat) applies the summed deltas in a single
+UPDATE.
+
+The popularity order is served from the response cache like any other
+ordering, so it catches up with the counts when the catalog version moves.
+"""
+
+import logging
+from functools import cache
+
+import redis
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import connection
+from django.db import transaction
+
+from eco_backend.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+FAVORITE_DELTAS_KEY = "products:favorite-deltas"
+
+
+@cache
+def counter_store():
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def buffer_favorite_deltas(deltas):
+    pipe = counter_store().pipeline(transaction=False)
+    for product_id, delta in deltas.items():
+        pipe.hincrby(FAVORITE_DELTAS_KEY, product_id, delta)
+    pipe.execute()
+
+
+def record_favorite_changes(deltas):
+    """
+    Buffer ``{product_id: delta}`` once the current transaction commits. If
+    Redis is down the deltas go straight to Postgres instead.
+    """
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def record():
+        try:
+            buffer_favorite_deltas(deltas)
+        except redis.RedisError:
+            logger.warning(
+                "Could not buffer favorite counts, updating them directly",
+                exc_info=True,
+            )
+            apply_favorite_deltas(deltas)
+
+    transaction.on_commit(record)
+
+
+def apply_favorite_deltas(deltas):
+    """Add ``{product_id: delta}`` to ``Product.favorite_count`` in one statement."""
+    table = Product._meta.db_table  # noqa: SLF001
+    product_ids = sorted(deltas)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table}
+            SET favorite_count = GREATEST({table}.favorite_count + d.delta, 0)
+            FROM unnest(%s::bigint[], %s::integer[]) AS d(id, delta)
+            WHERE {table}.id = d.id
+            """,  # noqa: S608
+            [product_ids, [deltas[product_id] for product_id in product_ids]],
+        )
+        return cursor.rowcount
+
+
+def take_favorite_deltas():
+    """Read and clear the buffered deltas in one MULTI/EXEC."""
+    pipe = counter_store().pipeline()
+    pipe.hgetall(FAVORITE_DELTAS_KEY)
+    pipe.delete(FAVORITE_DELTAS_KEY)
+    buffered, _ = pipe.execute()
+    return {
+        int(product_id): int(delta)
+        for product_id, delta in buffered.items()
+        if int(delta)
+    }
+
+
+def flush_favorite_counts():
+    """Apply the buffered deltas to Postgres; return how many products changed."""
+    deltas = take_favorite_deltas()
+    if not deltas:
+        return 0
+    try:
+        with transaction.atomic():
+            return apply_favorite_deltas(deltas)
+    except DatabaseError:
+        # Put them back for the next flush rather than lose them.
+        buffer_favorite_deltas(deltas)
+        raise
@@ -0,0 +1,196 @@
+"""
+Price history: ``PriceObservation`` rows, written by the ingest only when a
+product's price changes, so a product whose price never moves costs one row.
+
+The table is partitioned by month of ``observed_at`` (one ``<table>_YYYYMM``
+partition each): a month of history is dropped with one ``DROP TABLE``
+instead of a DELETE that leaves the table bloated. Before that, the price
+each product had when the kept history begins is written at that instant:
+for a product unchanged since, the dropped row was its only one. Partitions are created
+ahead of time by ``ensure_partitions()``, and for the current month before
+each write.
+
+``price_history()`` serves the series downsampled in SQL: the prices in
+effect over each day, week or month, carried forward through buckets in
+which nothing changed.
+"""
+
+from datetime import UTC
+from datetime import datetime
+
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+from eco_backend.products.models import PriceObservation
+
+RESOLUTIONS = ("day", "week", "month")
+# Months of partitions created ahead of the current one.
+PARTITIONS_AHEAD = 3
+
+# Months this process already knows have a partition.
+known_partitions = set()
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=UTC)
+
+
+def add_months(moment, months):
+    """The start of the month ``months`` after ``moment``'s."""
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=UTC)
+
+
+def partition_name(month):
+    return f"{PriceObservation._meta.db_table}_{month:%Y%m}"  # noqa: SLF001
+
+
+def months_between(start, end):
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def ensure_partitions(start, end):
+    """
+    Create the monthly partitions from ``start``'s month to ``end``'s, those
+    missing.
+    """
+    table = PriceObservation._meta.db_table  # noqa: SLF001
+    months = [
+        month for month in months_between(start, end) if month not in known_partitions
+    ]
+    with connection.cursor() as cursor:
+        for month in months:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {table}
+                FOR VALUES FROM (%s) TO (%s)
+                """,
+                [month, add_months(month, 1)],
+            )
+    # DDL in a transaction is undone if it rolls back; only remember committed
+    # partitions.
+    if not connection.in_atomic_block:
+        known_partitions.update(months)
+
+
+def drop_partitions(before):
+    """
+    Drop the partitions of the months wholly before ``before``, after
+    carrying the prices in effect when the first kept month begins forward
+    into it; returns their names.
+    """
+    table = PriceObservation._meta.db_table  # noqa: SLF001
+    cutoff = month_start(before)
+    ensure_partitions(cutoff, cutoff)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [table],
+        )
+        oldest_kept = partition_name(cutoff)
+        dropped = [name for (name,) in cursor.fetchall() if name < oldest_kept]
+        if dropped:
+            # Products that changed at the cutoff itself already have their row.
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (product_id, observed_at, price_paise)
+                SELECT DISTINCT ON (product_id) product_id, %(cutoff)s, price_paise
+                FROM {table} WHERE observed_at < %(cutoff)s
+                ORDER BY product_id, observed_at DESC
+                ON CONFLICT DO NOTHING
+                """,  # noqa: S608
+                {"cutoff": cutoff},
+            )
+            # A table with deferred foreign key checks pending cannot be dropped.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for name in dropped:
+            cursor.execute(f"DROP TABLE {name}")
+    known_partitions.clear()
+    return dropped
+
+
+def maintain_partitions(keep_months=None):
+    """
+    Create the partitions for the next ``PARTITIONS_AHEAD`` months and, if
+    ``keep_months`` is set, drop those older than that; returns the dropped.
+    """
+    now = timezone.now()
+    ensure_partitions(now, add_months(now, PARTITIONS_AHEAD))
+    return drop_partitions(add_months(now, -keep_months)) if keep_months else []
+
+
+def record_prices(prices, observed_at=None):
+    """
+    Append a ``(product_id, price_paise)`` observation for each pair, in one
+    statement.
+    """
+    if not prices:
+        return
+    observed_at = observed_at or timezone.now()
+    ensure_partitions(observed_at, observed_at)
+    table = PriceObservation._meta.db_table  # noqa: SLF001
+    product_ids, price_paise = zip(*prices, strict=True)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (product_id, observed_at, price_paise)
+            SELECT o.product_id, %s, o.price_paise
+            FROM unnest(%s::bigint[], %s::integer[]) AS o(product_id, price_paise)
+            ON CONFLICT DO NOTHING
+            """,  # noqa: S608
+            [observed_at, list(product_ids), list(price_paise)],
+        )
+
+
+def price_history(product_id, resolution):
+    """
+    ``[{"at", "price_paise", "min_price_paise", "max_price_paise"}, ...]``
+    per ``resolution`` bucket from the product's first observation to now:
+    the price at the end of the bucket and the lowest and highest in effect
+    during it (None while it had no price).
+    """
+    table = PriceObservation._meta.db_table  # noqa: SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH changes AS (
+                SELECT price_paise, observed_at AS since,
+                       lead(observed_at, 1, 'infinity')
+                           OVER (ORDER BY observed_at) AS until
+                FROM {table} WHERE product_id = %(product)s
+            )
+            -- Each price counts in the buckets it was in effect during, the
+            -- last one up to now; ``until`` is where the next begins.
+            SELECT start, (array_agg(price_paise ORDER BY since DESC))[1],
+                   min(price_paise), max(price_paise)
+            FROM changes, generate_series(
+                date_trunc(%(resolution)s, since),
+                date_trunc(
+                    %(resolution)s, least(until - interval '1 microsecond', now())
+                ),
+                ('1 ' || %(resolution)s)::interval
+            ) AS start
+            GROUP BY start
+            ORDER BY start
+            """,  # noqa: S608
+            {"product": product_id, "resolution": resolution},
+        )
+        return [
+            {
+                "at": start,
+                "price_paise": price,
+                "min_price_paise": low,
+                "max_price_paise": high,
+            }
+            for start, price, low, high in cursor.fetchall()
+        ]
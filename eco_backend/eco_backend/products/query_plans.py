@@ -0,0 +1,279 @@
+"""
+Query plans of the product API, checked with ``python manage.py explain_products``.
+
+Every canonical request shape of the API (see ``QUERY_SHAPES``) is sent
+through the real views, the SQL it issues is captured and each statement is
+re-run under ``EXPLAIN (ANALYZE, BUFFERS)``. Sequential scans of the product
+table are flagged, and the rows each shape reads are compared with the
+baseline recorded in ``query_plans.json`` so that a lost index or a worse plan
+shows up as a regression.
+
+The baseline holds rows read rather than the planner's cost: the synthetic
+catalog is seeded from a fixed seed, so rows read only move when the plan
+does, while estimated costs also grow with the dead tuples every rolled-back
+run leaves behind.
+"""
+
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from eco_backend.products.benchmarks import api_get
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.models import Product
+from eco_backend.products.models import SuggestionTerm
+
+BASELINE_PATH = Path(__file__).with_name("query_plans.json")
+# Allowed growth over the baseline, for plans that flip between equivalent
+# indexes as ANALYZE samples differ.
+ROWS_TOLERANCE = 0.5
+CATALOG_TABLES = {Product._meta.db_table, SuggestionTerm._meta.db_table}  # noqa: SLF001
+# Follow the ``next`` link of the first page instead of sending the params as-is.
+NEXT_PAGE = "next"
+
+# name: (ProductViewSet action, query parameters). Filter values exist in the
+# synthetic catalog (see ``utils/synthetic_catalog.py``), except the "rare"
+# ones, which stand in for the long tail of small brands and sellers.
+QUERY_SHAPES = {
+    "list": ("list", {}),
+    "list page 2": ("list", {"cursor": NEXT_PAGE}),
+    "list ordering=-title": ("list", {"ordering": "-title"}),
+    "list ordering=selling_price": ("list", {"ordering": "selling_price"}),
+    "list ordering=-selling_price page 2": (
+        "list",
+        {"ordering": "-selling_price", "cursor": NEXT_PAGE},
+    ),
+    "list ordering=-rating": ("list", {"ordering": "-rating"}),
+    "list ordering=-rating page 2": (
+        "list",
+        {"ordering": "-rating", "cursor": NEXT_PAGE},
+    ),
+    "list ordering=-discount": ("list", {"ordering": "-discount"}),
+    "list ordering=-popularity": ("list", {"ordering": "-popularity"}),
+    "list ordering=-popularity page 2": (
+        "list",
+        {"ordering": "-popularity", "cursor": NEXT_PAGE},
+    ),
+    "list view=card": ("list", {"view": "card", "ordering": "-selling_price"}),
+    "list brand": ("list", {"brand": "Terra"}),
+    "list brand rare": (
+        "list",
+        {"brand": "Acme Organics", "ordering": "-selling_price"},
+    ),
+    "list category": ("list", {"category": "home"}),
+    "list category ordering=-selling_price": (
+        "list",
+        {"category": "home", "ordering": "-selling_price"},
+    ),
+    "list category page 2": ("list", {"category": "home", "cursor": NEXT_PAGE}),
+    "list category rare": ("list", {"category": "garden"}),
+    "list sub_category": ("list", {"sub_category": "kitchen"}),
+    "list sub_category ordering=-rating": (
+        "list",
+        {"sub_category": "kitchen", "ordering": "-rating"},
+    ),
+    "list sub_category rare": (
+        "list",
+        {"sub_category": "planters", "ordering": "-rating"},
+    ),
+    "list seller": ("list", {"seller": "https://ecohoy.com/"}),
+    "list seller rare": ("list", {"seller": "https://rare.example/"}),
+    "list price range": (
+        "list",
+        {"min_price": "100", "max_price": "150", "ordering": "selling_price"},
+    ),
+    "list min_rating": ("list", {"min_rating": "4.8", "ordering": "-rating"}),
+    "list min_discount": ("list", {"min_discount": "30", "ordering": "-discount"}),
+    # Synthetic descriptions repeat the title vocabulary, so only the
+    # number in each title makes a selective search term.
+    "list search": ("list", {"search": "4242"}),
+    "list search ordering=-selling_price": (
+        "list",
+        {"search": "neem comb", "ordering": "-selling_price"},
+    ),
+    "list search category": (
+        "list",
+        {"search": "charcoal soap", "category": "personal care"},
+    ),
+    "list search broad": ("list", {"search": "bamboo"}),
+    "list search broad page 2": ("list", {"search": "bamboo", "cursor": NEXT_PAGE}),
+    "retrieve": ("retrieve", {}),
+    "facets": ("facets", {}),
+    "facets category": ("facets", {"category": "home"}),
+    "facets search": ("facets", {"search": "4242"}),
+    "suggest": ("suggest", {"q": "toothbursh"}),
+}
+
+# Shapes that have to read a large share of the catalog, so whether that is
+# a sequential or a bitmap scan is the planner's call: a word found in most
+# descriptions must still rank every match, and facets count every match.
+# Neither check applies to them; both are cached between ingest runs.
+FULL_SCAN_SHAPES = {
+    "list search broad",
+    "list search broad page 2",
+    "facets",
+    "facets category",
+}
+# Smaller sequential scans are left to the planner too: a LIMIT that stops
+# early, or a table as small as the suggestion vocabulary.
+SEQ_SCAN_ROWS = 1000
+
+
+@contextmanager
+def planner_settings(**settings):
+    """Set planner GUCs such as ``enable_seqscan`` for the current transaction."""
+    with connection.cursor() as cursor:
+        previous = {}
+        for name, value in settings.items():
+            cursor.execute("SELECT current_setting(%s)", [name])
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                cursor.execute("SELECT set_config(%s, %s, true)", [name, value])
+
+
+def capture_shape(action, params, user):
+    """Send one request of the given shape and return the SELECTs it ran."""
+    from eco_backend.products.views import ProductViewSet  # noqa: PLC0415
+
+    view = ProductViewSet.as_view({"get": action})
+    path = "/api/products/"
+    kwargs = {}
+    if action == "retrieve":
+        kwargs["pk"] = (
+            ProductViewSet.queryset.order_by("pk").values_list("pk", flat=True).first()
+        )
+        path = f"{path}{kwargs['pk']}/"
+    if params.get("cursor") == NEXT_PAGE:
+        first = {key: value for key, value in params.items() if key != "cursor"}
+        next_link = api_get(view, path, first, user).data["next"]
+        params = dict(parse_qsl(urlsplit(next_link).query))
+
+    # Cached responses skip the database, so start every shape cold.
+    bump_catalog_version()
+    with CaptureQueriesContext(connection) as queries:
+        api_get(view, path, params, user, **kwargs)
+    return [
+        query["sql"]
+        for query in queries
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def rows_read(node):
+    removed = node.get("Rows Removed by Filter", 0) + node.get(
+        "Rows Removed by Index Recheck",
+        0,
+    )
+    return (node["Actual Rows"] + removed) * node["Actual Loops"]
+
+
+def explain(sql):
+    """
+    ``EXPLAIN (ANALYZE, BUFFERS)`` summary of one statement; ``rows_read`` and
+    ``seq_scans`` count the rows each catalog table produced or filtered out.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        result = cursor.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    plan = result[0]["Plan"]
+    summary = {
+        "sql": sql,
+        "cost": plan["Total Cost"],
+        "ms": result[0]["Execution Time"],
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "rows_read": {},
+        "seq_scans": {},
+    }
+    for node in plan_nodes(plan):
+        table = node.get("Relation Name")
+        if table not in CATALOG_TABLES:
+            continue
+        rows = rows_read(node)
+        summary["rows_read"][table] = summary["rows_read"].get(table, 0) + rows
+        if node["Node Type"] == "Seq Scan":
+            summary["seq_scans"][table] = summary["seq_scans"].get(table, 0) + rows
+    return summary
+
+
+def explain_shape(action, params, user):
+    return [explain(sql) for sql in capture_shape(action, params, user)]
+
+
+def explain_shapes(user, shapes=None):
+    """Return ``{name: [statement plan summary, ...]}`` for every query shape."""
+    shapes = QUERY_SHAPES if shapes is None else shapes
+    return {
+        name: explain_shape(action, params, user)
+        for name, (action, params) in shapes.items()
+    }
+
+
+def shape_costs(plans):
+    return {
+        name: round(sum(statement["cost"] for statement in statements), 2)
+        for name, statements in plans.items()
+    }
+
+
+def shape_rows_read(plans):
+    return {
+        name: sum(sum(statement["rows_read"].values()) for statement in statements)
+        for name, statements in plans.items()
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {"catalog_size": None, "rows_read": {}}
+
+
+def save_baseline(plans, catalog_size, path=BASELINE_PATH):
+    baseline = {"catalog_size": catalog_size, "rows_read": shape_rows_read(plans)}
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(plans, baseline, tolerance=ROWS_TOLERANCE):
+    """
+    Describe every unexpected sequential scan and every shape reading more rows
+    than its baseline.
+    """
+    problems = []
+    rows_read = shape_rows_read(plans)
+    for name, statements in plans.items():
+        if name in FULL_SCAN_SHAPES:
+            continue
+        for statement in statements:
+            for table, rows in statement["seq_scans"].items():
+                if rows >= SEQ_SCAN_ROWS:
+                    problems.append(
+                        f"{name}: sequential scan of {rows} rows on {table}",
+                    )
+        expected = baseline["rows_read"].get(name)
+        # The slack keeps a handful of extra rows on tiny plans from counting.
+        if (
+            expected is not None
+            and rows_read[name] > expected * (1 + tolerance) + SEQ_SCAN_ROWS / 10
+        ):
+            problems.append(
+                f"{name}: reads {rows_read[name]} rows, the baseline is {expected}",
+            )
+    return problems
@@ -1,14 +1,51 @@
+import logging
 import time
+
 from selenium import webdriver
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+from eco_backend.products.scrapers.elements import find_text
+from eco_backend.products.scrapers.elements import image_url
+
+logger = logging.getLogger(__name__)
+
+
+def parse_product(product):
+    """Read one EcoConscious product card into a product dict."""
+    a_tag = product.find_element(
+        By.CSS_SELECTOR,
+        "a.full-unstyled-link.custom-card-title.custom-card-title-desk",
+    )
+    product_link = a_tag.get_attribute("href")
+    if product_link and product_link.startswith("/"):
+        product_link = "https://ecoconscious.in" + product_link
+
+    return {
+        "title": a_tag.text.strip(),
+        "brand": None,
+        "selling_price": find_text(product, "span.amw-price-container"),
+        "cost_price": find_text(product, "span.amw-com-price-container"),
+        "img_url": image_url(product, "img.motion-reduce"),
+        "product_link": product_link,
+        "discount": find_text(product, "span.discount_container_comb_card"),
+        "rating": find_text(product, "div.star-container"),
+        "description": find_text(
+            product,
+            "p.product_sub_title.product_sub_title_desk",
+        ),
+        "category": None,
+        "sub_category": None,
+        "seller": "https://ecoconscious.in/",
+    }
 
 
 def scrape_products():
     """
     Scrape products from https://ecoconsious.in/collections/personal-care
-    and return them as a list of dicts.
+    and yield them as dicts, each as soon as it is read.
     """
     url = "https://ecoconsious.in/collections/personal-care"
 
@@ -22,88 +59,33 @@ def scrape_products():
     chrome_options.add_argument("--window-size=1920,1080")
 
     service = Service("/usr/bin/chromedriver")
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    driver.get(url)
-    time.sleep(5)
-
-    # --- Scroll to load all products ---
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-
-    # --- Get all product elements ---
-    try:
-        grid = driver.find_element(By.ID, "product-grid")
-        product_cards = grid.find_elements(By.TAG_NAME, "li")
-    except Exception as e:
-        print("Error locating products:", e)
-        driver.quit()
-        return []
-
-    print(f"Found {len(product_cards)} products on EcoConscious")
-
-    products = []
-
-    for product in product_cards:
+    # Quits the browser however the generator ends, closed early included.
+    with webdriver.Chrome(service=service, options=chrome_options) as driver:
+        driver.get(url)
+        time.sleep(5)
+
+        # --- Scroll to load all products ---
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        while True:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(2)
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
+
+        # --- Get all product elements ---
         try:
-            a_tag = product.find_element(By.CSS_SELECTOR, "a.full-unstyled-link.custom-card-title.custom-card-title-desk")
-            title = a_tag.text.strip()
-            product_link = a_tag.get_attribute("href")
-            if product_link and product_link.startswith("/"):
-                product_link = "https://ecoconscious.in" + product_link
-
-            def safe_find(selector):
-                try:
-                    return product.find_element(By.CSS_SELECTOR, selector).text.strip()
-                except:
-                    return None
+            grid = driver.find_element(By.ID, "product-grid")
+        except NoSuchElementException:
+            logger.warning("Could not find the product grid on EcoConscious")
+            return
+        product_cards = grid.find_elements(By.TAG_NAME, "li")
 
-            description = safe_find("p.product_sub_title.product_sub_title_desk")
-            selling_price = safe_find("span.amw-price-container")
-            cost_price = safe_find("span.amw-com-price-container")
-            discount = safe_find("span.discount_container_comb_card")
-            rating = safe_find("div.star-container")
+        logger.info("Found %d products on EcoConscious", len(product_cards))
 
-            # --- Get image URL ---
+        for product in product_cards:
             try:
-                img_tag = product.find_element(By.CSS_SELECTOR, "img.motion-reduce")
-                img_url = img_tag.get_attribute("srcset")
-                if img_url:
-                    img_url = img_url.split(",")[-1].split()[0]
-                    if img_url.startswith("//"):
-                        img_url = "https:" + img_url
-                else:
-                    img_url = img_tag.get_attribute("src")
-                    if img_url.startswith("//"):
-                        img_url = "https:" + img_url
-            except:
-                img_url = None
-
-            products.append(
-                {
-                    "title": title,
-                    "brand": None,
-                    "selling_price": selling_price,
-                    "cost_price": cost_price,
-                    "img_url": img_url,
-                    "product_link": product_link,
-                    "discount": discount,
-                    "rating": rating,
-                    "description": description,
-                    "category": None,
-                    "sub_category": None,
-                    "seller": "https://ecoconscious.in/",
-                }
-            )
-
-        except Exception as e:
-            print("Error processing product:", e)
-
-    driver.quit()
-    return products
+                yield parse_product(product)
+            except NoSuchElementException:
+                logger.warning("Skipping an EcoConscious product card", exc_info=True)
@@ -1,15 +1,51 @@
+import logging
 import time
+
 from selenium import webdriver
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+from eco_backend.products.scrapers.elements import find_text
+from eco_backend.products.scrapers.elements import image_url
+
+logger = logging.getLogger(__name__)
 
 
+def parse_product(product):
+    """Read one Ecohoy product card into a product dict."""
+    a_tag = product.find_element(By.CSS_SELECTOR, "p.product-name.pro-name a")
+    product_link = a_tag.get_attribute("href")
+    if product_link and product_link.startswith("/"):
+        product_link = "https://www.ecohoy.com" + product_link
+
+    return {
+        "title": a_tag.text.strip(),
+        "brand": None,
+        "selling_price": (
+            find_text(product, "p.special-price span.price")
+            or find_text(product, "span.regular-price span")
+        ),
+        "cost_price": find_text(product, "p.old-price span.price"),
+        "img_url": image_url(product, "img.lazy"),
+        "product_link": product_link,
+        "discount": find_text(product, "div.spacial-offer"),
+        "rating": find_text(product, "div.star-container"),
+        "description": find_text(
+            product,
+            "p.product_sub_title.product_sub_title_desk",
+        ),
+        "category": None,
+        "sub_category": None,
+        "seller": "https://www.ecohoy.com/",
+    }
+
 
 def scrape_products():
     """
     Scrape products from https://www.ecohoy.com/personal-care.html
-    and return them as a list of dicts.
+    and yield them as dicts, each as soon as it is read.
     """
     url = "https://www.ecohoy.com/personal-care.html"
 
@@ -23,100 +59,33 @@ def scrape_products():
     chrome_options.add_argument("--window-size=1920,1080")
 
     service = Service("/usr/bin/chromedriver")
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    driver.get(url)
-    time.sleep(5)
+    # Quits the browser however the generator ends, closed early included.
+    with webdriver.Chrome(service=service, options=chrome_options) as driver:
+        driver.get(url)
+        time.sleep(5)
 
-    # --- Scroll to load all products ---
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
+        # --- Scroll to load all products ---
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        while True:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(2)
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
 
-    # --- Get all product elements ---
-    try:
-        grid = driver.find_element(By.CSS_SELECTOR, "ul.products-grid")
-
-        product_cards = grid.find_elements(By.TAG_NAME, "li")
-    except Exception as e:
-        print("Error locating products:", e)
-        driver.quit()
-        return []
-    
-    # --- Get the main product container ---
-    print(f"Found {len(product_cards)} products on Ecohoy")
-
-    products = []
-    for product in product_cards:
+        # --- Get all product elements ---
         try:
-            a_tag = product.find_element(By.CSS_SELECTOR, "p.product-name.pro-name a")
-            title = a_tag.text.strip()
-            product_link = a_tag.get_attribute("href")
-            if product_link and product_link.startswith("/"):
-                product_link = "https://www.ecohoy.com" + product_link
+            grid = driver.find_element(By.CSS_SELECTOR, "ul.products-grid")
+        except NoSuchElementException:
+            logger.warning("Could not find the product grid on Ecohoy")
+            return
+        product_cards = grid.find_elements(By.TAG_NAME, "li")
 
-            try:
-                description = product.find_element(By.CSS_SELECTOR, "p.product_sub_title.product_sub_title_desk").text.strip()
-            except:
-                description = None
-            try:
-                selling_price = product.find_element(By.CSS_SELECTOR, "p.special-price span.price").text.strip()
-            except:
-                try:
-                    selling_price = product.find_element(By.CSS_SELECTOR, "span.regular-price span").text.strip()
-                except:
-                    selling_price = None
-            try:
-                cost_price = product.find_element(By.CSS_SELECTOR, "p.old-price span.price").text.strip()
-            except:
-                cost_price = None
-            try:
-                discount = product.find_element(By.CSS_SELECTOR, "div.spacial-offer").text.strip()
-            except:
-                discount = None
-            try:
-                rating = product.find_element(By.CSS_SELECTOR, "div.star-container").text.strip()
-            except:
-                rating = None
+        logger.info("Found %d products on Ecohoy", len(product_cards))
 
+        for product in product_cards:
             try:
-                img_tag = product.find_element(By.CSS_SELECTOR, "img.lazy")
-                img_url = img_tag.get_attribute("srcset")
-                if img_url:
-                    img_url = img_url.split(",")[-1].split()[0]
-                    if img_url.startswith("//"):
-                        img_url = "https:" + img_url
-                else:
-                    img_url = img_tag.get_attribute("src")
-                    if img_url.startswith("//"):
-                        img_url = "https:" + img_url
-            except:
-                img_url = None
-        
-            products.append(
-                {
-                    "title": title,
-                    "brand": None,
-                    "selling_price": selling_price,
-                    "cost_price": cost_price,
-                    "img_url": img_url,
-                    "product_link": product_link,
-                    "discount": discount,
-                    "rating": rating,
-                    "description": description,
-                    "category": None,
-                    "sub_category": None,
-                    "seller": "https://www.ecohoy.com/",
-                }
-            )
-
-        except Exception as e:
-            print("Error processing product:", e)
-
-    driver.quit()
-    return products
+                yield parse_product(product)
+            except NoSuchElementException:
+                logger.warning("Skipping an Ecohoy product card", exc_info=True)
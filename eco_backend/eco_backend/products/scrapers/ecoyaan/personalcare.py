@@ -1,7 +1,43 @@
+import logging
 import time
+
 from selenium import webdriver
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+
+from eco_backend.products.scrapers.elements import find_attribute
+from eco_backend.products.scrapers.elements import find_text
+
+logger = logging.getLogger(__name__)
+
+
+def parse_product(product):
+    """Read one Ecoyaan product card into a product dict."""
+    # ---------- TITLE + PRODUCT LINK ----------
+    try:
+        a_tag = product.find_element(By.CSS_SELECTOR, "a.line-clamp-3")
+        title = a_tag.text.strip()
+        product_link = a_tag.get_attribute("href")
+    except NoSuchElementException:
+        title = None
+        product_link = None
+
+    return {
+        "title": title,
+        "brand": None,
+        "selling_price": find_text(product, "p.flex span.font-semibold"),
+        # Striked-through price
+        "cost_price": find_text(product, "span.line-through"),
+        "img_url": find_attribute(product, "img.object-contain", "src"),
+        "product_link": product_link,
+        "discount": find_text(product, "span.text-red-700"),
+        "rating": None,
+        "description": None,
+        "category": None,
+        "sub_category": None,
+        "seller": "https://ecoyaan.com/",
+    }
 
 
 def scrape_products():
@@ -14,85 +50,24 @@ def scrape_products():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
 
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-    time.sleep(5)
-
-    # Scroll to load all products
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-
-    # Product cards are: <div class="relative flex flex-col ... productCard">
-    product_cards = driver.find_elements(By.CSS_SELECTOR, "div.productCard")
-    print(f"Found {len(product_cards)} products")
-
-    products = []
-
-    for product in product_cards:
-
-        # ---------- TITLE + PRODUCT LINK ----------
-        try:
-            a_tag = product.find_element(By.CSS_SELECTOR, "a.line-clamp-3")
-            title = a_tag.text.strip()
-            product_link = a_tag.get_attribute("href")
-        except:
-            title = None
-            product_link = None
-
-        # ---------- SELLING PRICE ----------
-        try:
-            selling_price = product.find_element(
-                By.CSS_SELECTOR,
-                "p.flex span.font-semibold"
-            ).text.strip()
-        except:
-            selling_price = None
-
-        # ---------- COST PRICE (striked-through) ----------
-        try:
-            cost_price = product.find_element(
-                By.CSS_SELECTOR,
-                "span.line-through"
-            ).text.strip()
-        except:
-            cost_price = None
-
-        # ---------- DISCOUNT ----------
-        try:
-            discount = product.find_element(
-                By.CSS_SELECTOR,
-                "span.text-red-700"
-            ).text.strip()
-        except:
-            discount = None
+    # Quits the browser however the generator ends, closed early included.
+    with webdriver.Chrome(options=chrome_options) as driver:
+        driver.get(url)
+        time.sleep(5)
 
-        # ---------- IMAGE URL ----------
-        try:
-            img_tag = product.find_element(By.CSS_SELECTOR, "img.object-contain")
-            img_url = img_tag.get_attribute("src")
-        except:
-            img_url = None
+        # Scroll to load all products
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        while True:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(2)
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
 
-        products.append({
-            "title": title,
-            "brand": None,
-            "selling_price": selling_price,
-            "cost_price": cost_price,
-            "img_url": img_url,
-            "product_link": product_link,
-            "discount": discount,
-            "rating": None,
-            "description": None,
-            "category": None,
-            "sub_category": None,
-            "seller": "https://ecoyaan.com/",
-        })
+        # Product cards are: <div class="relative flex flex-col ... productCard">
+        product_cards = driver.find_elements(By.CSS_SELECTOR, "div.productCard")
+        logger.info("Found %d products", len(product_cards))
 
-    driver.quit()
-    return products
+        for product in product_cards:
+            yield parse_product(product)
@@ -0,0 +1,34 @@
+"""Element lookups shared by the scrapers, where a missing element reads as None."""
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+
+def find_text(element, selector):
+    """Stripped text of the first ``selector`` match under ``element``, or None."""
+    try:
+        return element.find_element(By.CSS_SELECTOR, selector).text.strip()
+    except NoSuchElementException:
+        return None
+
+
+def find_attribute(element, selector, name):
+    """Stripped ``name`` attribute of the first ``selector`` match, or None."""
+    try:
+        value = element.find_element(By.CSS_SELECTOR, selector).get_attribute(name)
+    except NoSuchElementException:
+        return None
+    return value.strip() if value else None
+
+
+def image_url(element, selector):
+    """Largest ``srcset`` candidate of the matched image, else its ``src``."""
+    try:
+        img_tag = element.find_element(By.CSS_SELECTOR, selector)
+    except NoSuchElementException:
+        return None
+    srcset = img_tag.get_attribute("srcset")
+    url = srcset.split(",")[-1].split()[0] if srcset else img_tag.get_attribute("src")
+    if url and url.startswith("//"):
+        url = "https:" + url
+    return url
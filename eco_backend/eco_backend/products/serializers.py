@@ -1,8 +1,42 @@
 from rest_framework import serializers
+
+from .models import PriceDropAlert
 from .models import Product
 from .models import UserFavorite
 
+
 class ProductSerializer(serializers.ModelSerializer):
+    # Fields the ProductCard grid actually renders, for ``?view=card``.
+    CARD_FIELDS = [
+        'id',
+        'title',
+        'brand',
+        'selling_price',
+        'img_url',
+        'discount',
+        'rating',
+        'category',
+        'seller',
+        'product_link',
+    ]
+    # One seller's listing, for ``/products/{id}/offers/``.
+    OFFER_FIELDS = [
+        'id',
+        'title',
+        'selling_price',
+        'discount',
+        'seller',
+        'product_link',
+        'price_paise',
+    ]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset: keep only the requested fields.
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Product
         fields = [
@@ -19,6 +53,19 @@ class ProductSerializer(serializers.ModelSerializer):
             'sub_category',
             'seller',
             'product_link',
+            'price_paise',
+            'cost_price_paise',
+            'discount_percent',
+            'rating_value',
+            'favorite_count',
+            'group',
+        ]
+        read_only_fields = [
+            'price_paise',
+            'cost_price_paise',
+            'discount_percent',
+            'rating_value',
+            'favorite_count',
         ]
 
 class UserFavoriteSerializer(serializers.ModelSerializer):
@@ -36,3 +83,40 @@ class UserFavoriteSerializer(serializers.ModelSerializer):
         model = UserFavorite
         fields = ["id", "product", "product_id", "added_at"]
 
+
+class FavoriteProductIdsSerializer(serializers.Serializer):
+    """Product ids for the bulk add/remove favorites endpoint."""
+
+    MAX_PRODUCT_IDS = 500
+
+    product_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_PRODUCT_IDS,
+    )
+
+    def validate_product_ids(self, product_ids):
+        product_ids = sorted(set(product_ids))
+        found = set(
+            Product.objects.filter(pk__in=product_ids).values_list("pk", flat=True),
+        )
+        missing = [pk for pk in product_ids if pk not in found]
+        if missing:
+            msg = f"Unknown products: {', '.join(map(str, missing))}."
+            raise serializers.ValidationError(msg)
+        return product_ids
+
+
+class PriceDropAlertSerializer(serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True, fields=ProductSerializer.CARD_FIELDS)
+
+    class Meta:
+        model = PriceDropAlert
+        fields = [
+            "id",
+            "product",
+            "old_price_paise",
+            "new_price_paise",
+            "created_at",
+            "read_at",
+        ]
@@ -0,0 +1,245 @@
+"""
+"Similar products": the nearest neighbours of every listed product by the
+TF-IDF cosine similarity of its title and description.
+
+The neighbour lists are built offline (nightly, by a Celery task) and stored
+in ``ProductNeighbors``, so serving them is one primary-key lookup.
+
+Building them:
+
+- Each product becomes a sparse row of term counts, title words counted
+  twice. Words in fewer than ``MIN_DF`` products cannot make two of them
+  alike, and words in more than ``MAX_DF`` of them (eco, natural, ...) alike
+  in everything, so both are dropped; the rest are weighted by sublinear TF
+  and smoothed IDF and every row is normalised, making a dot product the
+  cosine similarity.
+- The similarities are computed ``block`` rows at a time, as one product of
+  those rows with the whole matrix (sparse, or dense when most pairs of
+  products share a word), and only the ``NEIGHBORS`` best columns of each
+  row are kept. Memory is the matrix plus one block of the product (at most
+  ``BLOCK_ENTRIES`` similarities), whatever the catalog size; time grows
+  with the number of product pairs sharing a word, at worst with the
+  square of the catalog.
+- The lists are all computed before the old ones are touched, then swapped
+  in with one transaction that only deletes and inserts rows.
+"""
+
+import re
+from array import array
+from itertools import batched
+
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import Product
+from eco_backend.products.models import ProductNeighbors
+
+NEIGHBORS = 12
+# Below this a "similar" product only shares a stray word.
+MIN_SIMILARITY = 0.1
+MIN_DF = 2
+MAX_DF = 0.8
+TITLE_WEIGHT = 2
+# Similarities computed at once, which is what bounds the memory of a build.
+BLOCK_ENTRIES = 2**24
+# Above this share of product pairs with a word in common, see dense_blocks().
+DENSE_DENSITY = 0.1
+WORD = re.compile(r"[^\W\d_]{2,}")
+BATCH_SIZE = 5000
+
+
+def words(text):
+    return WORD.findall(text.lower()) if text else []
+
+
+def term_counts(documents):
+    """
+    Sparse product x term count matrix of ``(title, description)`` pairs,
+    built from flat arrays so a million products never exist as Python lists.
+    """
+    vocabulary = {}
+    indptr = array("q", [0])
+    indices = array("i")
+    counts = array("f")
+    for title, description in documents:
+        row = {}
+        for word in words(title) * TITLE_WEIGHT + words(description):
+            term = vocabulary.setdefault(word, len(vocabulary))
+            row[term] = row.get(term, 0) + 1
+        indices.extend(row)
+        counts.extend(row.values())
+        indptr.append(len(indices))
+    arrays = (
+        np.frombuffer(counts, np.float32),
+        np.frombuffer(indices, np.int32),
+        np.frombuffer(indptr, np.int64),
+    )
+    return sparse.csr_array(arrays, shape=(len(indptr) - 1, len(vocabulary)))
+
+
+def tfidf(counts, min_df=MIN_DF, max_df=MAX_DF):
+    """
+    Row-normalised TF-IDF weights of ``counts``, rare and ubiquitous terms
+    dropped.
+    """
+    products = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    kept = np.flatnonzero((df >= min_df) & (df <= max_df * products))
+    weights = counts[:, kept].tocsr()
+    weights.data = 1 + np.log(weights.data)
+    idf = np.log((1 + products) / (1 + df[kept])) + 1
+    weights = weights @ sparse.diags_array(idf.astype(np.float32))
+    norms = np.sqrt(weights.multiply(weights).sum(axis=1))
+    norms[norms == 0] = 1
+    return (sparse.diags_array((1 / norms).astype(np.float32)) @ weights).tocsr()
+
+
+def nearest_neighbors(
+    weights,
+    k=NEIGHBORS,
+    min_similarity=MIN_SIMILARITY,
+    block_entries=BLOCK_ENTRIES,
+):
+    """
+    Yield ``(row, [row, ...])``: the ``k`` most similar other rows of each row,
+    best first.
+    """
+    rows = weights.shape[0]
+    block = max(1, block_entries // max(rows, 1))
+    blocks = (
+        dense_blocks if shared_word_density(weights) > DENSE_DENSITY else sparse_blocks
+    )
+    for start, columns, scores in blocks(weights, block, k):
+        for offset in range(len(columns)):
+            row = start + offset
+            candidates = np.flatnonzero(
+                (scores[offset] >= min_similarity) & (columns[offset] != row),
+            )
+            yield row, top_k(columns[offset][candidates], scores[offset][candidates], k)
+
+
+def shared_word_density(weights):
+    """
+    Share of product pairs that have a word in common, roughly (weighted by
+    words).
+    """
+    df = np.bincount(weights.indices, minlength=weights.shape[1]).astype(np.float64)
+    return df @ df / max(weights.nnz * weights.shape[0], 1)
+
+
+def sparse_blocks(weights, block, k):
+    """
+    Similarities of a block of rows as a sparse product: only the pairs sharing
+    a word.
+    """
+    transposed = weights.T.tocsr()
+    for start in range(0, weights.shape[0], block):
+        similarities = (weights[start : start + block] @ transposed).tocsr()
+        bounds = list(
+            zip(similarities.indptr[:-1], similarities.indptr[1:], strict=True),
+        )
+        columns = [similarities.indices[begin:end] for begin, end in bounds]
+        scores = [similarities.data[begin:end] for begin, end in bounds]
+        yield start, columns, scores
+
+
+def dense_blocks(weights, block, k):
+    """
+    Similarities of a block of rows against every row, as a dense array.
+    When most pairs share a word anyway, this is several times faster than
+    the sparse product; the ``k`` best (plus the row itself) are picked
+    from it at once.
+    """
+    rows = weights.shape[0]
+    for start in range(0, rows, block):
+        similarities = np.ascontiguousarray(
+            (weights @ weights[start : start + block].toarray().T).T,
+        )
+        if rows > k + 1:
+            columns = np.argpartition(similarities, -(k + 1), axis=1)[:, -(k + 1) :]
+        else:
+            columns = np.broadcast_to(np.arange(rows), similarities.shape)
+        yield start, columns, np.take_along_axis(similarities, columns, axis=1)
+
+
+def top_k(columns, scores, k):
+    """
+    The ``k`` best ``columns`` by ``scores``; equal scores in column order, so
+    rebuilds agree.
+    """
+    if len(columns) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        columns, scores = columns[best], scores[best]
+    return columns[np.lexsort((columns, -scores))].tolist()
+
+
+def product_vectors(queryset):
+    """
+    The ids of the products in ``queryset`` and their TF-IDF rows, in the same
+    order.
+    """
+    ids = array("q")
+
+    def documents():
+        for pk, title, description in queryset.values_list(
+            "pk",
+            "title",
+            "description",
+        ).iterator(BATCH_SIZE):
+            ids.append(pk)
+            yield title, description
+
+    weights = tfidf(term_counts(documents()))
+    return np.frombuffer(ids, np.int64), weights
+
+
+def neighbor_lists(weights, k=NEIGHBORS):
+    """
+    ``nearest_neighbors()`` of the rows that have some, as flat arrays:
+    the rows, the end of each one's neighbours and all the neighbours.
+    """
+    rows, ends, neighbors = array("q"), array("q"), array("q")
+    for row, best in nearest_neighbors(weights, k=k):
+        if best:
+            rows.append(row)
+            neighbors.extend(best)
+            ends.append(len(neighbors))
+    return rows, ends, np.frombuffer(neighbors, np.int64)
+
+
+def build_neighbors(queryset=None, k=NEIGHBORS):
+    """
+    Recompute and store the neighbours of every listed product; returns how
+    many have some.
+    """
+    if queryset is None:
+        queryset = Product.objects.filter(LISTED)
+    product_ids, weights = product_vectors(queryset.order_by("pk"))
+    rows, ends, neighbors = neighbor_lists(weights, k=k)
+    neighbor_ids = product_ids[neighbors]
+    stored = (
+        ProductNeighbors(
+            product_id=product_ids[row],
+            neighbor_ids=neighbor_ids[start:end].tolist(),
+        )
+        for row, start, end in zip(rows, [0, *ends], ends, strict=False)
+    )
+    with transaction.atomic():
+        ProductNeighbors.objects.all().delete()
+        for batch in batched(stored, BATCH_SIZE, strict=False):
+            ProductNeighbors.objects.bulk_create(batch)
+    return len(rows)
+
+
+def similar_products(product, queryset):
+    """The products of ``queryset`` most similar to ``product``, best first."""
+    neighbor_ids = (
+        ProductNeighbors.objects.filter(product=product)
+        .values_list("neighbor_ids", flat=True)
+        .first()
+        or []
+    )
+    products = queryset.in_bulk(neighbor_ids)
+    return [products[pk] for pk in neighbor_ids if pk in products]
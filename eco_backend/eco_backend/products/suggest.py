@@ -0,0 +1,163 @@
+"""
+Typo-tolerant autocomplete for the search box.
+
+Matching trigrams against a million near-identical titles cannot meet an
+autocomplete budget, so misspellings are resolved against ``SuggestionTerm``
+instead: a small vocabulary of the distinct title words, brands and
+sub-categories on sale, trigram-indexed and rebuilt after every ingest. The
+corrected words then find products through the existing tsvector index.
+Results are cached per normalised prefix and catalog version.
+"""
+
+import hashlib
+
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+
+from eco_backend.products.cache import versioned_key
+from eco_backend.products.models import LISTED
+from eco_backend.products.models import Product
+from eco_backend.products.models import SuggestionTerm
+from eco_backend.products.search import SEARCH_CONFIG
+
+SUGGEST_LIMIT = 8
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 64
+MAX_QUERY_WORDS = 5
+# pg_trgm defaults to 0.6, which rejects common slips such as "toothbursh"
+# (0.55 against "toothbrush") or "chracoal" (0.38 against "charcoal"). The
+# vocabulary is small, so a looser threshold costs little.
+WORD_SIMILARITY_THRESHOLD = 0.35
+CACHE_TIMEOUT = 60 * 10
+
+# Distinct title words and how many listed products use each. Numbers, short
+# tokens and hyphenated compounds make poor suggestions, and keeping to plain
+# words lets them go straight into a raw tsquery.
+TITLE_WORDS_SQL = """
+    SELECT word, ndoc FROM ts_stat(
+        'SELECT to_tsvector(''simple'', title) FROM {table}
+         WHERE selling_price IS NOT NULL AND inactive_since IS NULL'
+    )
+    WHERE word ~ '^[[:alpha:]]{{3,}}$'
+"""
+
+
+def normalize_query(text):
+    return " ".join(text.lower().split())[:MAX_QUERY_LENGTH]
+
+
+def suggestion_cache_key(query, limit):
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    return versioned_key("suggest", limit, digest)
+
+
+def suggest(text, limit=SUGGEST_LIMIT):
+    """Return product titles, brands and sub-categories resembling ``text``."""
+    query = normalize_query(text)
+    if len(query) < MIN_QUERY_LENGTH:
+        return {"query": query, "products": [], "brands": [], "sub_categories": []}
+
+    key = suggestion_cache_key(query, limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = find_suggestions(query, limit)
+        cache.set(key, suggestions, CACHE_TIMEOUT)
+    return suggestions
+
+
+def similar_terms(text, kinds):
+    return (
+        SuggestionTerm.objects.filter(kind__in=kinds, value__trigram_word_similar=text)
+        .annotate(similarity=TrigramWordSimilarity(text, "value"))
+        .order_by("-similarity", "-product_count", "value")
+    )
+
+
+def find_suggestions(query, limit):
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Scoped to this transaction, so other queries keep the default.
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(WORD_SIMILARITY_THRESHOLD)],
+        )
+        terms = list(
+            similar_terms(
+                query,
+                [SuggestionTerm.BRAND, SuggestionTerm.SUB_CATEGORY],
+            ).values_list(
+                "kind",
+                "value",
+            )[: limit * 2],
+        )
+        words = []
+        for token in query.split()[:MAX_QUERY_WORDS]:
+            word = (
+                similar_terms(token, [SuggestionTerm.WORD])
+                .values_list("value", flat=True)
+                .first()
+            )
+            if word:
+                words.append(word)
+        products = []
+        if words:
+            products = list(
+                Product.objects.filter(
+                    LISTED,
+                    # Weight A restricts the match to the title.
+                    search_vector=SearchQuery(
+                        " & ".join(f"{word}:A" for word in words),
+                        search_type="raw",
+                        config=SEARCH_CONFIG,
+                    ),
+                )
+                # Any ``limit`` matches will do; sorting all of them first
+                # would mean fetching every matching row.
+                .order_by()
+                .values("id", "title")[:limit],
+            )
+            products.sort(key=lambda product: (product["title"], product["id"]))
+
+    return {
+        "query": query,
+        "products": products,
+        "brands": [value for kind, value in terms if kind == SuggestionTerm.BRAND][
+            :limit
+        ],
+        "sub_categories": [
+            value for kind, value in terms if kind == SuggestionTerm.SUB_CATEGORY
+        ][:limit],
+    }
+
+
+def refresh_suggestion_terms():
+    """
+    Rebuild ``SuggestionTerm`` from the title words, brands and sub-categories
+    on sale.
+    """
+    listed = Product.objects.filter(LISTED)
+    terms = []
+    for kind in (SuggestionTerm.BRAND, SuggestionTerm.SUB_CATEGORY):
+        counts = listed.exclude(**{f"{kind}__isnull": True}).exclude(**{kind: ""})
+        terms.extend(
+            SuggestionTerm(
+                kind=kind,
+                value=row[kind],
+                product_count=row["product_count"],
+            )
+            for row in counts.values(kind).annotate(product_count=Count("id"))
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(TITLE_WORDS_SQL.format(table=Product._meta.db_table))  # noqa: SLF001
+        terms.extend(
+            SuggestionTerm(kind=SuggestionTerm.WORD, value=word, product_count=count)
+            for word, count in cursor.fetchall()
+        )
+
+    with transaction.atomic():
+        SuggestionTerm.objects.all().delete()
+        SuggestionTerm.objects.bulk_create(terms)
+    return len(terms)
@@ -1,8 +1,34 @@
+import logging
+from array import array
+from collections import Counter
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from eco_backend.products.alerts import price_drop
+from eco_backend.products.alerts import send_price_drop_alerts
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.home import rebuild_home_snapshot
+from eco_backend.products.ingest import finish_run
+from eco_backend.products.ingest import ingest
+from eco_backend.products.ingest import purge_inactive_products
+from eco_backend.products.live import CATALOG
+from eco_backend.products.live import SCRAPE
+from eco_backend.products.live import price_topic
+from eco_backend.products.live import publish
+from eco_backend.products.live import publish_many
+from eco_backend.products.matching import match_products
+from eco_backend.products.models import IngestRun
 from eco_backend.products.models import Product
+from eco_backend.products.popularity import flush_favorite_counts
+from eco_backend.products.price_history import maintain_partitions
 from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.similar import build_neighbors
+from eco_backend.products.suggest import refresh_suggestion_terms
 from eco_backend.products.utils.classify_title import classify_title
-import logging
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,31 +38,76 @@ def scrape_and_save_products(self, scraper_name: str):
         raise ValueError(f"Unknown scraper: {scraper_name}")
 
     scraper_func = SCRAPERS[scraper_name]
-    products_data = scraper_func()
-
-    for item in products_data:
-        if item.get("title") and item.get("product_link"):
-            try:
-                Product.objects.update_or_create(
-                    product_link=item["product_link"],
-                    defaults={
-                        "title": item["title"],
-                        "brand": item["brand"],
-                        "selling_price": item["selling_price"],
-                        "cost_price": item["cost_price"],
-                        "img_url": item["img_url"],
-                        "discount": item["discount"],
-                        "rating": item["rating"],
-                        "description": item["description"],
-                        "category": item["category"],
-                        "sub_category": item["sub_category"],
-                        "seller": item["seller"],
-                    },
-                )
-            except:
+    publish(SCRAPE, {"scraper": scraper_name, "status": "scraping"})
+    # Saved before the first batch, and its counts after each one, so a run
+    # that dies part way still records what it wrote.
+    run = IngestRun.objects.create(scraper=scraper_name, started_at=timezone.now())
+    seen_ids = array("q")
+    sellers = set()
+    totals = Counter(new=0, changed=0, unchanged=0, failed=0)
+    cheaper = 0
+
+    # The scraper yields products as it reads them; each batch is written
+    # (searchable at once), published and alerted on as soon as it fills up,
+    # so what a run commits is never lost if it dies part way.
+    for number, (stats, saved) in enumerate(ingest(scraper_func()), start=1):
+        totals.update(stats)
+        logger.info(
+            "%s batch %d: %d new, %d changed, %d unchanged, %d failed",
+            scraper_name,
+            number,
+            stats["new"],
+            stats["changed"],
+            stats["unchanged"],
+            stats["failed"],
+        )
+        price_changes = []
+        price_drops = {}
+        for product, status, old_price in saved:
+            seen_ids.append(product.pk)
+            sellers.add(product.seller)
+            if status == "unchanged":
                 continue
-            
-    return f"{len(products_data)} products processed for {scraper_name}."
+            if price_drop(old_price, product.price_paise):
+                price_drops[product.pk] = old_price
+            if old_price is not None and old_price != product.price_paise:
+                change = {
+                    "product_id": product.pk,
+                    "old_price_paise": old_price,
+                    "price_paise": product.price_paise,
+                }
+                price_changes.append((price_topic(product.pk), change))
+        IngestRun.objects.filter(pk=run.pk).update(**totals)
+        saving = {"scraper": scraper_name, "status": "saving", **totals}
+        if stats["new"] or stats["changed"]:
+            version = bump_catalog_version()
+            price_changes.append((CATALOG, {"version": version}))
+        publish_many([*price_changes, (SCRAPE, saving)])
+        if price_drops:
+            cheaper += len(price_drops)
+            # JSON task arguments turn int keys into strings; send pairs.
+            notify_price_drops.delay(list(price_drops.items()))
+
+    run.sellers = sorted(seller for seller in sellers if seller)
+    summary = finish_run(run, totals, seen_ids)
+    refresh_suggestion_terms()
+    version = bump_catalog_version()
+    rebuild_home_snapshot()
+    done = {"scraper": scraper_name, "status": "done", "saved": len(seen_ids)}
+    publish_many(
+        [
+            (CATALOG, {"version": version}),
+            (SCRAPE, {**done, **summary}),
+        ],
+    )
+    if summary["new"] or summary["changed"] or summary["disappeared"]:
+        match_products_task.delay()
+
+    changes = ", ".join(f"{count} {name}" for name, count in summary.items())
+    return (
+        f"{totals.total()} products processed for {scraper_name}: {changes}, "
+        f"{cheaper} got cheaper."
+    )
 
 @shared_task(bind=True)
 def classify_product_title_task(self):
@@ -52,4 +123,67 @@ def classify_product_title_task(self):
             logger.error(f"Error processing {e}")
             continue
 
-    return f"Category and sub_category added in all the products."
\ No newline at end of file
+    refresh_suggestion_terms()
+    version = bump_catalog_version()
+    rebuild_home_snapshot()
+    publish(CATALOG, {"version": version})
+
+    return f"Category and sub_category added in all the products."
+
+
+@shared_task
+def flush_favorite_counts_task():
+    updated = flush_favorite_counts()
+    return f"Favorite counts updated for {updated} products."
+
+
+@shared_task
+def notify_price_drops(price_drops):
+    """
+    Alert the users who favorited the products in ``price_drops``, (product
+    id, old price) pairs.
+    """
+    sent = send_price_drop_alerts(dict(price_drops))
+    return f"{sent} price-drop alerts sent for {len(price_drops)} products."
+
+
+# Rebuilding the similar products takes hours on a large catalog, far past
+# the default task limits (CELERY_TASK_SOFT_TIME_LIMIT).
+SIMILAR_PRODUCTS_TIME_LIMIT = 6 * 60 * 60
+# Matching takes minutes at a million products.
+MATCH_PRODUCTS_TIME_LIMIT = 30 * 60
+
+
+@shared_task(
+    soft_time_limit=SIMILAR_PRODUCTS_TIME_LIMIT,
+    time_limit=SIMILAR_PRODUCTS_TIME_LIMIT + 5 * 60,
+)
+def build_similar_products_task():
+    stored = build_neighbors()
+    version = bump_catalog_version()
+    publish(CATALOG, {"version": version})
+    return f"Similar products stored for {stored} products."
+
+
+@shared_task(
+    soft_time_limit=MATCH_PRODUCTS_TIME_LIMIT,
+    time_limit=MATCH_PRODUCTS_TIME_LIMIT + 5 * 60,
+)
+def match_products_task():
+    groups = match_products()
+    version = bump_catalog_version()
+    publish(CATALOG, {"version": version})
+    return f"{groups} products are listed by more than one seller."
+
+
+@shared_task
+def maintain_price_history_task():
+    dropped = maintain_partitions(settings.PRICE_HISTORY_MONTHS)
+    return f"Price history partitions in place, {len(dropped)} old ones dropped."
+
+
+@shared_task
+def purge_inactive_products_task():
+    before = timezone.now() - timedelta(days=settings.PRODUCT_RETENTION_DAYS)
+    purged = purge_inactive_products(before)
+    return f"{purged} products inactive since before {before:%Y-%m-%d} deleted."
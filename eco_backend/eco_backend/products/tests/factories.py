@@ -0,0 +1,55 @@
+from factory import Faker
+from factory import LazyAttribute
+from factory import Sequence
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from eco_backend.products.models import PriceDropAlert
+from eco_backend.products.models import Product
+from eco_backend.products.models import UserFavorite
+from eco_backend.products.utils.normalize import parse_discount_percent
+from eco_backend.products.utils.normalize import parse_price_paise
+from eco_backend.products.utils.normalize import parse_rating
+from eco_backend.users.tests.factories import UserFactory
+
+
+class ProductFactory(DjangoModelFactory[Product]):
+    title = Faker("sentence", nb_words=4)
+    product_link = Sequence(lambda n: f"https://seller.example/products/{n}")
+    selling_price = "₹295"
+    cost_price = "₹350"
+    discount = "16% off"
+    rating = None
+    category = "personal care"
+    sub_category = "toothbrush"
+    description = Faker("paragraph")
+    img_url = Sequence(lambda n: f"https://seller.example/images/{n}.jpg")
+    brand = "Beco"
+    seller = "https://seller.example/"
+    price_paise = LazyAttribute(lambda o: parse_price_paise(o.selling_price))
+    cost_price_paise = LazyAttribute(lambda o: parse_price_paise(o.cost_price))
+    discount_percent = LazyAttribute(
+        lambda o: parse_discount_percent(o.discount, o.price_paise, o.cost_price_paise),
+    )
+    rating_value = LazyAttribute(lambda o: parse_rating(o.rating))
+
+    class Meta:
+        model = Product
+
+
+class UserFavoriteFactory(DjangoModelFactory[UserFavorite]):
+    user = SubFactory(UserFactory)
+    product = SubFactory(ProductFactory)
+
+    class Meta:
+        model = UserFavorite
+
+
+class PriceDropAlertFactory(DjangoModelFactory[PriceDropAlert]):
+    user = SubFactory(UserFactory)
+    product = SubFactory(ProductFactory)
+    old_price_paise = 35000
+    new_price_paise = LazyAttribute(lambda o: o.product.price_paise)
+
+    class Meta:
+        model = PriceDropAlert
@@ -0,0 +1,155 @@
+from functools import partial
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products import tasks
+from eco_backend.products.alerts import send_price_drop_alerts
+from eco_backend.products.cache import catalog_version
+from eco_backend.products.ingest import ingest
+from eco_backend.products.models import PriceDropAlert
+from eco_backend.products.models import Product
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import PriceDropAlertFactory
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.tests.factories import UserFavoriteFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def scraped(product, selling_price):
+    return {
+        "title": product.title,
+        "brand": product.brand,
+        "selling_price": selling_price,
+        "cost_price": product.cost_price,
+        "img_url": product.img_url,
+        "product_link": product.product_link,
+        "discount": product.discount,
+        "rating": product.rating,
+        "description": product.description,
+        "category": product.category,
+        "sub_category": product.sub_category,
+        "seller": product.seller,
+    }
+
+
+def alerts():
+    return sorted(
+        PriceDropAlert.objects.values_list(
+            "user_id",
+            "product_id",
+            "old_price_paise",
+            "new_price_paise",
+        ),
+    )
+
+
+class TestIngestAlerts:
+    def test_alerts_the_favorites_of_cheaper_products(
+        self,
+        settings,
+        monkeypatch,
+        mailoutbox,
+    ):
+        cheaper, dearer, same = ProductFactory.create_batch(3, selling_price="₹200")
+        fans = [UserFavoriteFactory(product=cheaper).user for _ in range(2)]
+        UserFavoriteFactory(product=dearer)
+        UserFavoriteFactory(product=same)
+        items = [
+            scraped(cheaper, "₹150"),
+            scraped(dearer, "₹250"),
+            scraped(same, "₹200"),
+        ]
+        monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: items)
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+
+        result = scrape_and_save_products.delay("test_scraper").get()
+
+        assert result.endswith("1 got cheaper.")
+        assert alerts() == sorted((fan.pk, cheaper.pk, 20000, 15000) for fan in fans)
+        assert sorted(message.to[0] for message in mailoutbox) == sorted(
+            fan.email for fan in fans
+        )
+        assert "₹200.00 → ₹150.00" in mailoutbox[0].body
+
+    def test_batches_saved_before_a_failure_are_alerted(
+        self,
+        settings,
+        monkeypatch,
+        mailoutbox,
+    ):
+        product = ProductFactory(selling_price="₹200")
+        fan = UserFavoriteFactory(product=product).user
+        version = catalog_version()
+
+        def scraper():
+            yield scraped(product, "₹150")
+            msg = "browser crashed"
+            raise RuntimeError(msg)
+
+        monkeypatch.setitem(SCRAPERS, "test_scraper", scraper)
+        monkeypatch.setattr(tasks, "ingest", partial(ingest, batch_size=1))
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+
+        with pytest.raises(RuntimeError):
+            scrape_and_save_products("test_scraper")
+
+        assert [message.to for message in mailoutbox] == [[fan.email]]
+        assert catalog_version() > version
+
+
+class TestSendPriceDropAlerts:
+    def test_one_email_per_user(self, user, mailoutbox):
+        products = ProductFactory.create_batch(2, selling_price="₹100")
+        for product in products:
+            UserFavoriteFactory(user=user, product=product)
+
+        assert send_price_drop_alerts({product.pk: 12000 for product in products}) == 2  # noqa: PLR2004
+        (message,) = mailoutbox
+        assert message.subject == "2 of your favorites got cheaper"
+
+    def test_queries_do_not_grow_with_users(self, mailoutbox):
+        product = ProductFactory(selling_price="₹100")
+        UserFavoriteFactory(product=product)
+        UserFavoriteFactory.create_batch(5)
+        with CaptureQueriesContext(connection) as one:
+            send_price_drop_alerts({product.pk: 12000})
+
+        UserFavoriteFactory.create_batch(5, product=product)
+        with CaptureQueriesContext(connection) as six:
+            sent = send_price_drop_alerts({product.pk: 12000})
+
+        assert sent == 6  # noqa: PLR2004
+        assert len(six) == len(one)
+
+    def test_skips_prices_that_went_back_up(self, mailoutbox):
+        product = UserFavoriteFactory().product
+        Product.objects.filter(pk=product.pk).update(price_paise=15000)
+
+        assert send_price_drop_alerts({product.pk: 12000}) == 0
+        assert mailoutbox == []
+
+
+class TestPriceDropAlertViewSet:
+    def test_lists_own_alerts(self, api_client, user):
+        older = PriceDropAlertFactory(user=user)
+        newer = PriceDropAlertFactory(user=user)
+        PriceDropAlertFactory()
+
+        response = api_client.get(reverse("api:pricedropalert-list"))
+
+        assert [row["id"] for row in response.data["results"]] == [newer.pk, older.pk]
+        assert response.data["results"][0]["product"]["id"] == newer.product_id
+
+    def test_mark_read(self, api_client, user):
+        PriceDropAlertFactory.create_batch(2, user=user)
+        other = PriceDropAlertFactory()
+
+        assert api_client.post(reverse("api:pricedropalert-read")).data == {"read": 2}
+        unread = api_client.get(reverse("api:pricedropalert-list"), {"unread": "1"})
+        assert unread.data["results"] == []
+        assert PriceDropAlert.objects.get(pk=other.pk).read_at is None
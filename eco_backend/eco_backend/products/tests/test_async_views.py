@@ -0,0 +1,133 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from eco_backend.products.cache import response_cache_stats
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.tests.factories import UserFavoriteFactory
+from eco_backend.products.views import HomeView
+from eco_backend.products.views import ProductViewSet
+from eco_backend.users.api.authentication import local_tokens
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_tokens():
+    local_tokens.clear()
+    yield
+    local_tokens.clear()
+
+
+@pytest.fixture
+def token_client(user) -> APIClient:
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}",
+    )
+    return client
+
+
+class TestAsyncReads:
+    def test_list_hit_is_served_without_the_viewset(self, token_client):
+        ProductFactory.create_batch(3)
+        url = reverse("api:product-list")
+        first = token_client.get(url, {"page_size": 2})
+
+        with CaptureQueriesContext(connection) as captured:
+            second = token_client.get(url, {"page_size": 2})
+
+        assert isinstance(first, Response)
+        assert not isinstance(second, Response)
+        assert second.json() == first.json()
+        assert second["Content-Type"] == "application/json"
+        assert response_cache_stats()["hits"] == 1
+        assert captured.captured_queries == []
+
+    def test_hit_carries_the_callers_favorites(self, token_client, user):
+        favorite, plain = ProductFactory.create_batch(2)
+        UserFavoriteFactory(user=user, product=favorite)
+        url = reverse("api:product-list")
+        token_client.get(url, {"fields": "id,is_favorite"})
+
+        rows = token_client.get(url, {"fields": "id,is_favorite"}).json()["results"]
+
+        assert {row["id"]: row["is_favorite"] for row in rows} == {
+            favorite.pk: True,
+            plain.pk: False,
+        }
+
+    def test_detail_miss_is_fetched_asynchronously(self, token_client, api_client):
+        product = ProductFactory()
+        url = reverse("api:product-detail", args=[product.pk])
+
+        response = token_client.get(url, {"view": "card"})
+
+        assert not isinstance(response, Response)
+        assert response.json() == api_client.get(url, {"view": "card"}).data
+        assert response_cache_stats()["misses"] == 1
+
+    def test_unknown_product_falls_back(self, token_client):
+        response = token_client.get(reverse("api:product-detail", args=[12345]))
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_not_modified(self, token_client):
+        ProductFactory()
+        url = reverse("api:product-list")
+        etag = token_client.get(url)["ETag"]
+
+        response = token_client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_facets_hit(self, token_client):
+        ProductFactory(brand="Acme")
+        url = reverse("api:product-facets")
+        first = token_client.get(url)
+
+        second = token_client.get(url)
+
+        assert not isinstance(second, Response)
+        assert second.json() == first.json()
+
+    def test_bad_token_is_rejected_by_drf(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token not-a-token")
+
+        response = client.get(reverse("api:product-list"))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_invalid_fields_are_rejected_by_drf(self, token_client):
+        response = token_client.get(reverse("api:product-list"), {"fields": "id,nope"})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_browsable_api_stays_on_drf(self, token_client):
+        ProductFactory()
+        url = reverse("api:product-list")
+        token_client.get(url)
+
+        response = token_client.get(url, headers={"Accept": "text/html"})
+
+        assert response["Content-Type"].startswith("text/html")
+
+
+def test_reads_skip_the_request_transaction():
+    for name in (
+        "api:product-list",
+        "api:product-facets",
+        "api:product-suggest",
+        "api:home",
+    ):
+        assert resolve(reverse(name)).func._non_atomic_requests  # noqa: SLF001
+    assert ProductViewSet.dispatch._non_atomic_requests  # noqa: SLF001
+    assert HomeView.dispatch._non_atomic_requests  # noqa: SLF001
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.cache import response_cache_stats
+from eco_backend.products.models import Product
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def product_queries(queries):
+    return [query["sql"] for query in queries if Product._meta.db_table in query["sql"]]  # noqa: SLF001
+
+
+class TestResponseCache:
+    def test_hit_skips_the_database(self, api_client):
+        ProductFactory.create_batch(3)
+        url = reverse("api:product-list")
+        first = api_client.get(url, {"ordering": "title", "page_size": 2})
+
+        with CaptureQueriesContext(connection) as captured:
+            second = api_client.get(url, {"page_size": 2, "ordering": "title"})
+
+        assert second.data == first.data
+        assert product_queries(captured.captured_queries) == []
+
+    def test_detail_is_cached_per_product(self, api_client):
+        first, second = ProductFactory.create_batch(2)
+
+        assert (
+            api_client.get(reverse("api:product-detail", args=[first.pk])).data["id"]
+            == first.pk
+        )
+        assert (
+            api_client.get(reverse("api:product-detail", args=[second.pk])).data["id"]
+            == second.pk
+        )
+
+    def test_version_bump_invalidates(self, api_client):
+        product = ProductFactory(title="Old Title")
+        url = reverse("api:product-detail", args=[product.pk])
+        api_client.get(url)
+
+        Product.objects.filter(pk=product.pk).update(title="New Title")
+        assert api_client.get(url).data["title"] == "Old Title"
+
+        bump_catalog_version()
+        assert api_client.get(url).data["title"] == "New Title"
+
+    def test_errors_are_not_cached(self, api_client):
+        url = reverse("api:product-detail", args=[12345])
+        assert api_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+        ProductFactory(id=12345)
+        assert api_client.get(url).status_code == HTTPStatus.OK
+
+    def test_counts_hits_and_misses(self, api_client):
+        ProductFactory()
+        url = reverse("api:product-list")
+        for _ in range(3):
+            api_client.get(url)
+
+        stats = response_cache_stats()
+
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (2, 1, 0.6667)
+
+
+def test_cache_stats_are_admin_only(api_client, admin_client):
+    url = reverse("api:product-cache-stats")
+
+    assert api_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    assert admin_client.get(url).json()["misses"] == 0
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.models import Product
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def product():
+    return ProductFactory()
+
+
+@pytest.fixture(params=["list", "detail", "facets"])
+def url(request, product):
+    if request.param == "detail":
+        return reverse("api:product-detail", args=[product.pk])
+    return reverse(f"api:product-{request.param}")
+
+
+class TestConditionalGet:
+    def test_sends_validators(self, api_client, url):
+        response = api_client.get(url)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response["ETag"].startswith('W/"catalog-')
+        assert response["Last-Modified"]
+        assert "no-cache" in response["Cache-Control"]
+
+    def test_matching_etag_short_circuits(self, api_client, url):
+        etag = api_client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.content == b""
+        assert not [
+            q["sql"]
+            for q in captured.captured_queries
+            if "products_product" in q["sql"]
+        ]
+
+    def test_if_modified_since(self, api_client, url):
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        assert (
+            api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code
+            == HTTPStatus.NOT_MODIFIED
+        )
+
+    def test_version_bump_changes_etag(self, api_client, url):
+        etag = api_client.get(url)["ETag"]
+
+        bump_catalog_version()
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTPStatus.OK
+
+    def test_version_bump_moves_last_modified(self, api_client, url, product):
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        # In place, as the ingest updates prices; scraped_at stays put.
+        Product.objects.filter(pk=product.pk).update(price_paise=100)
+        bump_catalog_version()
+
+        assert (
+            api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code
+            == HTTPStatus.OK
+        )
+
+
+def test_missing_product_has_no_validators(api_client):
+    response = api_client.get(reverse("api:product-detail", args=[12345]))
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "ETag" not in response
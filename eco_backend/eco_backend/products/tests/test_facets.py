@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.models import Product
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.search import update_search_vectors
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def facets(api_client, **params):
+    response = api_client.get(reverse("api:product-facets"), params)
+    assert response.status_code == HTTPStatus.OK
+    return response.data
+
+
+class TestFacets:
+    def test_counts_every_dimension(self, api_client):
+        ProductFactory.create_batch(
+            2,
+            brand="Beco",
+            category="personal care",
+            sub_category="toothbrush",
+        )
+        ProductFactory(
+            brand="Terra",
+            category="home",
+            sub_category=None,
+            seller="https://other.example/",
+        )
+        ProductFactory(brand="Hidden", selling_price=None)
+
+        assert facets(api_client) == {
+            "brand": [{"value": "Beco", "count": 2}, {"value": "Terra", "count": 1}],
+            "category": [
+                {"value": "personal care", "count": 2},
+                {"value": "home", "count": 1},
+            ],
+            "sub_category": [{"value": "toothbrush", "count": 2}],
+            "seller": [
+                {"value": "https://seller.example/", "count": 2},
+                {"value": "https://other.example/", "count": 1},
+            ],
+        }
+
+    def test_restricted_by_search_and_filters(self, api_client):
+        ProductFactory(title="Bamboo Toothbrush", brand="Beco", selling_price="₹99")
+        ProductFactory(title="Bamboo Comb", brand="Terra", selling_price="₹999")
+        ProductFactory(title="Neem Soap", brand="Mamaearth", selling_price="₹99")
+        update_search_vectors(Product.objects.all())
+
+        data = facets(api_client, search="bamboo", max_price="500")
+
+        assert data["brand"] == [{"value": "Beco", "count": 1}]
+
+    def test_cached_until_the_catalog_version_moves(self, api_client):
+        ProductFactory(brand="Beco")
+        assert facets(api_client)["brand"] == [{"value": "Beco", "count": 1}]
+
+        ProductFactory(brand="Terra")
+        assert facets(api_client)["brand"] == [{"value": "Beco", "count": 1}]
+
+        bump_catalog_version()
+        assert facets(api_client)["brand"] == [
+            {"value": "Beco", "count": 1},
+            {"value": "Terra", "count": 1},
+        ]
+
+
+def test_ingest_invalidates_facets(api_client, settings, monkeypatch):
+    ProductFactory(brand="Beco")
+    facets(api_client)
+    item = {
+        "title": "Neem Comb",
+        "brand": "Terra",
+        "selling_price": "₹99",
+        "cost_price": None,
+        "img_url": None,
+        "product_link": "https://seller.example/products/neem-comb",
+        "discount": None,
+        "rating": None,
+        "description": None,
+        "category": None,
+        "sub_category": None,
+        "seller": "https://seller.example/",
+    }
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: [item])
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    scrape_and_save_products.delay("test_scraper")
+
+    assert facets(api_client)["brand"] == [
+        {"value": "Beco", "count": 1},
+        {"value": "Terra", "count": 1},
+    ]
@@ -0,0 +1,202 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from eco_backend.products.models import UserFavorite
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.tests.factories import UserFavoriteFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def favorite_product_ids(user):
+    return set(
+        UserFavorite.objects.filter(user=user).values_list("product_id", flat=True),
+    )
+
+
+class TestUserFavoriteViewSet:
+    def test_lists_only_own_favorites_newest_first(self, api_client, user):
+        older = UserFavoriteFactory(user=user)
+        newer = UserFavoriteFactory(user=user)
+        other = UserFavoriteFactory()
+
+        response = api_client.get(reverse("api:userfavorite-list"))
+
+        assert [row["id"] for row in response.data] == [newer.pk, older.pk]
+        assert (
+            api_client.get(
+                reverse("api:userfavorite-detail", args=[other.pk]),
+            ).status_code
+            == HTTPStatus.NOT_FOUND
+        )
+        assert (
+            api_client.delete(
+                reverse("api:userfavorite-detail", args=[other.pk]),
+            ).status_code
+            == HTTPStatus.NOT_FOUND
+        )
+
+    def test_query_count_does_not_grow_with_favorites(self, api_client, user):
+        UserFavoriteFactory(user=user)
+        with CaptureQueriesContext(connection) as one:
+            api_client.get(reverse("api:userfavorite-list"))
+
+        UserFavoriteFactory.create_batch(5, user=user)
+        with CaptureQueriesContext(connection) as six:
+            response = api_client.get(reverse("api:userfavorite-list"))
+
+        assert len(response.data) == 6  # noqa: PLR2004
+        assert len(six) == len(one)
+
+
+class TestBulkFavorites:
+    def test_add_skips_existing_favorites(self, api_client, user):
+        kept = UserFavoriteFactory(user=user)
+        products = ProductFactory.create_batch(2)
+        ids = [kept.product_id, *(p.pk for p in products), products[0].pk]
+
+        response = api_client.post(
+            reverse("api:userfavorite-bulk"),
+            {"product_ids": ids},
+            format="json",
+        )
+
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.data == {"added": 2}
+        assert favorite_product_ids(user) == {
+            kept.product_id,
+            *(p.pk for p in products),
+        }
+        assert UserFavorite.objects.get(pk=kept.pk).added_at == kept.added_at
+
+    def test_remove_is_one_delete(self, api_client, user):
+        favorites = UserFavoriteFactory.create_batch(3, user=user)
+        other = UserFavoriteFactory(product=favorites[0].product)
+        ids = [favorites[0].product_id, favorites[1].product_id]
+
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.delete(
+                reverse("api:userfavorite-bulk"),
+                {"product_ids": ids},
+                format="json",
+            )
+
+        assert response.data == {"removed": 2}
+        assert favorite_product_ids(user) == {favorites[2].product_id}
+        assert UserFavorite.objects.filter(pk=other.pk).exists()
+        assert len([q for q in captured if q["sql"].startswith("DELETE")]) == 1
+
+    def test_rejects_unknown_products(self, api_client, user):
+        product = ProductFactory()
+
+        response = api_client.post(
+            reverse("api:userfavorite-bulk"),
+            {"product_ids": [product.pk, product.pk + 1000]},
+            format="json",
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert favorite_product_ids(user) == set()
+
+
+class TestIsFavorite:
+    def test_flags_survive_the_shared_response_cache(self, api_client, user):
+        favorite, plain = ProductFactory.create_batch(2)
+        UserFavoriteFactory(user=user, product=favorite)
+        other = APIClient()
+        other.force_authenticate(UserFavoriteFactory(product=plain).user)
+
+        # Warm the cache as another user first; the flags are per caller.
+        other_rows = other.get(
+            reverse("api:product-list"),
+            {"fields": "id,is_favorite"},
+        ).data["results"]
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(
+                reverse("api:product-list"),
+                {"fields": "id,is_favorite"},
+            )
+
+        assert {row["id"]: row["is_favorite"] for row in other_rows} == {
+            favorite.pk: False,
+            plain.pk: True,
+        }
+        assert {row["id"]: row["is_favorite"] for row in response.data["results"]} == {
+            favorite.pk: True,
+            plain.pk: False,
+        }
+        assert not [
+            q
+            for q in captured
+            if "products_product" in q["sql"] and "MAX(" not in q["sql"]
+        ]
+
+    def test_detail_and_other_fields(self, api_client, user):
+        product = UserFavoriteFactory(user=user).product
+
+        detail = api_client.get(reverse("api:product-detail", args=[product.pk]))
+        ids_only = api_client.get(reverse("api:product-list"), {"fields": "id"})
+
+        assert detail.data["is_favorite"] is True
+        assert ids_only.data["results"] == [{"id": product.pk}]
+
+    def test_flag_without_its_id(self, api_client, user):
+        product = UserFavoriteFactory(user=user).product
+
+        listed = api_client.get(reverse("api:product-list"), {"fields": "is_favorite"})
+        detail = api_client.get(
+            reverse("api:product-detail", args=[product.pk]),
+            {"fields": "title,is_favorite"},
+        )
+
+        assert listed.data["results"] == [{"is_favorite": True}]
+        assert detail.data == {"title": product.title, "is_favorite": True}
+
+    def test_etag_changes_when_favorites_do(self, api_client, user):
+        product = ProductFactory()
+        url = reverse("api:product-list")
+        etag = api_client.get(url)["ETag"]
+
+        api_client.post(
+            reverse("api:userfavorite-bulk"),
+            {"product_ids": [product.pk]},
+            format="json",
+        )
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.data["results"][0]["is_favorite"] is True
+
+
+class TestFavoriteIds:
+    def test_lists_own_ids_from_the_cache(self, api_client, user):
+        favorites = UserFavoriteFactory.create_batch(2, user=user)
+        UserFavoriteFactory()
+
+        first = api_client.get(reverse("api:userfavorite-ids"))
+        with CaptureQueriesContext(connection) as captured:
+            second = api_client.get(reverse("api:userfavorite-ids"))
+
+        assert first.data == {"product_ids": sorted(f.product_id for f in favorites)}
+        assert second.data == first.data
+        assert not [q for q in captured if "products_userfavorite" in q["sql"]]
+
+    def test_changes_drop_the_cached_ids(self, api_client, user):
+        product = ProductFactory()
+        url = reverse("api:userfavorite-ids")
+        api_client.get(url)
+
+        created = api_client.post(
+            reverse("api:userfavorite-list"),
+            {"product_id": product.pk},
+            format="json",
+        )
+        assert api_client.get(url).data == {"product_ids": [product.pk]}
+
+        api_client.delete(reverse("api:userfavorite-detail", args=[created.data["id"]]))
+        assert api_client.get(url).data == {"product_ids": []}
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from eco_backend.products.home import rebuild_home_snapshot
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.serializers import ProductSerializer
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def home(api_client):
+    response = api_client.get(reverse("api:home"))
+    assert response.status_code == HTTPStatus.OK
+    return response.data
+
+
+class TestHome:
+    def test_snapshot_contents(self, api_client):
+        best = ProductFactory(
+            rating="Rated 4.90 out of 5",
+            category="home",
+            brand="Terra",
+        )
+        good = ProductFactory(rating="Rated 4.10 out of 5", category="personal care")
+        ProductFactory(rating=None, category="personal care")
+        ProductFactory(rating="Rated 5.00 out of 5", selling_price=None)
+
+        data = home(api_client)
+
+        assert [p["id"] for p in data["featured"]] == [best.pk, good.pk]
+        assert list(data["featured"][0]) == ProductSerializer.CARD_FIELDS
+        assert data["categories"] == [
+            {"value": "personal care", "count": 2},
+            {"value": "home", "count": 1},
+        ]
+        assert data["stats"]["products"] == 3  # noqa: PLR2004
+        assert data["stats"]["brands"] == 2  # noqa: PLR2004
+
+    def test_served_from_one_cache_read(
+        self,
+        api_client,
+        django_assert_max_num_queries,
+    ):
+        ProductFactory(rating="Rated 4.50 out of 5")
+        rebuild_home_snapshot()
+
+        with django_assert_max_num_queries(2):  # the request's savepoint and release
+            assert len(home(api_client)["featured"]) == 1
+
+    def test_requires_login(self, client):
+        assert client.get(reverse("api:home")).status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_ingest_rebuilds_snapshot(api_client, settings, monkeypatch):
+    assert home(api_client)["featured"] == []
+    item = {
+        "title": "Neem Comb",
+        "brand": "Terra",
+        "selling_price": "₹99",
+        "cost_price": None,
+        "img_url": None,
+        "product_link": "https://seller.example/products/neem-comb",
+        "discount": None,
+        "rating": "Rated 4.80 out of 5",
+        "description": None,
+        "category": "personal care",
+        "sub_category": None,
+        "seller": "https://seller.example/",
+    }
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: [item])
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    scrape_and_save_products.delay("test_scraper")
+
+    assert [p["title"] for p in home(api_client)["featured"]] == ["Neem Comb"]
@@ -0,0 +1,302 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from eco_backend.products.ingest import INGEST_BATCH_SIZE
+from eco_backend.products.ingest import ingest
+from eco_backend.products.ingest import purge_inactive_products
+from eco_backend.products.ingest import upsert_batch
+from eco_backend.products.models import IngestRun
+from eco_backend.products.models import Product
+from eco_backend.products.models import UserFavorite
+from eco_backend.products.price_history import record_prices
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.utils.synthetic_catalog import build_items
+
+pytestmark = pytest.mark.django_db
+
+
+def test_batches_report_their_counts():
+    existing = ProductFactory(product_link="https://synthetic.invalid/products/1")
+    items = list(build_items(5))
+    items[3]["title"] = ""
+
+    batches = [stats for stats, _ in ingest(items, batch_size=2)]
+
+    assert batches == [
+        {"new": 1, "changed": 1, "unchanged": 0, "failed": 0},
+        {"new": 1, "changed": 0, "unchanged": 0, "failed": 1},
+        {"new": 1, "changed": 0, "unchanged": 0, "failed": 0},
+    ]
+    existing.refresh_from_db()
+    assert existing.title == items[1]["title"]
+    assert Product.objects.count() == 4  # noqa: PLR2004
+
+
+def test_saved_products_come_with_their_old_price():
+    existing = ProductFactory(
+        product_link="https://synthetic.invalid/products/0",
+        selling_price="₹500",
+    )
+    items = list(build_items(2))
+
+    _, saved = upsert_batch(items)
+
+    assert [
+        (product.pk, status, old_price) for product, status, old_price in saved
+    ] == [
+        (existing.pk, "changed", 50000),
+        (Product.objects.get(product_link=items[1]["product_link"]).pk, "new", None),
+    ]
+    assert saved[0][0].price_paise != 50000  # noqa: PLR2004
+
+
+def test_rejected_rows_do_not_sink_the_batch():
+    items = list(build_items(3))
+    items[1]["category"] = "x" * 100
+
+    stats, saved = upsert_batch(items)
+
+    assert stats == {"new": 2, "changed": 0, "unchanged": 0, "failed": 1}
+    assert [product.product_link for product, _, _ in saved] == [
+        items[0]["product_link"],
+        items[2]["product_link"],
+    ]
+    assert not Product.objects.filter(product_link=items[1]["product_link"]).exists()
+
+
+def test_last_duplicate_wins():
+    item = next(build_items(1))
+
+    stats, _ = upsert_batch([item, {**item, "title": "Renamed"}])
+
+    assert stats == {"new": 1, "changed": 0, "unchanged": 0, "failed": 0}
+    assert Product.objects.get().title == "Renamed"
+
+
+def test_duplicates_of_an_unchanged_product_are_not_changes():
+    item = next(build_items(1))
+    upsert_batch([item])
+
+    stats, _ = upsert_batch([item, item])
+
+    assert stats == {"new": 0, "changed": 0, "unchanged": 1, "failed": 0}
+
+
+def test_upserts_keep_what_ingest_does_not_own():
+    product = ProductFactory(
+        product_link="https://synthetic.invalid/products/0",
+        favorite_count=7,
+    )
+
+    upsert_batch(list(build_items(1)))
+
+    updated = Product.objects.get()
+    assert (updated.favorite_count, updated.scraped_at) == (7, product.scraped_at)
+
+
+def test_task_reports_the_totals(monkeypatch):
+    items = list(build_items(3))
+    items[2]["product_link"] = None
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: items)
+
+    result = scrape_and_save_products("test_scraper")
+
+    assert result == (
+        "3 products processed for test_scraper: 2 new, 0 changed, 0 unchanged, "
+        "0 disappeared, 0 deactivated, 1 failed, 0 got cheaper."
+    )
+
+
+def test_batches_written_before_a_scraper_fails_are_kept(monkeypatch):
+    def scraper():
+        yield from build_items(INGEST_BATCH_SIZE)
+        msg = "browser crashed"
+        raise RuntimeError(msg)
+
+    monkeypatch.setitem(SCRAPERS, "test_scraper", scraper)
+
+    with pytest.raises(RuntimeError):
+        scrape_and_save_products("test_scraper")
+
+    assert (
+        Product.objects.filter(search_vector__isnull=False).count() == INGEST_BATCH_SIZE
+    )
+    run = IngestRun.objects.get()
+    assert (run.new, run.finished_at) == (INGEST_BATCH_SIZE, None)
+
+
+class TestChangeTracking:
+    def test_unchanged_items_are_not_rewritten(self):
+        items = list(build_items(2))
+        upsert_batch(items)
+        # As the nightly classifier would; a rewrite would undo it.
+        Product.objects.update(
+            category="classified",
+            last_changed=datetime(2024, 1, 1, tzinfo=UTC),
+        )
+        items[1]["title"] = f"  {items[1]['title']} "
+
+        stats, _ = upsert_batch(items)
+
+        assert stats == {"new": 0, "changed": 0, "unchanged": 2, "failed": 0}
+        assert set(Product.objects.values_list("category", "last_changed")) == {
+            ("classified", datetime(2024, 1, 1, tzinfo=UTC)),
+        }
+
+    def test_changed_items_are_rewritten(self):
+        items = list(build_items(2))
+        upsert_batch(items)
+        Product.objects.update(last_changed=datetime(2024, 1, 1, tzinfo=UTC))
+
+        stats, saved = upsert_batch([{**items[0], "selling_price": "₹1.00"}, items[1]])
+
+        assert stats == {"new": 0, "changed": 1, "unchanged": 1, "failed": 0}
+        assert [status for _, status, _ in saved] == ["changed", "unchanged"]
+        changed = Product.objects.get(product_link=items[0]["product_link"])
+        assert (changed.price_paise, changed.last_changed.year) == (
+            100,
+            datetime.now(UTC).year,
+        )
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    items = [{**item, "seller": "https://a.example/"} for item in build_items(3)]
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: items)
+    return items
+
+
+class TestRuns:
+    def test_run_summary(self, catalog):
+        scrape_and_save_products("test_scraper")
+        catalog[0]["selling_price"] = "₹1.00"
+        catalog.append(
+            {**next(build_items(1, start=3)), "seller": "https://a.example/"},
+        )
+        gone = catalog.pop(1)
+
+        scrape_and_save_products("test_scraper")
+
+        first, second = IngestRun.objects.order_by("started_at")
+        assert (
+            second.new,
+            second.changed,
+            second.unchanged,
+            second.disappeared,
+            second.failed,
+        ) == (1, 1, 1, 1, 0)
+        assert second.sellers == ["https://a.example/"]
+        assert (
+            Product.objects.get(product_link=gone["product_link"]).last_seen
+            == first.started_at
+        )
+        assert (
+            not Product.objects.filter(last_seen__isnull=False)
+            .exclude(product_link=gone["product_link"])
+            .exists()
+        )
+
+    def test_reappearing_products_are_listed_again(self, catalog):
+        scrape_and_save_products("test_scraper")
+        gone = catalog.pop()
+        scrape_and_save_products("test_scraper")
+        catalog.append(gone)
+
+        result = scrape_and_save_products("test_scraper")
+
+        assert "0 new, 0 changed, 3 unchanged, 0 disappeared" in result
+        assert not Product.objects.filter(last_seen__isnull=False).exists()
+
+    def test_only_the_runs_sellers_disappear(self, catalog):
+        other = ProductFactory(seller="https://b.example/")
+
+        scrape_and_save_products("test_scraper")
+
+        assert IngestRun.objects.get().disappeared == 0
+        other.refresh_from_db()
+        assert other.last_seen is None
+
+    def test_an_empty_run_changes_nothing(self, catalog, monkeypatch):
+        scrape_and_save_products("test_scraper")
+        monkeypatch.setitem(SCRAPERS, "test_scraper", list)
+
+        scrape_and_save_products("test_scraper")
+
+        assert not Product.objects.filter(last_seen__isnull=False).exists()
+
+
+class TestDeactivation:
+    @pytest.fixture(autouse=True)
+    def _two_runs(self, settings):
+        settings.PRODUCT_INACTIVE_AFTER_RUNS = 2
+
+    def test_products_missed_by_enough_runs_are_no_longer_listed(
+        self,
+        catalog,
+        api_client,
+    ):
+        scrape_and_save_products("test_scraper")
+        gone = Product.objects.get(product_link=catalog.pop()["product_link"])
+        scrape_and_save_products("test_scraper")
+        gone.refresh_from_db()
+        assert gone.inactive_since is None
+
+        scrape_and_save_products("test_scraper")
+
+        gone.refresh_from_db()
+        assert gone.inactive_since is not None
+        assert IngestRun.objects.order_by("-started_at").first().deactivated == 1
+        listed = api_client.get(reverse("api:product-list")).data["results"]
+        assert gone.pk not in {row["id"] for row in listed}
+        assert len(listed) == 2  # noqa: PLR2004
+        response = api_client.get(reverse("api:product-detail", args=[gone.pk]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_products_that_come_back_are_listed_again(self, catalog):
+        scrape_and_save_products("test_scraper")
+        gone = catalog.pop()
+        scrape_and_save_products("test_scraper")
+        scrape_and_save_products("test_scraper")
+        catalog.append(gone)
+
+        scrape_and_save_products("test_scraper")
+
+        assert not Product.objects.filter(inactive_since__isnull=False).exists()
+
+    def test_other_sellers_runs_do_not_count(self, catalog):
+        other = ProductFactory(
+            seller="https://b.example/",
+            last_seen=datetime(2024, 1, 1, tzinfo=UTC),
+        )
+
+        for _ in range(3):
+            scrape_and_save_products("test_scraper")
+
+        other.refresh_from_db()
+        assert other.inactive_since is None
+
+
+def test_inactive_products_are_purged_after_the_retention(user):
+    now = timezone.now()
+    old, recent = ProductFactory.create_batch(2)
+    Product.objects.filter(pk=old.pk).update(inactive_since=now - timedelta(days=100))
+    Product.objects.filter(pk=recent.pk).update(inactive_since=now - timedelta(days=10))
+    UserFavorite.objects.create(user=user, product=old)
+    record_prices([(old.pk, 500), (recent.pk, 500)])
+
+    purged = purge_inactive_products(now - timedelta(days=90), batch_size=1)
+
+    assert purged == 1
+    assert list(Product.objects.values_list("pk", flat=True)) == [recent.pk]
+    assert not UserFavorite.objects.exists()
+    assert list(recent.price_observations.values_list("price_paise", flat=True)) == [
+        500,
+    ]
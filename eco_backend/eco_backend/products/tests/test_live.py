@@ -0,0 +1,213 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from rest_framework.authtoken.models import Token
+
+from config import websocket
+from config.websocket import LiveHub
+from eco_backend.products import live
+from eco_backend.products import tasks
+from eco_backend.products.live import encode_update
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+SCRAPED_FIELDS = [
+    "title",
+    "brand",
+    "selling_price",
+    "cost_price",
+    "img_url",
+    "product_link",
+    "discount",
+    "rating",
+    "description",
+    "category",
+    "sub_category",
+    "seller",
+]
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = LiveHub()
+    monkeypatch.setattr(websocket, "hub", hub)
+    return hub
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user).key
+
+
+class Client:
+    def __init__(self, token):
+        self.scope = {"type": "websocket", "query_string": f"token={token}".encode()}
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        await self.outgoing.put(message)
+
+    async def send_text(self, text):
+        await self.incoming.put({"type": "websocket.receive", "text": text})
+
+    async def next_message(self):
+        return await asyncio.wait_for(self.outgoing.get(), timeout=2)
+
+    async def next_text(self):
+        return (await self.next_message())["text"]
+
+
+@asynccontextmanager
+async def connected(token):
+    client = Client(token)
+    app = asyncio.create_task(
+        websocket.websocket_application(client.scope, client.receive, client.send),
+    )
+    await client.incoming.put({"type": "websocket.connect"})
+    client.accepted = await client.next_message()
+    try:
+        yield client
+    finally:
+        await client.incoming.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(app, timeout=2)
+
+
+class TestWebsocket:
+    @pytest.mark.parametrize("key", ["", "not-a-token"])
+    def test_rejects_unauthenticated_clients(self, hub, key):
+        async def main():
+            async with connected(key) as client:
+                return client.accepted
+
+        assert async_to_sync(main)() == {
+            "type": "websocket.close",
+            "code": websocket.UNAUTHORIZED,
+        }
+
+    def test_subscribed_topics_are_pushed(self, hub, token, monkeypatch):
+        monkeypatch.setattr(LiveHub, "start", lambda self: None)
+
+        async def main():
+            async with connected(token) as client:
+                await client.send_text(
+                    json.dumps(
+                        {"action": "subscribe", "topics": ["catalog", "price:7"]},
+                    ),
+                )
+                subscribed = json.loads(await client.next_text())
+                hub.dispatch("price:8", encode_update("price:8", {}).encode())
+                hub.dispatch(
+                    "catalog",
+                    encode_update("catalog", {"version": 3}).encode(),
+                )
+                pushed = json.loads(await client.next_text())
+                await client.send_text(
+                    json.dumps({"action": "unsubscribe", "topics": ["catalog"]}),
+                )
+                return subscribed, pushed, json.loads(await client.next_text())
+
+        subscribed, pushed, unsubscribed = async_to_sync(main)()
+
+        assert subscribed == {"type": "subscribed", "topics": ["catalog", "price:7"]}
+        assert pushed == {"topic": "catalog", "data": {"version": 3}}
+        assert unsubscribed == {"type": "subscribed", "topics": ["price:7"]}
+        # Disconnecting left nothing behind in the hub.
+        assert hub.subscribers == {}
+
+    @pytest.mark.parametrize(
+        ("text", "reply"),
+        [
+            ("ping", "pong!"),
+            ("hello", "Send JSON text frames."),
+            (
+                '{"action": "publish", "topics": ["catalog"]}',
+                '"action" must be "subscribe" or "unsubscribe".',
+            ),
+            ('{"action": "subscribe", "topics": ["users"]}', '"topics" must be a list'),
+        ],
+    )
+    def test_bad_requests(self, hub, token, monkeypatch, text, reply):
+        monkeypatch.setattr(LiveHub, "start", lambda self: None)
+
+        async def main():
+            async with connected(token) as client:
+                await client.send_text(text)
+                return await client.next_text()
+
+        answer = async_to_sync(main)()
+        assert reply in (
+            json.loads(answer)["detail"] if answer.startswith("{") else answer
+        )
+
+    def test_updates_arrive_through_redis(self, hub, token):
+        try:
+            live.redis_client().ping()
+        except redis.RedisError:
+            pytest.skip("Redis is not reachable")
+
+        async def main():
+            async with connected(token) as client:
+                await client.send_text(
+                    json.dumps({"action": "subscribe", "topics": ["scrape"]}),
+                )
+                await client.next_text()
+                try:
+                    # Publish until the hub's subscription is up.
+                    for _ in range(20):
+                        live.publish("scrape", {"status": "done"})
+                        try:
+                            message = await asyncio.wait_for(
+                                client.outgoing.get(),
+                                timeout=0.1,
+                            )
+                        except TimeoutError:
+                            continue
+                        return json.loads(message["text"])
+                finally:
+                    hub.listener.cancel()
+            return None
+
+        assert async_to_sync(main)() == {"topic": "scrape", "data": {"status": "done"}}
+
+
+def test_ingest_publishes_price_changes(settings, monkeypatch):
+    product = ProductFactory(selling_price="₹200")
+    item = {field: getattr(product, field) for field in SCRAPED_FIELDS}
+    monkeypatch.setitem(
+        SCRAPERS,
+        "test_scraper",
+        lambda: [{**item, "selling_price": "₹180"}],
+    )
+    published = []
+    monkeypatch.setattr(
+        tasks,
+        "publish",
+        lambda topic, data: published.append((topic, data)),
+    )
+    monkeypatch.setattr(tasks, "publish_many", published.extend)
+
+    tasks.scrape_and_save_products("test_scraper")
+
+    assert [topic for topic, _ in published] == [
+        "scrape",
+        f"price:{product.pk}",
+        "catalog",
+        "scrape",
+        "catalog",
+        "scrape",
+    ]
+    assert published[1][1] == {
+        "product_id": product.pk,
+        "old_price_paise": 20000,
+        "price_paise": 18000,
+    }
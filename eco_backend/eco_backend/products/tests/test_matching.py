@@ -0,0 +1,230 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products.matching import listing_features
+from eco_backend.products.matching import match_listings
+from eco_backend.products.matching import match_products
+from eco_backend.products.matching import title_numbers
+from eco_backend.products.matching import title_shingles
+from eco_backend.products.models import Product
+from eco_backend.products.models import ProductGroup
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.serializers import ProductSerializer
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def groups(listings, brands=()):
+    """The listings matched together, as sets of indexes."""
+    labels = match_listings(*listing_features(listings, brands=brands))
+    found = {}
+    for index, label in enumerate(labels.tolist()):
+        if label >= 0:
+            found.setdefault(label, set()).add(index)
+    return sorted(found.values(), key=min)
+
+
+def test_title_shingles():
+    assert title_shingles("Bamboo Pack of 2", brand="Beco") == {
+        " ba",
+        "bam",
+        "amb",
+        "mbo",
+        "boo",
+        "oo ",
+    }
+    assert title_shingles("Beco Bamboo") == title_shingles("bamboo beco", brand=None)
+    assert title_shingles("Beco Bamboo", brand="beco") == title_shingles("Bamboo")
+
+
+def test_title_numbers():
+    assert (
+        title_numbers("Pack of 2 - 100ml")
+        == title_numbers("100 ML (2 Pack)")
+        == "100 2"
+    )
+
+
+class TestMatchListings:
+    def test_wordings_of_one_product_match(self):
+        listings = [
+            ("Bamboo Toothbrush Pack of 4", "Beco", "a"),
+            ("Beco Bamboo Toothbrush (4 Pack) | Eco Friendly", None, "b"),
+            ("Toothbrush Bamboo 4 Pcs", "Beco", "c"),
+            ("Neem Wood Comb", "Beco", "a"),
+        ]
+
+        assert groups(listings, brands=["Beco"]) == [{0, 1, 2}]
+
+    def test_typos_match(self):
+        listings = [
+            ("Charcoal Bamboo Toothbrush", None, "a"),
+            ("Charcoal Bamboo Tootbhrush", None, "b"),
+        ]
+
+        assert groups(listings) == [{0, 1}]
+
+    def test_pack_sizes_must_agree(self):
+        listings = [
+            ("Bamboo Toothbrush Pack of 2", None, "a"),
+            ("Bamboo Toothbrush Pack of 4", None, "b"),
+        ]
+
+        assert groups(listings) == []
+
+    def test_brands_must_agree(self):
+        listings = [
+            ("Bamboo Toothbrush", "Beco", "a"),
+            ("Bamboo Toothbrush", "Rusabl", "b"),
+            ("Bamboo Toothbrush", None, "c"),
+        ]
+
+        # The unbranded one goes with the first it matches, not with both.
+        assert groups(listings) == [{0, 2}]
+
+    def test_a_seller_lists_a_product_once(self):
+        listings = [
+            ("Bamboo Toothbrush", None, "a"),
+            ("Bamboo Toothbrush", None, "a"),
+            ("Bamboo Toothbrush", None, "b"),
+        ]
+
+        assert groups(listings) == [{0, 2}]
+
+    def test_empty_titles_match_nothing(self):
+        listings = [("Pack of 2", None, "a"), ("Pack of 2", None, "b")]
+
+        assert groups(listings) == []
+
+    def test_no_listings(self):
+        signature_rows, *codes = listing_features([])
+
+        assert signature_rows.shape == (0, 60)
+        assert len(match_listings(signature_rows, *codes)) == 0
+
+
+@pytest.fixture
+def offers():
+    return [
+        ProductFactory(
+            title="Bamboo Toothbrush Pack of 4",
+            selling_price="₹299",
+            seller="https://a.example/",
+        ),
+        ProductFactory(
+            title="Beco Bamboo Toothbrush (4 Pack)",
+            selling_price="₹249",
+            seller="https://b.example/",
+        ),
+        ProductFactory(
+            title="Toothbrush Bamboo 4 Pcs",
+            selling_price="₹275",
+            seller="https://c.example/",
+        ),
+    ]
+
+
+def offer_ids(api_client, product):
+    response = api_client.get(reverse("api:product-offers", args=[product.pk]))
+    assert response.status_code == HTTPStatus.OK
+    return [row["id"] for row in response.data]
+
+
+class TestOffers:
+    def test_cheapest_first(self, api_client, offers):
+        ProductFactory(title="Neem Wood Comb")
+
+        assert match_products() == 1
+        assert offer_ids(api_client, offers[0]) == [
+            offers[1].pk,
+            offers[2].pk,
+            offers[0].pk,
+        ]
+        assert ProductGroup.objects.get().product_count == 3  # noqa: PLR2004
+
+    def test_offer_fields(self, api_client, offers):
+        match_products()
+
+        rows = api_client.get(reverse("api:product-offers", args=[offers[0].pk])).data
+
+        assert list(rows[0]) == [*ProductSerializer.OFFER_FIELDS, "is_favorite"]
+
+    def test_unmatched_product_is_its_only_offer(self, api_client, offers):
+        comb = ProductFactory(title="Neem Wood Comb")
+        match_products()
+
+        assert offer_ids(api_client, comb) == [comb.pk]
+
+    def test_unknown_product(self, api_client):
+        response = api_client.get(reverse("api:product-offers", args=[12345]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_rematching_replaces_groups(self, offers):
+        match_products()
+        offers[1].delete()
+        offers[2].title = "Neem Wood Comb"
+        offers[2].save()
+
+        assert match_products() == 0
+        assert not ProductGroup.objects.exists()
+        assert not Product.objects.filter(group__isnull=False).exists()
+
+    def test_rematching_keeps_groups_and_rewrites_nothing_unchanged(self, offers):
+        match_products()
+        group = ProductGroup.objects.get()
+        comb = ProductFactory(title="Neem Wood Comb")
+
+        with CaptureQueriesContext(connection) as captured:
+            assert match_products() == 1
+
+        assert ProductGroup.objects.get() == group
+        assert set(group.products.all()) == set(offers)
+        comb.refresh_from_db()
+        assert comb.group is None
+        updates = [
+            query["sql"] for query in captured if query["sql"].startswith("UPDATE")
+        ]
+        assert updates == []
+
+    def test_groups_follow_most_of_their_listings(self, offers):
+        match_products()
+        group = ProductGroup.objects.get()
+        offers[2].title = "Neem Wood Comb"
+        offers[2].save()
+
+        match_products()
+
+        assert ProductGroup.objects.get() == group
+        group.refresh_from_db()
+        assert group.products.count() == group.product_count == 2  # noqa: PLR2004
+
+
+def test_ingest_matches_products(monkeypatch, settings, offers):
+    item = {
+        "title": "Bamboo Toothbrush - 4 Pcs",
+        "selling_price": "₹239",
+        "cost_price": None,
+        "discount": None,
+        "product_link": "https://d.example/toothbrush",
+        "img_url": None,
+        "brand": "Beco",
+        "rating": None,
+        "description": None,
+        "category": None,
+        "sub_category": None,
+        "seller": "https://d.example/",
+    }
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: [item])
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    scrape_and_save_products.delay("test_scraper")
+
+    ingested = Product.objects.get(product_link=item["product_link"])
+    assert ingested.group.product_count == 4  # noqa: PLR2004
+    assert set(ingested.group.products.all()) == {ingested, *offers}
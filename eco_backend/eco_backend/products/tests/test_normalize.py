@@ -0,0 +1,56 @@
+import pytest
+
+from eco_backend.products.utils.normalize import numeric_fields
+from eco_backend.products.utils.normalize import parse_discount_percent
+from eco_backend.products.utils.normalize import parse_price_paise
+from eco_backend.products.utils.normalize import parse_rating
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("₹295", 29500),
+        ("₹1,299.50", 129950),
+        ("Rs. 99.9", 9990),
+        ("", None),
+        (None, None),
+        ("Sold out", None),
+    ],
+)
+def test_parse_price_paise(value, expected):
+    assert parse_price_paise(value) == expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("Rated 4.50 out of 5", 4.5),
+        ("4/5", 4.0),
+        ("12 reviews", None),
+        (None, None),
+    ],
+)
+def test_parse_rating(value, expected):
+    assert parse_rating(value) == expected
+
+
+def test_parse_discount_percent_prefers_label_then_prices():
+    assert parse_discount_percent("Save 20%", 8000, 10000) == 20  # noqa: PLR2004
+    assert parse_discount_percent("Save ₹25", 7500, 10000) == 25  # noqa: PLR2004
+    assert parse_discount_percent(None, 10000, 10000) is None
+
+
+def test_numeric_fields():
+    item = {
+        "selling_price": "₹295",
+        "cost_price": "₹350",
+        "discount": None,
+        "rating": "Rated 4.00 out of 5",
+    }
+
+    assert numeric_fields(item) == {
+        "price_paise": 29500,
+        "cost_price_paise": 35000,
+        "discount_percent": 16,
+        "rating_value": 4.0,
+    }
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def walk(api_client, params, link_name="next"):
+    """Follow pagination links from the first page and return the ids seen."""
+    response = api_client.get(reverse("api:product-list"), params)
+    pages = [[row["id"] for row in response.data["results"]]]
+    while response.data[link_name]:
+        response = api_client.get(response.data[link_name])
+        pages.append([row["id"] for row in response.data["results"]])
+    return pages
+
+
+class TestKeysetCursorPagination:
+    def test_pages_cover_duplicate_values_exactly_once(self, api_client):
+        products = [ProductFactory(title=title) for title in "bbaacca"]
+        expected = [p.pk for p in sorted(products, key=lambda p: (p.title, p.pk))]
+
+        pages = walk(api_client, {"ordering": "title", "page_size": 3})
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [pk for page in pages for pk in page] == expected
+
+    def test_descending_nullable_field_puts_nulls_last(self, api_client):
+        rated = [ProductFactory(rating=f"Rated {n}.00 out of 5") for n in (3, 5, 4)]
+        unrated = ProductFactory.create_batch(3, rating=None)
+
+        pages = walk(api_client, {"ordering": "-rating", "page_size": 2})
+
+        expected = [
+            rated[1].pk,
+            rated[2].pk,
+            rated[0].pk,
+            *sorted((p.pk for p in unrated), reverse=True),
+        ]
+        assert [pk for page in pages for pk in page] == expected
+
+    def test_previous_link_returns_to_earlier_page(self, api_client):
+        ProductFactory.create_batch(5, rating=None)
+        ProductFactory.create_batch(2, rating="Rated 4.00 out of 5")
+        url = reverse("api:product-list")
+
+        first = api_client.get(url, {"ordering": "rating", "page_size": 3}).data
+        second = api_client.get(first["next"]).data
+        third = api_client.get(second["next"]).data
+        back = api_client.get(third["previous"]).data
+
+        assert back["results"] == second["results"]
+        assert api_client.get(back["previous"]).data["results"] == first["results"]
+
+    def test_excludes_unpriced_products_and_skips_count(self, api_client):
+        priced = ProductFactory.create_batch(3)
+        ProductFactory(selling_price=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("api:product-list"), {"page_size": 5})
+
+        assert set(response.data) == {"next", "previous", "results"}
+        assert {row["id"] for row in response.data["results"]} == {p.pk for p in priced}
+        assert not any(
+            "COUNT(" in query["sql"].upper() for query in queries.captured_queries
+        )
+
+    def test_invalid_cursor_is_not_found(self, api_client):
+        response = api_client.get(
+            reverse("api:product-list"),
+            {"cursor": "not-a-cursor"},
+        )
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
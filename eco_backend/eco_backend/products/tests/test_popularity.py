@@ -0,0 +1,135 @@
+import pytest
+import redis
+from django.urls import reverse
+
+from eco_backend.products import popularity
+from eco_backend.products.models import Product
+from eco_backend.products.popularity import FAVORITE_DELTAS_KEY
+from eco_backend.products.popularity import counter_store
+from eco_backend.products.popularity import flush_favorite_counts
+from eco_backend.products.popularity import record_favorite_changes
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.tests.factories import UserFavoriteFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def buffer():
+    try:
+        counter_store().delete(FAVORITE_DELTAS_KEY)
+    except redis.RedisError:
+        pytest.skip("Redis is not reachable")
+    yield
+    counter_store().delete(FAVORITE_DELTAS_KEY)
+
+
+def favorite_counts(*products):
+    return [Product.objects.get(pk=product.pk).favorite_count for product in products]
+
+
+@pytest.mark.usefixtures("buffer")
+class TestBufferedCounts:
+    def test_favorites_are_counted_at_the_flush(
+        self,
+        api_client,
+        django_capture_on_commit_callbacks,
+    ):
+        product = ProductFactory()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created = api_client.post(
+                reverse("api:userfavorite-list"),
+                {"product_id": product.pk},
+                format="json",
+            )
+
+        assert favorite_counts(product) == [0]
+        assert flush_favorite_counts() == 1
+        assert favorite_counts(product) == [1]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.delete(
+                reverse("api:userfavorite-detail", args=[created.data["id"]]),
+            )
+        flush_favorite_counts()
+        assert favorite_counts(product) == [0]
+
+    def test_bulk_changes_count_only_real_changes(
+        self,
+        api_client,
+        user,
+        django_capture_on_commit_callbacks,
+    ):
+        kept = UserFavoriteFactory(user=user).product
+        new, other = ProductFactory.create_batch(2)
+        url = reverse("api:userfavorite-bulk")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(url, {"product_ids": [kept.pk, new.pk]}, format="json")
+            api_client.delete(url, {"product_ids": [kept.pk, other.pk]}, format="json")
+
+        assert counter_store().hgetall(FAVORITE_DELTAS_KEY) == {
+            str(new.pk).encode(): b"1",
+            str(kept.pk).encode(): b"-1",
+        }
+
+    def test_changes_are_summed_and_never_go_negative(
+        self,
+        django_capture_on_commit_callbacks,
+    ):
+        hot, cold = ProductFactory.create_batch(2)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(3):
+                record_favorite_changes({hot.pk: 1, cold.pk: -1})
+
+        assert flush_favorite_counts() == 2  # noqa: PLR2004
+        assert favorite_counts(hot, cold) == [3, 0]
+        assert flush_favorite_counts() == 0
+
+    def test_rolled_back_requests_are_not_counted(
+        self,
+        django_capture_on_commit_callbacks,
+    ):
+        product = ProductFactory()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            record_favorite_changes({product.pk: 1})
+
+        # Nothing reaches Redis until the transaction commits.
+        assert len(callbacks) == 1
+        assert counter_store().hgetall(FAVORITE_DELTAS_KEY) == {}
+
+
+def test_falls_back_to_postgres_without_redis(
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    product = ProductFactory()
+
+    def unavailable(deltas):
+        raise redis.ConnectionError
+
+    monkeypatch.setattr(popularity, "buffer_favorite_deltas", unavailable)
+    with django_capture_on_commit_callbacks(execute=True):
+        record_favorite_changes({product.pk: 2})
+
+    assert favorite_counts(product) == [2]
+
+
+def test_ordering_by_popularity(api_client):
+    products = ProductFactory.create_batch(3)
+    for product, count in zip(products, [5, 0, 9], strict=True):
+        Product.objects.filter(pk=product.pk).update(favorite_count=count)
+
+    response = api_client.get(
+        reverse("api:product-list"),
+        {"ordering": "-popularity", "fields": "id,favorite_count"},
+    )
+
+    assert response.data["results"] == [
+        {"id": products[2].pk, "favorite_count": 9},
+        {"id": products[0].pk, "favorite_count": 5},
+        {"id": products[1].pk, "favorite_count": 0},
+    ]
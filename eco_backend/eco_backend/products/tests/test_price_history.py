@@ -0,0 +1,177 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+
+from eco_backend.products import ingest
+from eco_backend.products.ingest import upsert_batch
+from eco_backend.products.models import PriceObservation
+from eco_backend.products.models import Product
+from eco_backend.products.price_history import drop_partitions
+from eco_backend.products.price_history import ensure_partitions
+from eco_backend.products.price_history import partition_name
+from eco_backend.products.price_history import price_history
+from eco_backend.products.price_history import record_prices
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.utils.synthetic_catalog import build_items
+
+pytestmark = pytest.mark.django_db
+
+
+def observed(product):
+    return list(
+        product.price_observations.order_by("observed_at").values_list(
+            "price_paise",
+            flat=True,
+        ),
+    )
+
+
+def test_only_price_changes_are_recorded():
+    items = list(build_items(2))
+    upsert_batch(items)
+    upsert_batch([{**items[0], "title": "Renamed"}, items[1]])
+
+    upsert_batch([{**items[0], "selling_price": "₹1.00"}, items[1]])
+
+    first, second = (
+        Product.objects.get(product_link=item["product_link"]) for item in items
+    )
+    assert observed(first)[-1] == 100  # noqa: PLR2004
+    assert len(observed(first)) == 2  # noqa: PLR2004
+    assert len(observed(second)) == 1
+
+
+def test_prices_of_rejected_rows_are_kept_with_the_rest():
+    items = list(build_items(3))
+    items[1]["category"] = "x" * 100
+
+    upsert_batch(items)
+
+    assert PriceObservation.objects.count() == 2  # noqa: PLR2004
+
+
+def test_products_are_not_saved_without_their_price(monkeypatch):
+    def fail(prices, observed_at=None):
+        raise DatabaseError
+
+    monkeypatch.setattr(ingest, "record_prices", fail)
+
+    stats, _ = upsert_batch(list(build_items(2)))
+
+    assert stats["failed"] == 2  # noqa: PLR2004
+    assert not Product.objects.exists()
+
+
+def test_history_is_carried_through_quiet_days():
+    product = ProductFactory()
+    today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    record_prices([(product.pk, 500)], today - timedelta(days=3))
+    record_prices([(product.pk, 400)], today - timedelta(days=1, hours=2))
+    record_prices([(product.pk, 450)], today - timedelta(days=1))
+
+    history = price_history(product.pk, "day")
+
+    assert [
+        (row["price_paise"], row["min_price_paise"], row["max_price_paise"])
+        for row in history
+    ] == [
+        (500, 500, 500),
+        (500, 500, 500),
+        (450, 400, 500),
+        (450, 450, 450),
+    ]
+    assert history[0]["at"] == (today - timedelta(days=3)).replace(hour=0)
+
+
+def test_weeks_and_months_take_the_last_price():
+    product = ProductFactory()
+    start = timezone.now() - timedelta(days=70)
+    record_prices([(product.pk, 500)], start)
+    record_prices([(product.pk, 300)], start + timedelta(days=1))
+
+    weeks = price_history(product.pk, "week")
+    months = price_history(product.pk, "month")
+
+    assert len(weeks) >= 10  # noqa: PLR2004
+    assert {row["price_paise"] for row in weeks[1:]} == {300}
+    assert months[-1] == {
+        "at": months[-1]["at"],
+        "price_paise": 300,
+        "min_price_paise": 300,
+        "max_price_paise": 300,
+    }
+
+
+def test_old_partitions_are_dropped():
+    ensure_partitions(
+        datetime(2020, 1, 5, tzinfo=UTC),
+        datetime(2020, 3, 5, tzinfo=UTC),
+    )
+
+    dropped = drop_partitions(datetime(2020, 2, 20, tzinfo=UTC))
+
+    assert partition_name(datetime(2020, 1, 1, tzinfo=UTC)) in dropped
+    assert partition_name(datetime(2020, 2, 1, tzinfo=UTC)) not in dropped
+
+
+def test_prices_in_effect_outlive_their_partition():
+    quiet, changed = ProductFactory(), ProductFactory()
+    record_prices(
+        [(quiet.pk, 500), (changed.pk, 700)],
+        datetime(2020, 1, 5, tzinfo=UTC),
+    )
+    record_prices([(changed.pk, 600)], datetime(2020, 1, 20, tzinfo=UTC))
+    record_prices([(changed.pk, 650)], datetime(2020, 2, 10, tzinfo=UTC))
+
+    drop_partitions(datetime(2020, 2, 20, tzinfo=UTC))
+
+    cutoff = datetime(2020, 2, 1, tzinfo=UTC)
+    assert list(quiet.price_observations.values_list("observed_at", "price_paise")) == [
+        (cutoff, 500),
+    ]
+    assert observed(changed) == [600, 650]
+    assert price_history(quiet.pk, "month")[-1]["price_paise"] == 500  # noqa: PLR2004
+
+
+def test_deleting_a_product_deletes_its_history():
+    product = ProductFactory()
+    record_prices([(product.pk, 500)])
+
+    product.delete()
+
+    assert not PriceObservation.objects.exists()
+
+
+class TestEndpoint:
+    def test_history(self, api_client):
+        product = ProductFactory()
+        record_prices([(product.pk, 500)], timezone.now() - timedelta(days=40))
+
+        response = api_client.get(
+            reverse("api:product-price-history", args=[product.pk]),
+            {"resolution": "week"},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.data) >= 6  # noqa: PLR2004
+        assert response.data[-1]["price_paise"] == 500  # noqa: PLR2004
+
+    def test_unknown_resolution(self, api_client):
+        product = ProductFactory()
+
+        response = api_client.get(
+            reverse("api:product-price-history", args=[product.pk]),
+            {"resolution": "hour"},
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_unknown_product(self, api_client):
+        response = api_client.get(reverse("api:product-price-history", args=[12345]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+
+from eco_backend.products.models import Product
+from eco_backend.products.query_plans import QUERY_SHAPES
+from eco_backend.products.query_plans import SEQ_SCAN_ROWS
+from eco_backend.products.query_plans import explain_shapes
+from eco_backend.products.query_plans import find_regressions
+from eco_backend.products.query_plans import planner_settings
+from eco_backend.products.utils.synthetic_catalog import seed_catalog
+
+pytestmark = pytest.mark.django_db
+
+CATALOG_SIZE = 2000
+PRODUCTS = Product._meta.db_table  # noqa: SLF001
+
+
+@pytest.fixture
+def plans(user):
+    seed_catalog(CATALOG_SIZE)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {PRODUCTS}")
+    # A table this small is cheapest to scan whatever the indexes; forbidding
+    # sequential scans shows whether an index could serve each shape at all.
+    with planner_settings(enable_seqscan="off"):
+        return explain_shapes(user)
+
+
+def statement(rows_read, seq_scans=None):
+    return {
+        "cost": 1.0,
+        "ms": 0.1,
+        "buffers": 1,
+        "rows_read": {PRODUCTS: rows_read},
+        "seq_scans": seq_scans or {},
+    }
+
+
+class TestQueryPlans:
+    def test_every_shape_can_use_an_index(self, plans):
+        assert set(plans) == set(QUERY_SHAPES)
+        scanned = {
+            name: s["seq_scans"]
+            for name, statements in plans.items()
+            for s in statements
+            if s["seq_scans"]
+        }
+        assert scanned == {}
+
+    def test_rare_filter_values_skip_the_catalog(self, plans):
+        for name in [
+            "list brand rare",
+            "list category rare",
+            "list sub_category rare",
+            "list seller rare",
+        ]:
+            assert sum(s["rows_read"].get(PRODUCTS, 0) for s in plans[name]) <= 1, name
+
+
+class TestFindRegressions:
+    def test_flags_large_sequential_scans(self):
+        plans = {
+            "list": [statement(SEQ_SCAN_ROWS, {PRODUCTS: SEQ_SCAN_ROWS})],
+            "suggest": [statement(20, {PRODUCTS: 20})],
+            "facets": [statement(SEQ_SCAN_ROWS, {PRODUCTS: SEQ_SCAN_ROWS})],
+        }
+
+        assert find_regressions(plans, {"rows_read": {}}) == [
+            f"list: sequential scan of {SEQ_SCAN_ROWS} rows on {PRODUCTS}",
+        ]
+
+    def test_flags_rows_read_above_the_baseline(self):
+        plans = {
+            "list": [statement(26)],
+            "list brand": [statement(5000)],
+            "retrieve": [statement(2)],
+        }
+        baseline = {"rows_read": {"list": 26, "list brand": 332}}
+
+        assert find_regressions(plans, baseline) == [
+            "list brand: reads 5000 rows, the baseline is 332",
+        ]
@@ -0,0 +1,101 @@
+import pytest
+
+from eco_backend.products.ingest import upsert_batch
+from eco_backend.products.models import Product
+from eco_backend.products.scrapers import SCRAPERS
+from eco_backend.products.search import search_products
+from eco_backend.products.search import update_search_vectors
+from eco_backend.products.tasks import scrape_and_save_products
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.tests.test_pagination import walk
+from eco_backend.products.utils.synthetic_catalog import build_items
+
+pytestmark = pytest.mark.django_db
+
+
+def search(api_client, **params):
+    """Refresh the stored vectors, then return the ids of every result page."""
+    update_search_vectors(Product.objects.all())
+    return [pk for page in walk(api_client, params) for pk in page]
+
+
+class TestProductSearch:
+    def test_title_matches_rank_above_description_matches(self, api_client):
+        in_description = ProductFactory(
+            title="Reusable Straw",
+            description="Pairs well with a bamboo toothbrush",
+        )
+        in_title = ProductFactory(
+            title="Bamboo Toothbrush",
+            description="Soft bristles",
+        )
+        ProductFactory(title="Cotton Tote", description="Large bag")
+
+        assert search(api_client, search="bamboo toothbrushes") == [
+            in_title.pk,
+            in_description.pk,
+        ]
+
+    def test_explicit_ordering_overrides_rank(self, api_client):
+        cheap = ProductFactory(title="Neem Comb", selling_price="₹99")
+        dear = ProductFactory(title="Neem Wood Comb Set", selling_price="₹499")
+
+        assert search(api_client, search="neem comb", ordering="-selling_price") == [
+            dear.pk,
+            cheap.pk,
+        ]
+
+    def test_ranked_results_paginate(self, api_client):
+        products = ProductFactory.create_batch(5, title="Coconut Soap")
+        products.append(
+            ProductFactory(
+                title="Coconut Soap Bar",
+                description="Coconut soap, scented soap",
+            ),
+        )
+
+        found = search(api_client, search="soap", page_size=2)
+
+        assert found[0] == products[-1].pk
+        assert sorted(found) == sorted(p.pk for p in products)
+
+    def test_search_ignores_blank_terms(self, api_client):
+        products = [ProductFactory(title=title) for title in ("b", "a")]
+
+        assert search(api_client, search=" ") == [products[1].pk, products[0].pk]
+
+
+def test_ingest_fills_search_vector(settings, monkeypatch):
+    item = {
+        "title": "Charcoal Bamboo Toothbrush",
+        "brand": "Beco",
+        "selling_price": "₹99",
+        "cost_price": None,
+        "img_url": None,
+        "product_link": "https://seller.example/products/charcoal-toothbrush",
+        "discount": None,
+        "rating": None,
+        "description": "Soft charcoal bristles",
+        "category": None,
+        "sub_category": None,
+        "seller": "https://seller.example/",
+    }
+    monkeypatch.setitem(SCRAPERS, "test_scraper", lambda: [item])
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    scrape_and_save_products.delay("test_scraper")
+
+    product = Product.objects.get(product_link=item["product_link"])
+    assert list(search_products(Product.objects.all(), "toothbrushes")) == [product]
+
+
+def test_upsert_writes_the_same_vector_as_the_model():
+    items = list(build_items(3))
+    upsert_batch(items)
+    upsert_batch([{**items[0], "title": "Renamed Neem Comb"}, *items[1:]])
+    written = dict(Product.objects.values_list("pk", "search_vector"))
+
+    update_search_vectors(Product.objects.all())
+
+    assert None not in written.values()
+    assert dict(Product.objects.values_list("pk", "search_vector")) == written
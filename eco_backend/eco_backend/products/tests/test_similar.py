@@ -0,0 +1,138 @@
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from django.urls import reverse
+
+from eco_backend.products import similar
+from eco_backend.products.cache import catalog_version
+from eco_backend.products.models import ProductNeighbors
+from eco_backend.products.serializers import ProductSerializer
+from eco_backend.products.similar import build_neighbors
+from eco_backend.products.similar import nearest_neighbors
+from eco_backend.products.similar import term_counts
+from eco_backend.products.similar import tfidf
+from eco_backend.products.tasks import build_similar_products_task
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.utils.synthetic_catalog import build_products
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog():
+    return {
+        "brush": ProductFactory(
+            title="Bamboo Toothbrush",
+            description="Soft bristles on a bamboo handle",
+        ),
+        "charcoal_brush": ProductFactory(
+            title="Charcoal Bamboo Toothbrush",
+            description="Charcoal bristles",
+        ),
+        "comb": ProductFactory(title="Neem Wood Comb", description="Wide teeth"),
+        "neem_comb": ProductFactory(
+            title="Handmade Neem Comb",
+            description="Neem wood, wide teeth",
+        ),
+        "soap": ProductFactory(title="Charcoal Soap", description="Activated charcoal"),
+    }
+
+
+def similar_ids(api_client, product, **params):
+    response = api_client.get(reverse("api:product-similar", args=[product.pk]), params)
+    assert response.status_code == HTTPStatus.OK
+    return [row["id"] for row in response.data]
+
+
+class TestSimilarProducts:
+    def test_most_similar_first(self, api_client, catalog):
+        build_neighbors()
+
+        assert similar_ids(api_client, catalog["brush"]) == [
+            catalog["charcoal_brush"].pk,
+        ]
+        assert similar_ids(api_client, catalog["charcoal_brush"]) == [
+            catalog["brush"].pk,
+            catalog["soap"].pk,
+        ]
+        assert similar_ids(api_client, catalog["comb"]) == [catalog["neem_comb"].pk]
+
+    def test_only_listed_products(self, api_client, catalog):
+        ProductFactory(
+            title="Bamboo Toothbrush",
+            description="Soft bristles on a bamboo handle",
+            selling_price=None,
+        )
+
+        assert build_neighbors() == len(catalog)
+        assert similar_ids(api_client, catalog["brush"]) == [
+            catalog["charcoal_brush"].pk,
+        ]
+
+    def test_field_profiles(self, api_client, catalog):
+        build_neighbors()
+        url = reverse("api:product-similar", args=[catalog["brush"].pk])
+
+        rows = api_client.get(url, {"view": "card"}).data
+
+        assert list(rows[0]) == [*ProductSerializer.CARD_FIELDS, "is_favorite"]
+
+    def test_not_built_yet(self, api_client, catalog):
+        assert similar_ids(api_client, catalog["brush"]) == []
+
+    def test_unknown_product(self, api_client):
+        response = api_client.get(reverse("api:product-similar", args=[12345]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_rebuild_replaces_neighbors(self, catalog):
+        build_neighbors()
+        catalog["soap"].delete()
+
+        build_neighbors()
+
+        assert ProductNeighbors.objects.get(
+            product=catalog["charcoal_brush"],
+        ).neighbor_ids == [catalog["brush"].pk]
+
+
+def test_rare_and_ubiquitous_words_are_dropped():
+    documents = [
+        ("Bamboo Brush", "eco"),
+        ("Bamboo Comb", "eco"),
+        ("Neem Comb", "eco 100ml"),
+    ]
+
+    weights = tfidf(term_counts(documents))
+
+    # bamboo and comb; brush and neem are in one product, eco in all of them.
+    assert weights.shape == (3, 2)
+    assert np.allclose(np.sqrt(weights.multiply(weights).sum(axis=1)), [1, 1, 1])
+
+
+def test_dense_and_sparse_blocks_agree(monkeypatch):
+    weights = tfidf(
+        term_counts(
+            (product.title, product.description) for product in build_products(300)
+        ),
+    )
+
+    monkeypatch.setattr(similar, "DENSE_DENSITY", 2)
+    sparse = list(nearest_neighbors(weights, block_entries=5000))
+    monkeypatch.setattr(similar, "DENSE_DENSITY", -1)
+    dense = list(nearest_neighbors(weights, block_entries=5000))
+
+    assert sparse == dense
+    assert all(
+        len(neighbors) == similar.NEIGHBORS and row not in neighbors
+        for row, neighbors in dense
+    )
+
+
+def test_nightly_task_moves_the_catalog_version(catalog):
+    version = catalog_version()
+
+    build_similar_products_task()
+
+    assert catalog_version() != version
+    assert ProductNeighbors.objects.count() == len(catalog)
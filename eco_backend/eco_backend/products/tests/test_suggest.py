@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from eco_backend.products.models import Product
+from eco_backend.products.models import SuggestionTerm
+from eco_backend.products.search import update_search_vectors
+from eco_backend.products.suggest import refresh_suggestion_terms
+from eco_backend.products.suggest import suggest as suggest_terms
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def index_catalog():
+    """What the ingest task does after saving products."""
+    update_search_vectors(Product.objects.all())
+    refresh_suggestion_terms()
+
+
+def suggest(api_client, q):
+    response = api_client.get(reverse("api:product-suggest"), {"q": q})
+    assert response.status_code == HTTPStatus.OK
+    return response.data
+
+
+class TestSuggest:
+    def test_tolerates_misspellings(self, api_client):
+        brush = ProductFactory(
+            title="Bamboo Toothbrush",
+            brand="Beco",
+            sub_category="toothbrush",
+        )
+        ProductFactory(title="Neem Wood Comb", brand="Terra", sub_category="haircare")
+        index_catalog()
+
+        data = suggest(api_client, "toothbursh")
+
+        assert data["products"] == [{"id": brush.pk, "title": "Bamboo Toothbrush"}]
+        assert data["sub_categories"] == ["toothbrush"]
+        assert data["brands"] == []
+
+    def test_corrects_each_word_against_titles_only(self, api_client):
+        soap = ProductFactory(title="Charcoal Soap", description="Plain")
+        ProductFactory(title="Charcoal Toothbrush", description="Pairs with any soap")
+        ProductFactory(title="Neem Soap", description="No charcoal")
+        index_catalog()
+
+        assert suggest(api_client, "chracoal sop")["products"] == [
+            {"id": soap.pk, "title": "Charcoal Soap"},
+        ]
+
+    def test_matches_brands_by_prefix(self, api_client):
+        ProductFactory(title="Charcoal Soap", brand="Mamaearth", sub_category="bath")
+        index_catalog()
+
+        assert suggest(api_client, "mamae")["brands"] == ["Mamaearth"]
+
+    def test_skips_unpriced_products(self, api_client):
+        ProductFactory(title="Bamboo Toothbrush", selling_price=None)
+        index_catalog()
+
+        assert suggest(api_client, "bamboo")["products"] == []
+
+    def test_short_queries_return_nothing(self, api_client):
+        ProductFactory(title="Bamboo Toothbrush")
+
+        data = suggest(api_client, " b ")
+
+        assert data == {
+            "query": "b",
+            "products": [],
+            "brands": [],
+            "sub_categories": [],
+        }
+
+    def test_results_are_cached_per_prefix(self, django_assert_num_queries):
+        ProductFactory(title="Bamboo Toothbrush")
+        index_catalog()
+        first = suggest_terms("Bamboo  ")
+
+        with django_assert_num_queries(0):
+            assert suggest_terms("bamboo") == first
+
+
+def test_refresh_counts_distinct_terms():
+    ProductFactory.create_batch(2, brand="Beco", sub_category="toothbrush")
+    ProductFactory(brand="Terra", sub_category="")
+    ProductFactory(brand="Hidden", selling_price=None)
+
+    refresh_suggestion_terms()
+
+    terms = SuggestionTerm.objects.exclude(kind=SuggestionTerm.WORD)
+    assert set(terms.values_list("kind", "value", "product_count")) == {
+        (SuggestionTerm.BRAND, "Beco", 2),
+        (SuggestionTerm.BRAND, "Terra", 1),
+        (SuggestionTerm.SUB_CATEGORY, "toothbrush", 2),
+    }
+
+
+def test_refresh_collects_plain_title_words():
+    ProductFactory(title="Bamboo Toothbrush 12")
+    ProductFactory(title="Plastic-Free Bamboo Comb")
+
+    refresh_suggestion_terms()
+
+    words = SuggestionTerm.objects.filter(kind=SuggestionTerm.WORD)
+    assert dict(words.values_list("value", "product_count")) == {
+        "bamboo": 2,
+        "toothbrush": 1,
+        "plastic": 1,
+        "free": 1,
+        "comb": 1,
+    }
@@ -0,0 +1,214 @@
+import hashlib
+import time
+from http import HTTPStatus
+
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from eco_backend.products import throttling
+from eco_backend.products.tests.factories import ProductFactory
+from eco_backend.products.throttling import IPBucketThrottle
+from eco_backend.products.throttling import QueryLatency
+from eco_backend.products.throttling import TokenBucketThrottle
+from eco_backend.products.throttling import parse_rate
+from eco_backend.products.throttling import redis_client
+from eco_backend.products.throttling import request_scope
+from eco_backend.users.api.authentication import local_tokens
+from eco_backend.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def clear_buckets():
+    for key in redis_client().scan_iter("throttle:*"):
+        redis_client().delete(key)
+
+
+@pytest.fixture
+def rates(settings, monkeypatch):
+    try:
+        clear_buckets()
+    except redis.RedisError:
+        pytest.skip("Redis is not reachable")
+    rates = {
+        "token.search": "2/min",
+        "token.list": "3/min",
+        "token.write": "2/min",
+        "ip.list": "100/min",
+    }
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": rates,
+    }
+    # Views copy the default throttle classes when they are defined.
+    monkeypatch.setattr(
+        APIView,
+        "throttle_classes",
+        (TokenBucketThrottle, IPBucketThrottle),
+    )
+    yield rates
+    clear_buckets()
+
+
+@pytest.fixture
+def token_client(user) -> APIClient:
+    local_tokens.clear()
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}",
+    )
+    yield client
+    local_tokens.clear()
+
+
+def test_request_scope():
+    factory = APIRequestFactory()
+
+    assert request_scope(factory.get("/api/products/", {"search": "shoes"})) == "search"
+    assert (
+        request_scope(factory.get("/api/products/suggest/", {"q": "sho"})) == "search"
+    )
+    assert request_scope(factory.get("/api/products/", {"search": ""})) == "list"
+    assert request_scope(factory.post("/api/userfavorite/")) == "write"
+
+
+def test_parse_rate():
+    assert parse_rate("60/min") == (60, 1.0)
+    assert parse_rate("10/s") == (10, 10.0)
+
+
+@pytest.mark.usefixtures("rates")
+class TestTokenBuckets:
+    def test_empty_bucket_is_throttled(self, api_client):
+        ProductFactory()
+        url = reverse("api:product-list")
+
+        statuses = [api_client.get(url).status_code for _ in range(4)]
+
+        assert statuses == [*[HTTPStatus.OK] * 3, HTTPStatus.TOO_MANY_REQUESTS]
+        response = api_client.get(url)
+        # One token of a 3/min bucket is back in 20 seconds.
+        assert 0 < int(response["Retry-After"]) <= 20  # noqa: PLR2004
+
+    def test_budgets_are_separate(self, api_client):
+        url = reverse("api:product-list")
+        for _ in range(2):
+            api_client.get(url, {"search": "shoe"})
+
+        response = api_client.get(url, {"search": "shoe"})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert api_client.get(url).status_code == HTTPStatus.OK
+
+    def test_buckets_are_per_user(self, api_client):
+        url = reverse("api:product-list")
+        for _ in range(3):
+            api_client.get(url)
+        other = APIClient()
+        other.force_authenticate(UserFactory())
+
+        assert other.get(url).status_code == HTTPStatus.OK
+
+    def test_async_reads_are_throttled(self, token_client):
+        ProductFactory()
+        url = reverse("api:product-list")
+
+        statuses = [token_client.get(url).status_code for _ in range(4)]
+
+        assert statuses == [*[HTTPStatus.OK] * 3, HTTPStatus.TOO_MANY_REQUESTS]
+
+    def test_async_refusals_are_not_charged_twice(self, token_client, rates):
+        rates["ip.list"] = "1/min"
+        ProductFactory()
+        url = reverse("api:product-list")
+        token_client.get(url)
+        token = token_client._credentials["HTTP_AUTHORIZATION"].split()[1]  # noqa: SLF001
+        bucket = f"throttle:token.list:{hashlib.sha256(token.encode()).hexdigest()}"
+
+        response = token_client.get(url)
+
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+        # The token bucket paid for this request once, not again in DRF.
+        assert 1 <= float(redis_client().hget(bucket, "tokens")) < 2  # noqa: PLR2004
+
+    def test_ip_bucket(self, rates):
+        rates["ip.list"] = "1/min"
+        request = APIRequestFactory().get("/api/products/", REMOTE_ADDR="203.0.113.9")
+
+        assert IPBucketThrottle().allow_request(request, None)
+        assert not IPBucketThrottle().allow_request(request, None)
+        assert IPBucketThrottle().allow_request(
+            APIRequestFactory().get("/api/products/"),
+            None,
+        )
+
+    def test_redis_failure_lets_requests_through(self, api_client, monkeypatch):
+        def unreachable():
+            raise redis.ConnectionError
+
+        monkeypatch.setattr(throttling, "token_bucket", unreachable)
+        url = reverse("api:product-list")
+
+        statuses = [api_client.get(url).status_code for _ in range(4)]
+        assert statuses == [HTTPStatus.OK] * 4
+
+
+class TestLoadShedding:
+    def test_over_budget_requests_get_503(self, api_client, settings):
+        settings.LOAD_SHED_BUDGETS = {"search": {"in_flight": 0, "query_ms": 1000}}
+        url = reverse("api:product-list")
+
+        response = api_client.get(url, {"search": "shoe"})
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == str(settings.LOAD_SHED_RETRY_AFTER)
+        assert api_client.get(url).status_code == HTTPStatus.OK
+
+    def test_slow_queries_shed_load(self, api_client, settings, monkeypatch):
+        settings.LOAD_SHED_BUDGETS = {"list": {"in_flight": 100, "query_ms": 250}}
+        monkeypatch.setattr(
+            throttling.query_latency,
+            "mean_ms",
+            lambda min_samples: 300.0,
+        )
+
+        assert (
+            api_client.get(reverse("api:product-list")).status_code
+            == HTTPStatus.SERVICE_UNAVAILABLE
+        )
+
+    def test_only_the_api_is_shed(self, client, settings):
+        settings.LOAD_SHED_BUDGETS = {"list": {"in_flight": 0, "query_ms": 1000}}
+
+        assert client.get(reverse("home")).status_code == HTTPStatus.OK
+
+
+def test_query_latency_window(monkeypatch):
+    latency = QueryLatency(window=5)
+    now = 1000.0
+    monkeypatch.setattr(throttling.time, "monotonic", lambda: now)
+    latency.add(now - 10, 900)
+    latency.add(now - 1, 10)
+    latency.add(now, 30)
+
+    assert latency.mean_ms() == 20  # noqa: PLR2004
+    now += 6
+    assert latency.mean_ms() == 0
+
+
+def test_a_few_slow_queries_do_not_shed_load(settings, monkeypatch):
+    settings.LOAD_SHED_BUDGETS = {"list": {"in_flight": 100, "query_ms": 250}}
+    settings.LOAD_SHED_MIN_QUERIES = 3
+    latency = QueryLatency(window=5)
+    monkeypatch.setattr(throttling, "query_latency", latency)
+    latency.add(time.monotonic(), 5000)
+
+    assert not throttling.overloaded("list")
+    latency.add(time.monotonic(), 5000)
+    latency.add(time.monotonic(), 5000)
+    assert throttling.overloaded("list")
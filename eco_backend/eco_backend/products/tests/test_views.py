@@ -0,0 +1,155 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eco_backend.products.models import Product
+from eco_backend.products.search import update_search_vectors
+from eco_backend.products.serializers import ProductSerializer
+from eco_backend.products.tests.factories import ProductFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def result_ids(response):
+    return [row["id"] for row in response.data["results"]]
+
+
+class TestProductViewSet:
+    def test_orders_by_numeric_price(self, api_client):
+        cheap = ProductFactory(selling_price="₹95")
+        mid = ProductFactory(selling_price="₹295")
+        dear = ProductFactory(selling_price="₹1,250")
+
+        response = api_client.get(
+            reverse("api:product-list"),
+            {"ordering": "-selling_price"},
+        )
+
+        assert result_ids(response) == [dear.pk, mid.pk, cheap.pk]
+
+    def test_price_rating_and_discount_filters(self, api_client):
+        match = ProductFactory(
+            selling_price="₹300",
+            cost_price="₹400",
+            discount="25% off",
+            rating="Rated 4.50 out of 5",
+        )
+        ProductFactory(
+            selling_price="₹900",
+            cost_price="₹1000",
+            discount="10% off",
+            rating="Rated 4.80 out of 5",
+        )
+        ProductFactory(
+            selling_price="₹250",
+            cost_price="₹500",
+            discount="50% off",
+            rating="Rated 3.00 out of 5",
+        )
+        ProductFactory(
+            selling_price="₹310",
+            cost_price=None,
+            discount=None,
+            rating="Rated 4.90 out of 5",
+        )
+
+        response = api_client.get(
+            reverse("api:product-list"),
+            {
+                "min_price": "200",
+                "max_price": "500",
+                "min_rating": "4",
+                "min_discount": "20",
+            },
+        )
+
+        assert result_ids(response) == [match.pk]
+
+
+def product_selects(queries):
+    return [
+        q["sql"]
+        for q in queries
+        if q["sql"].startswith("SELECT") and '"products_product"."title"' in q["sql"]
+    ]
+
+
+class TestSparseFieldsets:
+    def test_fields_limit_payload_and_columns(self, api_client):
+        ProductFactory.create_batch(2)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(
+                reverse("api:product-list"),
+                {"fields": "id,selling_price, img_url"},
+            )
+
+        assert [set(row) for row in response.data["results"]] == [
+            {"id", "selling_price", "img_url"},
+        ] * 2
+        (sql,) = product_selects(captured.captured_queries)
+        assert '"description"' not in sql
+        assert '"brand"' not in sql
+
+    def test_card_view(self, api_client):
+        ProductFactory(description="x" * 5000)
+
+        response = api_client.get(reverse("api:product-list"), {"view": "card"})
+
+        (row,) = response.data["results"]
+        assert list(row) == [*ProductSerializer.CARD_FIELDS, "is_favorite"]
+
+    def test_sort_column_is_loaded_with_the_page(self, api_client):
+        ProductFactory.create_batch(3)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(
+                reverse("api:product-list"),
+                {"fields": "id", "ordering": "-selling_price", "page_size": 2},
+            )
+
+        assert response.data["next"]
+        # A deferred sort column would be fetched again row by row.
+        refetches = [
+            q["sql"]
+            for q in captured.captured_queries
+            if '"products_product"."id" = ' in q["sql"]
+        ]
+        assert refetches == []
+
+    def test_search_results_keep_rank_order(self, api_client):
+        in_title = ProductFactory(title="Bamboo Toothbrush", description="Soft")
+        in_description = ProductFactory(
+            title="Straw",
+            description="Goes with a bamboo toothbrush",
+        )
+        update_search_vectors(Product.objects.all())
+
+        response = api_client.get(
+            reverse("api:product-list"),
+            {"search": "bamboo", "fields": "id"},
+        )
+
+        assert response.data["results"] == [
+            {"id": in_title.pk},
+            {"id": in_description.pk},
+        ]
+
+    def test_detail_honours_fields(self, api_client):
+        product = ProductFactory()
+
+        response = api_client.get(
+            reverse("api:product-detail", args=[product.pk]),
+            {"view": "card"},
+        )
+
+        assert list(response.data) == [*ProductSerializer.CARD_FIELDS, "is_favorite"]
+
+    @pytest.mark.parametrize("params", [{"fields": "id,secret"}, {"view": "poster"}])
+    def test_rejects_unknown_fields_and_views(self, api_client, params):
+        response = api_client.get(reverse("api:product-list"), params)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,298 @@
+"""
+Rate limits and load shedding for the API.
+
+Every request falls into one of three budgets: ``search`` (reads with
+``?search=`` or ``?q=``, the expensive ones), ``list`` (every other read) and
+``write``.
+
+Throttling: each API token and each client IP has a token bucket per budget,
+with the rates in ``DEFAULT_THROTTLE_RATES`` (``"token.search"``,
+``"ip.write"``, ...). A bucket holds up to one period's worth of requests and
+refills continuously. It lives in a Redis hash that a Lua script refills
+and takes from in one atomic step, so all workers share it and a request
+costs one round trip. If Redis is unreachable, requests are let through.
+
+Load shedding: ``LoadSheddingMiddleware`` answers API requests with a 503
+and ``Retry-After`` while this worker has more requests in flight, or its
+queries recently took longer on average, than their budget allows in
+``LOAD_SHED_BUDGETS``. Searches are given up first and writes last. The
+average only counts once it covers ``LOAD_SHED_MIN_QUERIES`` queries: one
+slow query does not turn everything away, and once shed requests stop
+running queries, the window empties and requests are let in again.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from functools import cache
+
+import redis
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from eco_backend.products.live import redis_client
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PARAMS = ("search", "q")
+RATE_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+LATENCY_WINDOW = 5
+
+# KEYS[1]: the bucket; ARGV: capacity, tokens added per second.
+# Returns the seconds until a token is available, 0 if one was taken.
+BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "at")
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "at", now)
+-- A full bucket is the same as none.
+redis.call("PEXPIRE", KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+def request_scope(request):
+    """The budget a request draws from: ``search``, ``list`` or ``write``."""
+    if request.method not in SAFE_METHODS:
+        return "write"
+    if any(request.GET.get(name) for name in SEARCH_PARAMS):
+        return "search"
+    return "list"
+
+
+def parse_rate(rate):
+    """``"60/min"`` -> ``(60, 1.0)``: bucket capacity and tokens added per second."""
+    count, period = rate.split("/")
+    return int(count), int(count) / RATE_PERIODS[period[0]]
+
+
+@cache
+def token_bucket():
+    return redis_client().register_script(BUCKET_SCRIPT)
+
+
+def take_token(key, capacity, per_second):
+    """
+    Take a token from the bucket at ``key``; returns 0, or the seconds until
+    one is available.
+    """
+    try:
+        return float(token_bucket()(keys=[key], args=[capacity, per_second]))
+    except redis.RedisError:
+        logger.warning(
+            "Could not check rate limit %s; letting the request through",
+            key,
+            exc_info=True,
+        )
+        return 0.0
+
+
+class BucketThrottle(BaseThrottle):
+    """A token bucket per client and budget; subclasses say what a client is."""
+
+    prefix = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_client(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        client = self.get_client(request)
+        scope = f"{self.prefix}.{request_scope(request)}"
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if client is None or rate is None:
+            return True
+        self.retry_after = take_token(f"throttle:{scope}:{client}", *parse_rate(rate))
+        return self.retry_after == 0
+
+    def wait(self):
+        return self.retry_after
+
+
+class TokenBucketThrottle(BucketThrottle):
+    """
+    Per API token (or logged-in user); anonymous requests only have the per-IP
+    budget.
+    """
+
+    prefix = "token"
+
+    def get_client(self, request):
+        key = getattr(getattr(request, "auth", None), "key", None)
+        if key:
+            # Raw tokens are credentials; keep them out of key names.
+            return hashlib.sha256(key.encode()).hexdigest()
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user-{user.pk}"
+        return None
+
+
+class IPBucketThrottle(BucketThrottle):
+    prefix = "ip"
+
+    def get_client(self, request):
+        return self.get_ident(request)
+
+
+def check_throttles(request):
+    """
+    Charge ``request`` to DRF's default throttles, for views outside DRF, as
+    ``APIView.check_throttles`` would; returns the ``Throttled`` error it
+    would raise, or None.
+    """
+    # rest_framework.views loads this module for its defaults.
+    from rest_framework.views import APIView  # noqa: PLC0415
+
+    throttles = [throttle() for throttle in APIView.throttle_classes]
+    refused = [
+        throttle.wait()
+        for throttle in throttles
+        if not throttle.allow_request(request, None)
+    ]
+    if not refused:
+        return None
+    return Throttled(max((wait for wait in refused if wait is not None), default=None))
+
+
+def throttled_response(error):
+    """The 429 DRF's exception handler makes of ``error``."""
+    response = JsonResponse({"detail": error.detail}, status=error.status_code)
+    if error.wait is not None:
+        response.headers["Retry-After"] = str(error.wait)
+    return response
+
+
+class QueryLatency:
+    """Mean duration of the queries this process ran in the last ``window`` seconds."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = deque()
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(started, (time.monotonic() - started) * 1000)
+
+    def add(self, at, duration_ms):
+        with self._lock:
+            self._samples.append((at, duration_ms))
+            self._total += duration_ms
+            self._expire(time.monotonic())
+
+    def mean_ms(self, min_samples=1):
+        """The mean, or 0 while the window holds fewer than ``min_samples`` queries."""
+        with self._lock:
+            self._expire(time.monotonic())
+            if len(self._samples) < max(min_samples, 1):
+                return 0.0
+            return self._total / len(self._samples)
+
+    def _expire(self, now):
+        while self._samples and self._samples[0][0] < now - self.window:
+            self._total -= self._samples.popleft()[1]
+        if not self._samples:
+            self._total = 0.0
+
+
+class InFlight:
+    """Requests this process is handling right now."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.count += 1
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.count -= 1
+
+
+query_latency = QueryLatency()
+in_flight = InFlight()
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    # The wrapper object outlives reconnects; add the timer once.
+    if query_latency not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_latency)
+
+
+def overloaded(scope):
+    budget = settings.LOAD_SHED_BUDGETS.get(scope)
+    if budget is None:
+        return False
+    if in_flight.count >= budget["in_flight"]:
+        return True
+    return query_latency.mean_ms(settings.LOAD_SHED_MIN_QUERIES) > budget["query_ms"]
+
+
+def busy_response():
+    response = JsonResponse(
+        {"detail": "The server is busy. Try again shortly."},
+        status=503,
+    )
+    response.headers["Retry-After"] = str(settings.LOAD_SHED_RETRY_AFTER)
+    return response
+
+
+class LoadSheddingMiddleware:
+    """Turn API requests away with a 503 while this worker is over their budget."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.sheds(request):
+            return busy_response()
+        with in_flight:
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.sheds(request):
+            return busy_response()
+        with in_flight:
+            return await self.get_response(request)
+
+    def sheds(self, request):
+        return request.path.startswith("/api/") and overloaded(request_scope(request))
@@ -0,0 +1,81 @@
+"""
+eco_backend/products/utils/normalize.py
+
+Turn the display strings scraped from seller sites into typed values.
+
+Usage:
+    from eco_backend.products.utils.normalize import parse_price_paise, parse_rating
+    parse_price_paise("₹1,299.00")        # 129900
+    parse_rating("Rated 4.50 out of 5")  # 4.5
+"""
+
+import re
+from decimal import Decimal
+from decimal import InvalidOperation
+
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+MAX_RATING = 5
+
+
+def _first_number(value: str | None) -> Decimal | None:
+    if not value:
+        return None
+    match = NUMBER_RE.search(value)
+    if not match:
+        return None
+    try:
+        return Decimal(match.group(0).replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_price_paise(value: str | None) -> int | None:
+    """Price strings such as "₹295" or "Rs. 1,299.00" to an integer paise amount."""
+    amount = _first_number(value)
+    if amount is None:
+        return None
+    return int((amount * 100).to_integral_value())
+
+
+def parse_discount_percent(
+    value: str | None,
+    price_paise: int | None = None,
+    cost_price_paise: int | None = None,
+) -> int | None:
+    """
+    Discount labels such as "20% off" to a whole percentage.
+
+    Labels without a percentage ("Save ₹50") or missing labels fall back to the
+    difference between the cost and selling price.
+    """
+    if value and "%" in value:
+        percent = _first_number(value)
+        if percent is not None and percent <= 100:  # noqa: PLR2004
+            return int(percent.to_integral_value())
+    if price_paise and cost_price_paise and cost_price_paise > price_paise:
+        return round((cost_price_paise - price_paise) * 100 / cost_price_paise)
+    return None
+
+
+def parse_rating(value: str | None) -> float | None:
+    """Rating labels such as "Rated 4.50 out of 5" or "4.5/5" to a float."""
+    rating = _first_number(value)
+    if rating is None or rating > MAX_RATING:
+        return None
+    return float(rating)
+
+
+def numeric_fields(item: dict) -> dict:
+    """Typed columns for a scraped item, keyed by ``Product`` field name."""
+    price_paise = parse_price_paise(item.get("selling_price"))
+    cost_price_paise = parse_price_paise(item.get("cost_price"))
+    return {
+        "price_paise": price_paise,
+        "cost_price_paise": cost_price_paise,
+        "discount_percent": parse_discount_percent(
+            item.get("discount"),
+            price_paise,
+            cost_price_paise,
+        ),
+        "rating_value": parse_rating(item.get("rating")),
+    }
@@ -0,0 +1,237 @@
+"""
+eco_backend/products/utils/synthetic_catalog.py
+
+Deterministic synthetic products for benchmarks and query-plan checks.
+
+The generated rows mimic what the scrapers store (rupee price strings,
+kleangreen-style rating labels, a handful of brands/sellers) so that planner
+statistics look like production data. Every synthetic row points at
+``SYNTHETIC_SELLER`` which makes them easy to spot and remove.
+
+Usage:
+    from eco_backend.products.utils.synthetic_catalog import seed_catalog
+    seed_catalog(100_000)
+"""
+
+import random
+from collections.abc import Iterator
+
+from eco_backend.products.cache import bump_catalog_version
+from eco_backend.products.home import rebuild_home_snapshot
+from eco_backend.products.models import Product
+from eco_backend.products.search import update_search_vectors
+from eco_backend.products.suggest import refresh_suggestion_terms
+from eco_backend.products.utils.normalize import numeric_fields
+
+SYNTHETIC_SELLER = "https://synthetic.invalid/"
+
+ADJECTIVES = [
+    "bamboo",
+    "organic",
+    "herbal",
+    "natural",
+    "reusable",
+    "biodegradable",
+    "compostable",
+    "handmade",
+    "neem",
+    "charcoal",
+    "coconut",
+    "cotton",
+    "jute",
+    "wooden",
+    "vegan",
+    "ayurvedic",
+    "plastic-free",
+    "zero-waste",
+]
+NOUNS = [
+    "toothbrush",
+    "soap",
+    "shampoo",
+    "comb",
+    "tongue cleaner",
+    "face wash",
+    "lip balm",
+    "razor",
+    "loofah",
+    "hair oil",
+    "deodorant",
+    "body lotion",
+    "straw",
+    "tote bag",
+    "water bottle",
+    "notebook",
+    "envelope",
+    "cutlery set",
+]
+BRANDS = [
+    "Bare Necessities",
+    "Beco",
+    "Ecotyl",
+    "Greenwich",
+    "Kleangreen",
+    "Mamaearth",
+    "Natural Clean",
+    "Rustic Art",
+    "Sirona",
+    "Terra",
+    None,
+]
+CATEGORIES = {
+    "personal care": ["toothbrush", "haircare", "skincare", "oral care", "bath"],
+    "home": ["kitchen", "cleaning", "storage"],
+    "stationary": ["envelope", "notebook", "pens"],
+}
+SELLERS = [
+    "https://ecoconsious.com/",
+    "https://ecohoy.com/",
+    "https://ecoyaan.com/",
+    "https://kleangreenindia.com/",
+]
+# How sellers word the same pack size or volume.
+PACK_WORDINGS = ["Pack of {}", "{} Pcs", "({} Pack)", "Set of {}"]
+VOLUME_WORDINGS = ["{} ml", "{}ml", "- {} ML"]
+TITLE_SUFFIXES = ["| Eco Friendly", "- Sustainable", "(Premium)"]
+
+
+def build_items(count: int, start: int = 0, seed: int = 42) -> Iterator[dict]:
+    """
+    Yield ``count`` scraped items, as a scraper returns them, numbered from
+    ``start``.
+    """
+    rng = random.Random(seed + start)  # noqa: S311
+    categories = list(CATEGORIES)
+    for number in range(start, start + count):
+        title = f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} {number}"
+        cost = rng.randint(50, 2500)
+        price = cost - cost * rng.choice([0, 0, 5, 10, 15, 20, 30]) // 100
+        category = rng.choice(categories)
+        rated = rng.random() < 0.6  # noqa: PLR2004
+        yield {
+            "title": title,
+            "product_link": f"{SYNTHETIC_SELLER}products/{number}",
+            "selling_price": f"₹{price}.00",
+            "cost_price": f"₹{cost}.00" if cost != price else None,
+            "discount": f"{round((cost - price) * 100 / cost)}% off"
+            if cost != price
+            else None,
+            "rating": f"Rated {rng.uniform(3, 5):.2f} out of 5" if rated else None,
+            "category": category,
+            "sub_category": rng.choice(CATEGORIES[category]),
+            "description": f"{title}. "
+            + " ".join(rng.choices(ADJECTIVES + NOUNS, k=30)),
+            "img_url": f"{SYNTHETIC_SELLER}images/{number}.jpg",
+            "brand": rng.choice(BRANDS),
+            "seller": rng.choice(SELLERS),
+        }
+
+
+def build_products(count: int, start: int = 0, seed: int = 42) -> Iterator[Product]:
+    """Yield ``count`` unsaved products numbered from ``start``."""
+    # Separate stream, so adding favorite counts left the other columns as they were.
+    popularity = random.Random(seed + start + 1)  # noqa: S311
+    for item in build_items(count, start, seed):
+        # A long tail: most products have no favorites, a few have many.
+        favorite_count = int(popularity.paretovariate(1.2)) - 1
+        yield Product(**item, **numeric_fields(item), favorite_count=favorite_count)
+
+
+def build_listings(
+    count: int,
+    start: int = 0,
+    seed: int = 42,
+) -> Iterator[tuple[int, Product]]:
+    """
+    Yield ``(number, product)`` pairs for ``count`` distinct products numbered
+    from ``start``, each listed by one to four sellers under that seller's own
+    wording of the title, for measuring cross-seller matching: listings of
+    the same product share a number.
+    """
+    rng = random.Random(seed + start)  # noqa: S311
+    seen = set()
+    number = start
+    while number < start + count:
+        adjectives = tuple(rng.sample(ADJECTIVES, rng.choice([1, 2])))
+        noun = rng.choice(NOUNS)
+        size = rng.choice(
+            [("pack", n) for n in (2, 3, 4, 6, 12)]
+            + [("volume", v) for v in (50, 100, 200)]
+            + [None],
+        )
+        brand = rng.choice(BRANDS)
+        if (frozenset(adjectives), noun, size, brand) in seen:
+            continue
+        seen.add((frozenset(adjectives), noun, size, brand))
+        cost = rng.randint(50, 2500)
+        for seller in rng.sample(SELLERS, rng.randint(1, len(SELLERS))):
+            words = [
+                word.title() for word in rng.sample(adjectives, len(adjectives))
+            ] + [noun.title()]
+            if rng.random() < 0.2:  # noqa: PLR2004
+                words[-1] = misspell(words[-1], rng)
+            if brand and rng.random() < 0.5:  # noqa: PLR2004
+                words.insert(0, brand)
+            if size is not None:
+                wordings = PACK_WORDINGS if size[0] == "pack" else VOLUME_WORDINGS
+                words.append(rng.choice(wordings).format(size[1]))
+            if rng.random() < 0.2:  # noqa: PLR2004
+                words.append(rng.choice(TITLE_SUFFIXES))
+            price = cost - cost * rng.choice([0, 5, 10, 20]) // 100
+            item = {
+                "title": " ".join(words),
+                "product_link": (
+                    f"{SYNTHETIC_SELLER}listings/{number}/{SELLERS.index(seller)}"
+                ),
+                "selling_price": f"₹{price}.00",
+                "cost_price": f"₹{cost}.00",
+                "discount": None,
+                "rating": None,
+                "category": None,
+                "sub_category": None,
+                "description": None,
+                "img_url": None,
+                # Some sellers leave the brand out.
+                "brand": brand if rng.random() < 0.8 else None,  # noqa: PLR2004
+                "seller": seller,
+            }
+            yield number, Product(**item, **numeric_fields(item))
+        number += 1
+
+
+def misspell(words: str, rng: random.Random) -> str:
+    """``words`` with two neighbouring letters of its longest word swapped."""
+    word = max(words.split(), key=len)
+    if len(word) < 4:  # noqa: PLR2004
+        return words
+    i = rng.randrange(1, len(word) - 2)
+    return words.replace(word, word[:i] + word[i + 1] + word[i] + word[i + 2 :])
+
+
+def seed_catalog(count: int, start: int = 0, batch_size: int = 5000) -> int:
+    """Insert ``count`` synthetic products and return how many were written."""
+    batch = []
+    for product in build_products(count, start=start):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            Product.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Product.objects.bulk_create(batch)
+    update_search_vectors(
+        Product.objects.filter(
+            product_link__startswith=SYNTHETIC_SELLER,
+            search_vector__isnull=True,
+        ),
+    )
+    refresh_suggestion_terms()
+    bump_catalog_version()
+    rebuild_home_snapshot()
+    return count
+
+
+def delete_synthetic_products() -> int:
+    deleted, _ = Product.objects.filter(
+        product_link__startswith=SYNTHETIC_SELLER,
+    ).delete()
+    return deleted
@@ -1,23 +1,344 @@
-from rest_framework import viewsets, filters
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Product, UserFavorite
-from .serializers import ProductSerializer, UserFavoriteSerializer
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import CACHE_TIMEOUT
+from .cache import CachedResponseMixin
+from .cache import params_digest
+from .cache import response_cache_stats
+from .cache import versioned_key
+from .facets import facet_counts
+from .favorites import favorite_product_ids
+from .favorites import favorites_validators
+from .favorites import forget_favorite_ids
+from .favorites import mark_requested_favorites
+from .favorites import serialized_fields
+from .filters import ProductFilter
+from .filters import ProductOrderingFilter
+from .filters import ProductSearchFilter
+from .home import home_snapshot
+from .matching import product_offers
+from .models import LISTED
+from .models import PriceDropAlert
+from .models import Product
+from .models import UserFavorite
+from .pagination import KeysetCursorPagination
+from .popularity import record_favorite_changes
+from .price_history import RESOLUTIONS
+from .price_history import price_history
+from .serializers import FavoriteProductIdsSerializer
+from .serializers import PriceDropAlertSerializer
+from .serializers import ProductSerializer
+from .serializers import UserFavoriteSerializer
+from .similar import similar_products
+from .suggest import suggest
+
+
+class NonAtomicReadMixin:
+    """Read-only views skip the per-request transaction (``ATOMIC_REQUESTS``)."""
+
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_exception_handler(self):
+        handler = super().get_exception_handler()
 
+        def handle_exception(exc, context):
+            if not transaction.get_connection().in_atomic_block:
+                return handler(exc, context)
+            # DRF marks the enclosing transaction for rollback, taking it for
+            # the request's own; here it is the caller's (a test, a benchmark).
+            with transaction.atomic():
+                return handler(exc, context)
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Product.objects.filter(selling_price__isnull=False)
+        return handle_exception
+
+
+class ProductViewSet(
+    NonAtomicReadMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    queryset = Product.objects.filter(LISTED)
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['brand', 'category', 'sub_category', 'seller']
-    search_fields = ['title', 'description']
-    ordering_fields = ['selling_price', 'rating', 'title']
+    pagination_class = KeysetCursorPagination
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
+    filterset_class = ProductFilter
+    ordering_fields = ['selling_price', 'rating', 'discount', 'title', 'popularity']
     ordering = ['title']
+    field_profiles = {
+        "card": [*ProductSerializer.CARD_FIELDS, "is_favorite"],
+        "full": None,
+    }
+    # Paging and sorting don't change the facet counts.
+    facet_ignored_params = {"cursor", "page_size", "ordering"}
+
+    def get_requested_fields(self):
+        return self.requested_fields(self.request.query_params)
+
+    @classmethod
+    def requested_fields(cls, params):
+        """
+        Serializer fields picked by ``?view=`` or ``?fields=``; ``None`` means
+        all of them.
+        """
+        if "view" in params:
+            if params["view"] not in cls.field_profiles:
+                raise ValidationError(
+                    {"view": f"Choose one of: {', '.join(cls.field_profiles)}."},
+                )
+            return cls.field_profiles[params["view"]]
+        if not params.get("fields"):
+            return None
+        fields = [name.strip() for name in params["fields"].split(",") if name.strip()]
+        unknown = sorted(set(fields) - {*ProductSerializer.Meta.fields, "is_favorite"})
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}."})
+        return fields
+
+    @classmethod
+    def only_requested(cls, queryset, fields):
+        """
+        ``queryset`` reading only the columns of ``fields``, plus whatever it
+        sorts on.
+        """
+        default_ordering = Product._meta.ordering  # noqa: SLF001
+        ordering = [
+            term.lstrip("-") for term in queryset.query.order_by or default_ordering
+        ]
+        columns = {field.name for field in Product._meta.concrete_fields}  # noqa: SLF001
+        return queryset.only(
+            *(name for name in ["id", *fields, *ordering] if name in columns),
+        )
+
+    @classmethod
+    def facets_key_parts(cls, params):
+        """What cached facet counts are keyed by, for ``versioned_key()``."""
+        return "facets", params_digest(params, ignore=cls.facet_ignored_params)
+
+    def get_validators(self, request):
+        validators = super().get_validators(request)
+        if self.action in ("list", "retrieve", "similar", "offers"):
+            # The body carries the caller's is_favorite flags.
+            return favorites_validators(validators, favorite_product_ids(request.user))
+        return validators
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        response = super().cached_response(handler, request, *args, **kwargs)
+        if response.status_code == 200:  # noqa: PLR2004
+            fields = self.get_requested_fields()
+            mark_requested_favorites(
+                response.data,
+                fields,
+                favorite_product_ids(request.user),
+            )
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ("list", "retrieve", "similar"):
+            kwargs.setdefault("fields", serialized_fields(self.get_requested_fields()))
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = (
+            self.get_requested_fields()
+            if self.action in ("list", "retrieve", "similar")
+            else None
+        )
+        if fields is None:
+            return queryset
+        return self.only_requested(queryset, fields)
+
+    @action(detail=False, pagination_class=None, filter_backends=[])
+    def suggest(self, request):
+        """Short title/brand/sub-category suggestions for ``?q=``, typos allowed."""
+        return Response(suggest(request.query_params.get("q", "")))
+
+    @action(detail=False, pagination_class=None)
+    def facets(self, request):
+        """
+        Brand/category/sub-category/seller counts for the current search and
+        filters.
+        """
+        return self.conditional_response(self.facet_response, request)
+
+    def facet_response(self, request):
+        key = versioned_key(*self.facets_key_parts(request.query_params))
+        facets = cache.get(key)
+        if facets is None:
+            facets = facet_counts(self.filter_queryset(self.get_queryset()))
+            cache.set(key, facets, CACHE_TIMEOUT)
+        return Response(facets)
+
+    @action(detail=True, pagination_class=None, filter_backends=[])
+    def similar(self, request, *args, **kwargs):
+        """
+        The products most like this one by title and description, best first
+        (see similar.py).
+        """
+        handler = partial(self.cached_response, self.similar_response)
+        return self.conditional_response(handler, request, *args, **kwargs)
+
+    def similar_response(self, request, *args, **kwargs):
+        products = similar_products(
+            self.get_object(),
+            self.filter_queryset(self.get_queryset()),
+        )
+        return Response(self.get_serializer(products, many=True).data)
+
+    @action(detail=True, pagination_class=None, filter_backends=[])
+    def offers(self, request, *args, **kwargs):
+        """Every seller's listing of this product, cheapest first (see matching.py)."""
+        handler = partial(self.cached_response, self.offers_response)
+        return self.conditional_response(handler, request, *args, **kwargs)
+
+    def offers_response(self, request, *args, **kwargs):
+        offers = product_offers(self.get_object(), self.get_queryset())
+        return Response(
+            self.get_serializer(
+                offers,
+                many=True,
+                fields=ProductSerializer.OFFER_FIELDS,
+            ).data,
+        )
+
+    @action(
+        detail=True,
+        url_path="price-history",
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def price_history(self, request, *args, **kwargs):
+        """
+        This product's price per ``?resolution=`` day (default), week or month
+        (see price_history.py).
+        """
+        handler = partial(self.cached_response, self.price_history_response)
+        return self.conditional_response(handler, request, *args, **kwargs)
+
+    def price_history_response(self, request, *args, **kwargs):
+        resolution = request.query_params.get("resolution", "day")
+        if resolution not in RESOLUTIONS:
+            raise ValidationError(
+                {"resolution": f"Choose one of: {', '.join(RESOLUTIONS)}."},
+            )
+        return Response(price_history(self.get_object().pk, resolution))
+
+    @action(
+        detail=False,
+        pagination_class=None,
+        filter_backends=[],
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Hit/miss counters of the list/detail response cache."""
+        return Response(response_cache_stats())
+
+
+class HomeView(NonAtomicReadMixin, APIView):
+    """Featured products, top categories and catalog totals for the home page."""
+
+    def get(self, request):
+        return Response(home_snapshot())
+
 
 class UserFavoriteViewSet(viewsets.ModelViewSet):
     queryset = UserFavorite.objects.all()
     serializer_class = UserFavoriteSerializer
     http_method_names = ['get', 'post', 'delete']
 
+    def get_queryset(self):
+        # Only the caller's favorites, with their products in the same query.
+        return (
+            super()
+            .get_queryset()
+            .filter(user=self.request.user)
+            .select_related("product")
+        )
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-    
\ No newline at end of file
+        favorite = serializer.save(user=self.request.user)
+        forget_favorite_ids(self.request.user)
+        record_favorite_changes({favorite.product_id: 1})
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        forget_favorite_ids(self.request.user)
+        record_favorite_changes({instance.product_id: -1})
+
+    @action(detail=False, pagination_class=None)
+    def ids(self, request):
+        """Sorted ids of the caller's favorite products."""
+        return Response({"product_ids": favorite_product_ids(request.user)})
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        serializer_class=FavoriteProductIdsSerializer,
+    )
+    def bulk(self, request):
+        """Add (POST) or remove (DELETE) every product in ``product_ids`` at once."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_ids = serializer.validated_data["product_ids"]
+        favorites = UserFavorite.objects.filter(
+            user=request.user,
+            product_id__in=product_ids,
+        )
+        existing = set(favorites.values_list("product_id", flat=True))
+
+        if request.method == "DELETE":
+            removed, _ = favorites.delete()
+            forget_favorite_ids(request.user)
+            record_favorite_changes(dict.fromkeys(existing, -1))
+            return Response({"removed": removed})
+
+        added = [pk for pk in product_ids if pk not in existing]
+        UserFavorite.objects.bulk_create(
+            [UserFavorite(user=request.user, product_id=pk) for pk in added],
+            ignore_conflicts=True,
+        )
+        forget_favorite_ids(request.user)
+        record_favorite_changes(dict.fromkeys(added, 1))
+        return Response({"added": len(added)}, status=status.HTTP_201_CREATED)
+
+
+class PriceDropAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """The caller's price-drop inbox, newest first."""
+
+    queryset = PriceDropAlert.objects.all()
+    serializer_class = PriceDropAlertSerializer
+    pagination_class = KeysetCursorPagination
+
+    def get_queryset(self):
+        queryset = (
+            super()
+            .get_queryset()
+            .filter(user=self.request.user)
+            .select_related("product")
+        )
+        if self.request.query_params.get("unread"):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+    @action(detail=False, methods=["post"])
+    def read(self, request):
+        """Mark every unread alert as read."""
+        read = PriceDropAlert.objects.filter(
+            user=request.user,
+            read_at__isnull=True,
+        ).update(read_at=timezone.now())
+        return Response({"read": read})
@@ -0,0 +1,132 @@
+"""
+Token authentication without a database query per request.
+
+DRF's ``TokenAuthentication`` joins ``authtoken_token`` to ``users_user`` on
+every request. Here the token's user pk and ``is_active`` are kept in a small
+in-process LRU with a short TTL, backed by the shared cache (Redis in
+production), so only the first request after a miss reaches Postgres. Nothing
+else of the user is cached; the request gets a ``User`` with only those two
+fields loaded, and the rest are read from the database if a view asks.
+
+Entries are dropped explicitly on logout, whenever the user is saved and
+whenever a token is deleted (see ``users/signals.py``). The in-process copy
+cannot be reached from other workers, which is why it only lives for
+``LOCAL_TOKEN_TIMEOUT`` seconds.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authentication import get_authorization_header
+
+TOKEN_CACHE_TIMEOUT = 60 * 5
+LOCAL_TOKEN_TIMEOUT = 10
+LOCAL_TOKEN_ENTRIES = 1024
+
+
+class LocalTokenCache:
+    """
+    A thread-safe LRU of token key -> ``(user pk, is_active)`` whose entries
+    expire after ``timeout`` seconds.
+    """
+
+    def __init__(self, maxsize=LOCAL_TOKEN_ENTRIES, timeout=LOCAL_TOKEN_TIMEOUT):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LocalTokenCache()
+
+
+def token_cache_key(key):
+    # Raw tokens are credentials; keep them out of cache key names.
+    return f"auth:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def forget_token(key):
+    """Drop the cached user of one token, e.g. on logout."""
+    local_tokens.delete(key)
+    cache.delete(token_cache_key(key))
+
+
+def cached_user(user):
+    return user.pk, user.is_active
+
+
+def loaded_user(cached):
+    """A ``User`` with only the cached fields loaded; the others are deferred."""
+    return get_user_model().from_db(DEFAULT_DB_ALIAS, ["id", "is_active"], list(cached))
+
+
+def forget_user_tokens(user):
+    """Drop the cached user of every token ``user`` has."""
+    model = CachedTokenAuthentication().get_model()
+    for key in model.objects.filter(user=user).values_list("key", flat=True):
+        forget_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = local_tokens.get(key)
+        if cached is None:
+            cached = cache.get(token_cache_key(key))
+            if cached is None:
+                user, _ = super().authenticate_credentials(key)
+                cached = cached_user(user)
+                cache.set(token_cache_key(key), cached, TOKEN_CACHE_TIMEOUT)
+            local_tokens.set(key, cached)
+        user = loaded_user(cached)
+        # An unsaved stand-in: views only read .key and .user off request.auth.
+        return user, self.get_model()(key=key, user=user)
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate`` for async views. A token held in-process is resolved
+        on the event loop; anything else goes through ``authenticate`` in a thread.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth:
+            return None
+        if len(auth) == 2 and auth[0].lower() == self.keyword.lower().encode():  # noqa: PLR2004
+            key = auth[1].decode(errors="replace")
+            cached = local_tokens.get(key)
+            if cached is not None:
+                user = loaded_user(cached)
+                return user, self.get_model()(key=key, user=user)
+        return await sync_to_async(self.authenticate)(request)
@@ -10,6 +10,7 @@ from rest_framework import status, permissions
 
 from eco_backend.users.models import User
 
+from .authentication import forget_token
 from .serializers import UserSerializer, UserSignupSerializer
 
 
@@ -38,6 +39,8 @@ class LogoutView(APIView):
 
     def post(self, request):
         # Delete the user's token to log them out
+        if request.auth is not None:
+            forget_token(request.auth.key)
         try:
             request.user.auth_token.delete()
         except Exception:
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from eco_backend.users.api.authentication import forget_token
+from eco_backend.users.api.authentication import forget_user_tokens
+from eco_backend.users.models import User
+
+
+@receiver(post_save, sender=User)
+def forget_cached_tokens(sender, instance, created, **kwargs):
+    # Token authentication caches the user; a changed one must be read again.
+    if not created:
+        forget_user_tokens(instance)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    # However the token went (logout, admin, rotation), it must stop working.
+    forget_token(instance.key)
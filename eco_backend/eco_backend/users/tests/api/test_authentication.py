@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from eco_backend.users.api.authentication import LocalTokenCache
+from eco_backend.users.api.authentication import local_tokens
+from eco_backend.users.api.authentication import token_cache_key
+from eco_backend.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_tokens():
+    local_tokens.clear()
+    yield
+    local_tokens.clear()
+
+
+@pytest.fixture
+def token(user: User) -> Token:
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def token_client(token: Token) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def token_queries(captured):
+    return [q["sql"] for q in captured if "authtoken_token" in q["sql"]]
+
+
+class TestCachedTokenAuthentication:
+    def test_only_the_first_request_reads_the_token(self, token_client, user):
+        url = reverse("api:user-me")
+        with CaptureQueriesContext(connection) as first:
+            token_client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            response = token_client.get(url)
+
+        assert response.data["username"] == user.username
+        assert len(token_queries(first)) == 1
+        assert token_queries(second) == []
+
+    def test_shared_cache_serves_other_workers(self, token_client):
+        url = reverse("api:user-me")
+        token_client.get(url)
+        # Another process starts with an empty in-process LRU.
+        local_tokens.clear()
+
+        with CaptureQueriesContext(connection) as captured:
+            assert token_client.get(url).status_code == HTTPStatus.OK
+        assert token_queries(captured) == []
+
+    def test_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token nope")
+
+        assert client.get(reverse("api:user-me")).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_logout_revokes_the_cached_token(self, token_client):
+        token_client.get(reverse("api:user-me"))
+
+        assert (
+            token_client.post(reverse("api:user-logout")).status_code == HTTPStatus.OK
+        )
+        assert (
+            token_client.get(reverse("api:user-me")).status_code
+            == HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_deleted_tokens_are_revoked(self, token_client, token):
+        token_client.get(reverse("api:user-me"))
+
+        Token.objects.filter(pk=token.pk).delete()
+
+        assert (
+            token_client.get(reverse("api:user-me")).status_code
+            == HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_only_the_user_pk_is_cached(self, token_client, token, user):
+        token_client.get(reverse("api:user-me"))
+
+        assert cache.get(token_cache_key(token.key)) == (user.pk, True)
+        assert local_tokens.get(token.key) == (user.pk, True)
+
+    def test_user_updates_are_seen(self, token_client, user):
+        token_client.get(reverse("api:user-me"))
+
+        user.is_active = False
+        user.save()
+
+        assert (
+            token_client.get(reverse("api:user-me")).status_code
+            == HTTPStatus.UNAUTHORIZED
+        )
+
+
+class TestLocalTokenCache:
+    def test_evicts_least_recently_used(self):
+        tokens = LocalTokenCache(maxsize=2)
+        tokens.set("a", "user a")
+        tokens.set("b", "user b")
+        tokens.get("a")
+        tokens.set("c", "user c")
+
+        assert [tokens.get(key) for key in "abc"] == ["user a", None, "user c"]
+
+    def test_entries_expire(self, monkeypatch):
+        tokens = LocalTokenCache(timeout=10)
+        monkeypatch.setattr("time.monotonic", lambda: 100.0)
+        tokens.set("a", "user a")
+        monkeypatch.setattr("time.monotonic", lambda: 110.0)
+
+        assert tokens.get("a") is None
@@ -74,7 +74,7 @@ function App() {
         auth={auth}
         onLogout={handleLogout}
         onSearch={handleSearch}
-        favoritesCount={favoritesHook.favorites.length}
+        favoritesCount={favoritesHook.count}
       />
 
       <main className="flex-1">
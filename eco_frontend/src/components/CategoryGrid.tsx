@@ -1,3 +1,6 @@
+import { Link } from 'react-router-dom'
+import type { FacetBucket } from '../types'
+
 const categories = [
   {
     name: 'Organic Food',
@@ -37,7 +40,21 @@ const categories = [
   }
 ]
 
-function CategoryGrid() {
+interface CategoryGridProps {
+  // Live category counts; the curated list above is shown until they load
+  categories?: FacetBucket[]
+}
+
+function CategoryGrid({ categories: live = [] }: CategoryGridProps) {
+  const cards = live.length > 0
+    ? live.map((bucket, i) => ({
+        ...categories[i % categories.length],
+        name: bucket.value.replace(/\b\w/g, (c) => c.toUpperCase()),
+        description: `${bucket.count} products`,
+        to: `/products?category=${encodeURIComponent(bucket.value)}`,
+      }))
+    : categories.map((category) => ({ ...category, to: '/products' }))
+
   return (
     <section className="py-16">
       <div className="container mx-auto px-4">
@@ -51,9 +68,10 @@ function CategoryGrid() {
         </div>
 
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-          {categories.map((category) => (
-            <div
+          {cards.map((category) => (
+            <Link
               key={category.name}
+              to={category.to}
               className="group relative bg-white rounded-2xl p-8 shadow-sm hover:shadow-xl transition-all duration-300 cursor-pointer border border-emerald-100 overflow-hidden"
             >
               <div className={`absolute inset-0 bg-gradient-to-br ${category.color} opacity-0 group-hover:opacity-5 transition-opacity`}></div>
@@ -75,7 +93,7 @@ function CategoryGrid() {
                   </svg>
                 </div>
               </div>
-            </div>
+            </Link>
           ))}
         </div>
       </div>
@@ -33,7 +33,7 @@ function Header({ auth, onLogout, onSearch, favoritesCount }: HeaderProps) {
           </Link>
 
           <div className="hidden md:flex flex-1 max-w-2xl mx-8">
-            <SearchBar onSearch={onSearch} />
+            <SearchBar onSearch={onSearch} token={auth.token} />
           </div>
 
           <nav className="hidden lg:flex items-center gap-6">
@@ -99,7 +99,7 @@ function Header({ auth, onLogout, onSearch, favoritesCount }: HeaderProps) {
         </div>
 
         <div className="md:hidden mt-4">
-          <SearchBar onSearch={onSearch} />
+          <SearchBar onSearch={onSearch} token={auth.token} />
         </div>
 
         {mobileMenuOpen && (
@@ -1,19 +1,60 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import type { FormEvent } from 'react'
+import type { Suggestions } from '../types'
+import { suggestProducts } from '../utils/api'
+
 interface SearchBarProps {
   onSearch: (query: string) => void
+  token?: string | null
 }
 
-function SearchBar({ onSearch }: SearchBarProps) {
+function SearchBar({ onSearch, token }: SearchBarProps) {
   const [query, setQuery] = useState('')
+  const [suggestions, setSuggestions] = useState<Suggestions | null>(null)
+
+  // Ask the small /suggest/ endpoint once typing pauses
+  useEffect(() => {
+    const text = query.trim()
+    if (text.length < 2) {
+      setSuggestions(null)
+      return
+    }
+    let cancelled = false
+    const timer = setTimeout(() => {
+      suggestProducts(text, token)
+        .then((data) => {
+          if (!cancelled) setSuggestions(data)
+        })
+        .catch(() => {
+          if (!cancelled) setSuggestions(null)
+        })
+    }, 150)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [query, token])
+
+  const runSearch = (text: string) => {
+    setSuggestions(null)
+    onSearch(text)
+  }
 
   const handleSubmit = (e: FormEvent) => {
     e.preventDefault()
     if (query.trim()) {
-      onSearch(query.trim())
+      runSearch(query.trim())
     }
   }
 
+  const options = suggestions
+    ? [
+        ...suggestions.products.map((p) => ({ key: `p${p.id}`, label: p.title, hint: '' })),
+        ...suggestions.brands.map((b) => ({ key: `b${b}`, label: b, hint: 'Brand' })),
+        ...suggestions.sub_categories.map((c) => ({ key: `c${c}`, label: c, hint: 'Category' })),
+      ]
+    : []
+
   return (
     <form onSubmit={handleSubmit} className="w-full">
       <div className="relative">
@@ -48,6 +89,25 @@ function SearchBar({ onSearch }: SearchBarProps) {
             </svg>
           </button>
         )}
+        {options.length > 0 && (
+          <ul className="absolute z-50 mt-2 w-full bg-white border border-emerald-100 rounded-xl shadow-lg overflow-hidden">
+            {options.map((option) => (
+              <li key={option.key}>
+                <button
+                  type="button"
+                  onClick={() => {
+                    setQuery(option.label)
+                    runSearch(option.label)
+                  }}
+                  className="w-full flex items-center justify-between px-5 py-2 text-left text-gray-700 hover:bg-emerald-50"
+                >
+                  <span className="truncate">{option.label}</span>
+                  {option.hint && <span className="ml-3 text-xs text-emerald-600">{option.hint}</span>}
+                </button>
+              </li>
+            ))}
+          </ul>
+        )}
       </div>
     </form>
   )
@@ -1,12 +1,33 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import type { Product, UserFavorite } from '../types'
-import { getUserFavorites, addToFavorites, removeFromFavorites } from '../utils/api'
+import { getUserFavorites, getFavoriteIds, addFavoritesBulk, removeFavoritesBulk } from '../utils/api'
+
+// Toggles made within this window are sent together in one bulk request
+const FLUSH_DELAY_MS = 400
 
 export function useFavorites(token: string | null) {
   const [favorites, setFavorites] = useState<UserFavorite[]>([])
+  const [favoriteIds, setFavoriteIds] = useState<Set<number>>(new Set())
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const pending = useRef<{ add: Set<number>; remove: Set<number> }>({ add: new Set(), remove: new Set() })
+  const flushTimer = useRef<ReturnType<typeof setTimeout> | null>(null)
+
+  const loadFavoriteIds = useCallback(async () => {
+    if (!token) {
+      setFavoriteIds(new Set())
+      return
+    }
+
+    try {
+      const data = await getFavoriteIds(token)
+      setFavoriteIds(new Set(data.product_ids))
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load favorites')
+    }
+  }, [token])
 
+  // The full favorite products are only needed by the Favorites page
   const loadFavorites = useCallback(async () => {
     if (!token) {
       setFavorites([])
@@ -17,7 +38,9 @@ export function useFavorites(token: string | null) {
     setError(null)
     try {
       const data = await getUserFavorites(token)
-      setFavorites(Array.isArray(data) ? data : [])
+      const list: UserFavorite[] = Array.isArray(data) ? data : []
+      setFavorites(list)
+      setFavoriteIds(new Set(list.map(f => f.product.id)))
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load favorites')
       setFavorites([])
@@ -27,8 +50,49 @@ export function useFavorites(token: string | null) {
   }, [token])
 
   useEffect(() => {
-    loadFavorites()
-  }, [loadFavorites])
+    setFavorites([])
+    loadFavoriteIds()
+  }, [loadFavoriteIds])
+
+  const flush = useCallback(async () => {
+    flushTimer.current = null
+    const { add, remove } = pending.current
+    pending.current = { add: new Set(), remove: new Set() }
+    if (!token || (add.size === 0 && remove.size === 0)) return
+
+    try {
+      await Promise.all([
+        add.size > 0 ? addFavoritesBulk([...add], token) : null,
+        remove.size > 0 ? removeFavoritesBulk([...remove], token) : null,
+      ])
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to update favorites')
+      // The optimistic state may be wrong now; take the server's
+      loadFavoriteIds()
+      loadFavorites()
+    }
+  }, [token, loadFavoriteIds, loadFavorites])
+
+  // Send anything still queued when the token changes or the app unmounts
+  useEffect(() => {
+    return () => {
+      if (flushTimer.current) {
+        clearTimeout(flushTimer.current)
+        flush()
+      }
+    }
+  }, [flush])
+
+  const queue = (productId: number, change: 'add' | 'remove') => {
+    const opposite = change === 'add' ? 'remove' : 'add'
+    // Toggling back before the flush cancels the queued change
+    if (!pending.current[opposite].delete(productId)) {
+      pending.current[change].add(productId)
+    }
+    if (!flushTimer.current) {
+      flushTimer.current = setTimeout(flush, FLUSH_DELAY_MS)
+    }
+  }
 
   const addFavorite = async (product: Product) => {
     if (!token) {
@@ -36,14 +100,10 @@ export function useFavorites(token: string | null) {
       return false
     }
 
-    try {
-      const newFavorite = await addToFavorites(product.id, token)
-      setFavorites(prev => [...prev, newFavorite])
-      return true
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'Failed to add favorite')
-      return false
-    }
+    setFavoriteIds(prev => new Set(prev).add(product.id))
+    setFavorites(prev => [{ id: 0, product, added_at: new Date().toISOString() }, ...prev])
+    queue(product.id, 'add')
+    return true
   }
 
   const removeFavorite = async (productId: number) => {
@@ -52,21 +112,20 @@ export function useFavorites(token: string | null) {
       return false
     }
 
-    const favorite = favorites.find(f => f.product.id === productId)
-    if (!favorite) return false
+    if (!favoriteIds.has(productId)) return false
 
-    try {
-      await removeFromFavorites(favorite.id, token)
-      setFavorites(prev => prev.filter(f => f.id !== favorite.id))
-      return true
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'Failed to remove favorite')
-      return false
-    }
+    setFavoriteIds(prev => {
+      const next = new Set(prev)
+      next.delete(productId)
+      return next
+    })
+    setFavorites(prev => prev.filter(f => f.product.id !== productId))
+    queue(productId, 'remove')
+    return true
   }
 
   const isFavorite = (productId: number) => {
-    return favorites.some(f => f.product.id === productId)
+    return favoriteIds.has(productId)
   }
 
   const toggleFavorite = async (product: Product) => {
@@ -82,6 +141,7 @@ export function useFavorites(token: string | null) {
   return {
     favorites: favorites.map(f => f.product),
     userFavorites: favorites,
+    count: favoriteIds.size,
     loading,
     error,
     clearError,
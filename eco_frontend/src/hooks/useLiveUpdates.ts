@@ -0,0 +1,50 @@
+import { useEffect, useRef } from 'react'
+
+const LIVE_URL = 'ws://localhost:8000/ws/'
+const RECONNECT_DELAY_MS = 3000
+
+export interface LiveUpdate {
+  topic: string
+  data: Record<string, unknown>
+}
+
+// Subscribes to live update topics ("catalog", "scrape", "price:<id>") and
+// reconnects when the socket drops
+export function useLiveUpdates(
+  token: string | null,
+  topics: string[],
+  onUpdate: (update: LiveUpdate) => void
+) {
+  const handler = useRef(onUpdate)
+  handler.current = onUpdate
+  const topicKey = topics.join(',')
+
+  useEffect(() => {
+    if (!token || !topicKey) return
+
+    let socket: WebSocket | null = null
+    let retry: ReturnType<typeof setTimeout> | null = null
+    let closed = false
+
+    const open = () => {
+      socket = new WebSocket(`${LIVE_URL}?token=${encodeURIComponent(token)}`)
+      socket.onopen = () => {
+        socket?.send(JSON.stringify({ action: 'subscribe', topics: topicKey.split(',') }))
+      }
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data)
+        if (message.topic) handler.current(message as LiveUpdate)
+      }
+      socket.onclose = () => {
+        if (!closed) retry = setTimeout(open, RECONNECT_DELAY_MS)
+      }
+    }
+
+    open()
+    return () => {
+      closed = true
+      if (retry) clearTimeout(retry)
+      socket?.close()
+    }
+  }, [token, topicKey])
+}
@@ -12,13 +12,20 @@ interface FavoritesProps {
     clearError: () => void
     toggleFavorite: (product: Product) => Promise<boolean>
     isFavorite: (id: number) => boolean
+    refreshFavorites: () => Promise<void>
   }
 }
 
 function Favorites({ authToken, favoritesHook }: FavoritesProps) {
-  const { favorites, loading, error, clearError, toggleFavorite, isFavorite } = favoritesHook
+  const { favorites, loading, error, clearError, toggleFavorite, isFavorite, refreshFavorites } = favoritesHook
   const navigate = useNavigate()
 
+  useEffect(() => {
+    if (authToken) {
+      refreshFavorites()
+    }
+  }, [authToken, refreshFavorites])
+
   useEffect(() => {
     if (!authToken) {
       navigate('/login')
@@ -3,7 +3,7 @@ import { Link } from 'react-router-dom'
 import HeroBanner from '../components/HeroBanner'
 import CategoryGrid from '../components/CategoryGrid'
 import ProductCard from '../components/ProductCard'
-import type { Product } from '../types'
+import type { FacetBucket, Product } from '../types'
 
 interface HomeProps {
   authToken: string | null
@@ -15,6 +15,7 @@ interface HomeProps {
 
 function Home({ authToken, favoritesHook }: HomeProps) {
   const [featuredProducts, setFeaturedProducts] = useState<Product[]>([])
+  const [categories, setCategories] = useState<FacetBucket[]>([])
   const [loadingFeatured, setLoadingFeatured] = useState(true)
   const [requiresAuth, setRequiresAuth] = useState(false)
   const scrollContainerRef = useRef<HTMLDivElement>(null)
@@ -46,18 +47,12 @@ function Home({ authToken, favoritesHook }: HomeProps) {
       setLoadingFeatured(true)
       setRequiresAuth(false)
       try {
-        const { getFeaturedProducts } = await import('../utils/api')
-        const response = await getFeaturedProducts(authToken)
+        // One precomputed snapshot instead of a catalog query
+        const { getHome } = await import('../utils/api')
+        const snapshot = await getHome(authToken)
 
-        let productsArray: Product[] = []
-        if (Array.isArray(response)) {
-          productsArray = sanitizeProducts(response)
-        } else if (response && response.results) {
-          productsArray = sanitizeProducts(response.results)
-        }
-
-        const limitedProducts = productsArray.slice(0, 12)
-        setFeaturedProducts(limitedProducts)
+        setFeaturedProducts(sanitizeProducts(snapshot?.featured ?? []))
+        setCategories(snapshot?.categories ?? [])
       } catch (error) {
         const errorMessage = error instanceof Error ? error.message : ''
 
@@ -65,6 +60,7 @@ function Home({ authToken, favoritesHook }: HomeProps) {
           setRequiresAuth(true)
         }
         setFeaturedProducts([])
+        setCategories([])
       } finally {
         setLoadingFeatured(false)
       }
@@ -91,7 +87,7 @@ function Home({ authToken, favoritesHook }: HomeProps) {
     <div>
       <HeroBanner />
 
-      <CategoryGrid />
+      <CategoryGrid categories={categories} />
 
       <section className="py-16 bg-white">
         <div className="container mx-auto px-4">
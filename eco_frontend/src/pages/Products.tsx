@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
 import { useSearchParams, Link } from 'react-router-dom'
 import ProductCard from '../components/ProductCard'
+import { useLiveUpdates } from '../hooks/useLiveUpdates'
 import type { Product } from '../types'
 
 interface ProductsProps {
@@ -16,34 +17,16 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
   const [products, setProducts] = useState<Product[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
-  const [totalCount, setTotalCount] = useState(0)
+  const [nextUrl, setNextUrl] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const searchQuery = searchParams.get('search') || ''
+  const category = searchParams.get('category') || ''
   const [ordering, setOrdering] = useState(searchParams.get('ordering') || '-selling_price')
+  // Bumped by the server whenever an ingest run changes the catalog
+  const [catalogVersion, setCatalogVersion] = useState<unknown>(null)
 
-  // Extract numeric price from string like "₹295" or "$99"
-  const extractPrice = (priceString: string): number => {
-    if (!priceString || typeof priceString !== 'string') return 0
-    const cleaned = priceString.replace(/[^\d.]/g, '')
-    return parseFloat(cleaned) || 0
-  }
-
-  // Sort products by price
-  const sortProductsByPrice = (productsToSort: Product[], sortOrder: string): Product[] => {
-    const sorted = [...productsToSort].sort((a, b) => {
-      const priceA = extractPrice(a.selling_price)
-      const priceB = extractPrice(b.selling_price)
-
-      if (sortOrder === 'selling_price') {
-        // Low to High
-        return priceA - priceB
-      } else {
-        // High to Low
-        return priceB - priceA
-      }
-    })
-    return sorted
-  }
+  useLiveUpdates(authToken, ['catalog'], (update) => setCatalogVersion(update.data.version))
 
   // Validate and sanitize product data
   const sanitizeProducts = (rawProducts: any[]): Product[] => {
@@ -75,12 +58,10 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
       try {
         const { searchProducts } = await import('../utils/api')
 
-        // Don't send ordering to API, we'll sort on frontend
+        // Price ordering runs in the database on the numeric price column
         const response = await searchProducts(
           searchQuery || undefined,
-          {
-            ordering: undefined
-          },
+          { ordering, category: category || undefined },
           authToken
         )
 
@@ -91,11 +72,8 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
           productsArray = sanitizeProducts(response.results)
         }
 
-        // Sort on frontend
-        const sortedProducts = sortProductsByPrice(productsArray, ordering)
-
-        setProducts(sortedProducts)
-        setTotalCount(response.count || sortedProducts.length)
+        setProducts(productsArray)
+        setNextUrl(response?.next ?? null)
       } catch (err) {
         const errorMessage = err instanceof Error ? err.message : 'Failed to load products'
         console.error('Failed to load products:', errorMessage)
@@ -106,19 +84,35 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
           setError(errorMessage)
         }
         setProducts([])
-        setTotalCount(0)
+        setNextUrl(null)
       } finally {
         setLoading(false)
       }
     }
 
     loadProducts()
-  }, [searchQuery, ordering, authToken])
+  }, [searchQuery, category, ordering, authToken, catalogVersion])
+
+  const loadMore = async () => {
+    if (!nextUrl) return
+    setLoadingMore(true)
+    try {
+      const { getPage } = await import('../utils/api')
+      const response = await getPage(nextUrl, authToken)
+      setProducts(prev => [...prev, ...sanitizeProducts(response?.results ?? [])])
+      setNextUrl(response?.next ?? null)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load products')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
   const handleOrderingChange = (newOrdering: string) => {
     setOrdering(newOrdering)
     const params = new URLSearchParams()
     if (searchQuery) params.set('search', searchQuery)
+    if (category) params.set('category', category)
     params.set('ordering', newOrdering)
     setSearchParams(params)
   }
@@ -169,28 +163,30 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
           <p className="text-gray-600">
             {loading ? 'Loading...' : error ? 'Error loading products' : (
               <>
-                {totalCount} products found
+                {products.length}{nextUrl ? '+' : ''} products found
                 {ordering === 'selling_price' && ' (Price: Low to High)'}
                 {ordering === '-selling_price' && ' (Price: High to Low)'}
+                {ordering === '-popularity' && ' (Most Popular)'}
               </>
             )}
           </p>
         </div>
 
-        {/* Price Filter Only */}
+        {/* Sorting */}
         <div className="mb-8 bg-white rounded-xl p-6 shadow-sm border border-emerald-100">
           <div className="flex flex-col sm:flex-row gap-4 sm:items-center sm:justify-between">
             <div className="flex items-center gap-3">
               <label className="text-sm font-medium text-gray-700">
-                Sort by Price:
+                Sort by:
               </label>
               <select
                 value={ordering}
                 onChange={(e) => handleOrderingChange(e.target.value)}
                 className="px-4 py-2 border-2 border-gray-200 rounded-lg focus:border-emerald-500 focus:ring-4 focus:ring-emerald-100 transition-all outline-none"
               >
-                <option value="selling_price">Low to High</option>
-                <option value="-selling_price">High to Low</option>
+                <option value="selling_price">Price: Low to High</option>
+                <option value="-selling_price">Price: High to Low</option>
+                <option value="-popularity">Most Popular</option>
               </select>
             </div>
 
@@ -222,7 +218,7 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
         ) : products.length > 0 ? (
           <>
             <div className="mb-4 text-gray-600">
-              Showing {products.length} {products.length === totalCount ? '' : `of ${totalCount}`} products
+              Showing {products.length} products
             </div>
             <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
               {products.map((product) => (
@@ -234,6 +230,17 @@ function Products({ authToken, favoritesHook }: ProductsProps) {
                 />
               ))}
             </div>
+            {nextUrl && (
+              <div className="mt-8 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-6 py-3 border-2 border-emerald-600 text-emerald-600 rounded-lg font-medium hover:bg-emerald-50 transition-all disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load More'}
+                </button>
+              </div>
+            )}
           </>
         ) : (
           <div className="text-center py-20">
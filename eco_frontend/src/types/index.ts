@@ -12,6 +12,12 @@ export interface Product {
   sub_category: string | null
   seller: string
   product_link: string
+  price_paise?: number | null
+  cost_price_paise?: number | null
+  discount_percent?: number | null
+  rating_value?: number | null
+  favorite_count?: number
+  is_favorite?: boolean
 }
 
 export interface UserFavorite {
@@ -36,11 +42,45 @@ export interface SearchFilters {
   sub_category?: string
   seller?: string
   ordering?: string
+  min_price?: number
+  max_price?: number
+  min_rating?: number
+  min_discount?: number
 }
 
 export interface ProductsResponse {
-  count: number
   next: string | null
   previous: string | null
   results: Product[]
 }
+
+export interface Suggestions {
+  query: string
+  products: Pick<Product, 'id' | 'title'>[]
+  brands: string[]
+  sub_categories: string[]
+}
+
+export interface FacetBucket {
+  value: string
+  count: number
+}
+
+export interface Facets {
+  brand: FacetBucket[]
+  category: FacetBucket[]
+  sub_category: FacetBucket[]
+  seller: FacetBucket[]
+}
+
+export interface HomeSnapshot {
+  featured: Product[]
+  categories: FacetBucket[]
+  stats: {
+    products: number
+    brands: number
+    sellers: number
+    last_scraped_at: string | null
+  }
+  generated_at: string
+}
@@ -1,3 +1,5 @@
+import type { Facets, HomeSnapshot, SearchFilters, Suggestions } from '../types'
+
 const API_BASE = 'http://localhost:8000/api'
 
 interface RequestOptions extends RequestInit {
@@ -55,6 +57,10 @@ export async function searchProducts(
     sub_category?: string
     seller?: string
     ordering?: string
+    min_price?: number
+    max_price?: number
+    min_rating?: number
+    min_discount?: number
   },
   token?: string | null
 ) {
@@ -66,18 +72,55 @@ export async function searchProducts(
   if (filters?.sub_category) params.append('sub_category', filters.sub_category)
   if (filters?.seller) params.append('seller', filters.seller)
   if (filters?.ordering) params.append('ordering', filters.ordering)
+  if (filters?.min_price != null) params.append('min_price', String(filters.min_price))
+  if (filters?.max_price != null) params.append('max_price', String(filters.max_price))
+  if (filters?.min_rating != null) params.append('min_rating', String(filters.min_rating))
+  if (filters?.min_discount != null) params.append('min_discount', String(filters.min_discount))
+  // Only the fields ProductCard renders
+  params.append('view', 'card')
 
-  const queryString = params.toString()
-  const endpoint = queryString ? `/products/?${queryString}` : '/products/'
+  const endpoint = `/products/?${params.toString()}`
 
   console.log('searchProducts called with:', { searchQuery, filters, token: token ? 'EXISTS' : 'NULL' })
 
   return request(endpoint, { token })
 }
 
-export async function getFeaturedProducts(token?: string | null) {
-  console.log('getFeaturedProducts called with token:', token ? 'EXISTS' : 'NULL')
-  return request('/products/?ordering=-rating', { token })
+// Value counts for the brand/category/sub_category/seller filters, narrowed
+// by the current search and filters
+export async function getProductFacets(
+  searchQuery?: string,
+  filters?: SearchFilters,
+  token?: string | null
+): Promise<Facets> {
+  const params = new URLSearchParams()
+  if (searchQuery) params.append('search', searchQuery)
+  Object.entries(filters ?? {}).forEach(([key, value]) => {
+    if (value != null && value !== '' && key !== 'ordering') params.append(key, String(value))
+  })
+  const queryString = params.toString()
+  return request(queryString ? `/products/facets/?${queryString}` : '/products/facets/', { token })
+}
+
+// Short title/brand/sub-category suggestions for the search box
+export async function suggestProducts(query: string, token?: string | null): Promise<Suggestions> {
+  return request(`/products/suggest/?q=${encodeURIComponent(query)}`, { token })
+}
+
+// Follow a `next`/`previous` link returned by a cursor-paginated endpoint.
+// The link is absolute and its host depends on how the API was reached, so
+// only its path below /api and its query string are reused.
+export async function getPage(pageUrl: string, token?: string | null) {
+  const { pathname, search } = new URL(pageUrl)
+  const apiPath = new URL(API_BASE).pathname
+  const endpoint = pathname.startsWith(apiPath) ? pathname.slice(apiPath.length) : pathname
+  return request(`${endpoint}${search}`, { token })
+}
+
+// Featured products, top categories and catalog totals, precomputed after
+// each ingest run
+export async function getHome(token?: string | null): Promise<HomeSnapshot> {
+  return request('/home/', { token })
 }
 
 export async function login(username: string, password: string) {
@@ -105,6 +148,11 @@ export async function getUserFavorites(token: string) {
   return request('/userfavorite/', { token })
 }
 
+// Just the favorited product ids, enough to draw the hearts
+export async function getFavoriteIds(token: string): Promise<{ product_ids: number[] }> {
+  return request('/userfavorite/ids/', { token })
+}
+
 export async function addToFavorites(productId: number, token: string) {
   return request('/userfavorite/', {
     method: 'POST',
@@ -119,3 +167,20 @@ export async function removeFromFavorites(favoriteId: number, token: string) {
     token
   })
 }
+
+// Add or remove many favorites in one request
+export async function addFavoritesBulk(productIds: number[], token: string): Promise<{ added: number }> {
+  return request('/userfavorite/bulk/', {
+    method: 'POST',
+    token,
+    body: JSON.stringify({ product_ids: productIds })
+  })
+}
+
+export async function removeFavoritesBulk(productIds: number[], token: string): Promise<{ removed: number }> {
+  return request('/userfavorite/bulk/', {
+    method: 'DELETE',
+    token,
+    body: JSON.stringify({ product_ids: productIds })
+  })
+}